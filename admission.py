@@ -0,0 +1,289 @@
+"""
+admission.py — Per-client rate limits and concurrency admission.
+
+One busy MCP client could otherwise keep the worker saturated and trigger a
+burst of upstream fetches. Requests are checked against two budgets, one
+for cheap resource reads and one for tool calls, each with:
+
+    - a token bucket per client (`rate` per second, up to `burst` at once),
+      keyed on nginx's `X-Real-IP`, else the peer address, else the session
+    - a cap on how many run at once across all clients (`concurrency`), with
+      a short wait (`queue_timeout`) before a request is turned away
+
+A request over either limit fails straight away, rather than queueing and
+stretching everyone's latency, with an HTTP-style `status` (429 for a
+client over its rate, 503 when the server is full) and a `retry_after` in
+seconds: in the error's data for resource reads, and in the `_meta` of the
+error result for tool calls. Only HTTP clients are limited:
+over stdio the one client is the process that started the server.
+
+Budgets are set with `MCP_BOLSTER_ADMISSION_*` variables, for example:
+
+    MCP_BOLSTER_ADMISSION_TOOL_RATE=2
+    MCP_BOLSTER_ADMISSION_TOOL_BURST=10
+    MCP_BOLSTER_ADMISSION_TOOL_CONCURRENCY=8
+    MCP_BOLSTER_ADMISSION_RESOURCE_RATE=20
+    MCP_BOLSTER_ADMISSION=0                  # no admission control at all
+
+Limits are per worker process.
+"""
+
+import contextlib
+import os
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field, fields
+
+import anyio
+from fastmcp import FastMCP
+from fastmcp.server.dependencies import get_http_request
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+from mcp.shared.exceptions import McpError
+from mcp.types import ErrorData
+
+import metrics
+
+ENV_PREFIX = "MCP_BOLSTER_ADMISSION_"
+
+# JSON-RPC's range for server-defined errors, as FastMCP's rate limiter uses
+OVERLOADED = -32000
+
+
+class AdmissionError(McpError):
+    """A request turned away before it ran."""
+
+    def __init__(self, message: str, *, status: int, retry_after: float) -> None:
+        super().__init__(
+            ErrorData(
+                code=OVERLOADED,
+                message=message,
+                data={"status": status, "retry_after": round(retry_after, 3)},
+            )
+        )
+        self.status = status
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """`rate` tokens a second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: float, cost: float = 1.0) -> float:
+        """Take `cost` tokens; returns 0, or the seconds until they would be there."""
+        self._refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+@dataclass
+class Budget:
+    """How much of one kind of request each client, and everyone, may make."""
+
+    rate: float
+    burst: float
+    concurrency: int
+    queue_timeout: float = 0.25
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0 or self.burst < 1 or self.concurrency < 1:
+            raise ValueError(f"Invalid admission budget {self}")
+
+
+# How `from_env` parses each type of Budget setting
+_CONVERTERS: dict[object, Callable[[str], float]] = {float: float, int: int}
+
+
+@dataclass
+class AdmissionConfig:
+    """The budgets for tool calls and resource reads."""
+
+    tool: Budget = field(default_factory=lambda: Budget(2, 10, 8))
+    resource: Budget = field(default_factory=lambda: Budget(20, 50, 32))
+    # Clients tracked at once; idle ones are forgotten first
+    max_clients: int = 10_000
+
+    @classmethod
+    def from_env(
+        cls, environ: dict[str, str] | None = None
+    ) -> "AdmissionConfig | None":
+        """
+        Read `MCP_BOLSTER_ADMISSION_<KIND>_<SETTING>` variables over the defaults.
+
+        Returns None when `MCP_BOLSTER_ADMISSION` is `0`.
+        """
+        env = os.environ if environ is None else environ
+        if env.get("MCP_BOLSTER_ADMISSION", "1").lower() in ("0", "false", "off"):
+            return None
+        config = cls()
+        for kind in ("tool", "resource"):
+            budget = getattr(config, kind)
+            for f in fields(Budget):
+                value = env.get(f"{ENV_PREFIX}{kind.upper()}_{f.name.upper()}")
+                if value:
+                    setattr(budget, f.name, _CONVERTERS[f.type](value))
+            budget.__post_init__()
+        if value := env.get(f"{ENV_PREFIX}MAX_CLIENTS"):
+            config.max_clients = int(value)
+        return config
+
+
+class Gate:
+    """Admission to one budget: per-client buckets and a concurrency cap."""
+
+    def __init__(
+        self,
+        name: str,
+        budget: Budget,
+        *,
+        max_clients: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.budget = budget
+        self.max_clients = max_clients
+        self.clock = clock
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._slots = anyio.Semaphore(budget.concurrency)
+
+    def clients(self) -> int:
+        return len(self._buckets)
+
+    def check_rate(self, client: str) -> None:
+        """
+        Take a token from `client`'s bucket.
+
+        Raises:
+            AdmissionError: With status 429 if the bucket is empty.
+        """
+        now = self.clock()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            self._prune(now)
+            bucket = TokenBucket(self.budget.rate, self.budget.burst, now)
+            self._buckets[client] = bucket
+        else:
+            self._buckets.move_to_end(client)
+        wait = bucket.take(now)
+        if wait:
+            metrics.ADMISSION_REJECTIONS.inc(budget=self.name, reason="rate_limited")
+            raise AdmissionError(
+                f"Too many {self.name} requests; retry in {wait:.1f}s",
+                status=429,
+                retry_after=wait,
+            )
+
+    def _prune(self, now: float) -> None:
+        """Make room for one more client."""
+        if len(self._buckets) < self.max_clients:
+            return
+        # A full bucket is the same as a fresh one, so it can go
+        for client in [c for c, b in self._buckets.items() if b.full(now)]:
+            del self._buckets[client]
+        while len(self._buckets) >= self.max_clients:
+            self._buckets.popitem(last=False)
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold one of the budget's concurrency slots while the request runs.
+
+        Raises:
+            AdmissionError: With status 503 if none frees up within `queue_timeout`.
+        """
+        try:
+            self._slots.acquire_nowait()
+        except anyio.WouldBlock:
+            acquired = False
+            with anyio.move_on_after(self.budget.queue_timeout):
+                await self._slots.acquire()
+                acquired = True
+            if not acquired:
+                metrics.ADMISSION_REJECTIONS.inc(budget=self.name, reason="overloaded")
+                raise AdmissionError(
+                    f"Server is busy with {self.name} requests; retry shortly",
+                    status=503,
+                    retry_after=1.0,
+                ) from None
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+
+def client_key() -> str | None:
+    """Who is asking: nginx's client address, the peer, or the session; None off HTTP."""
+    try:
+        request = get_http_request()
+    except RuntimeError:
+        return None
+    if real_ip := request.headers.get("x-real-ip"):
+        return real_ip
+    if request.client is not None:
+        return request.client.host
+    return request.headers.get("mcp-session-id")
+
+
+class AdmissionMiddleware(Middleware):
+    """Rate-limits and admits tool calls and resource reads from HTTP clients."""
+
+    def __init__(
+        self, config: AdmissionConfig, *, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.config = config
+        self.tools = Gate(
+            "tool", config.tool, max_clients=config.max_clients, clock=clock
+        )
+        self.resources = Gate(
+            "resource", config.resource, max_clients=config.max_clients, clock=clock
+        )
+        self.enabled = True
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        try:
+            return await self._admit(self.tools, context, call_next)
+        except AdmissionError as e:
+            # Tool failures reach clients as error results, so the hint goes in _meta
+            return ToolResult(content=e.error.message, is_error=True, meta=e.error.data)
+
+    async def on_read_resource(self, context: MiddlewareContext, call_next: CallNext):
+        return await self._admit(self.resources, context, call_next)
+
+    async def _admit(self, gate: Gate, context: MiddlewareContext, call_next: CallNext):
+        client = client_key() if self.enabled else None
+        if client is None:
+            return await call_next(context)
+        gate.check_rate(client)
+        async with gate.slot():
+            return await call_next(context)
+
+
+# The server's admission control, once installed
+active: AdmissionMiddleware | None = None
+
+
+def install(mcp: FastMCP, config: AdmissionConfig | None = None) -> bool:
+    """Add admission control to `mcp` unless disabled; returns whether it was."""
+    global active
+    config = config or AdmissionConfig.from_env()
+    if config is None:
+        return False
+    active = AdmissionMiddleware(config)
+    mcp.add_middleware(active)
+    return True
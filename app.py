@@ -6,15 +6,44 @@ This MCP server provides curated resources and links about Andrew Bolster,
 a Northern Ireland-based technology researcher, data scientist, and community builder.
 """
 
+import os
 import re
-import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
-from typing import Annotated, Any
+from importlib.metadata import version as dist_version
+from pathlib import Path, PurePosixPath
+from typing import Annotated, Any, NotRequired
+from urllib.parse import urlsplit
 
+import anyio.to_thread
 import httpx
 from fastmcp import Context, FastMCP
+from fastmcp.exceptions import ResourceError, ToolError
 from fastmcp.tools.tool import ToolAnnotations
 
+# Pydantic reads TypedDict schemas only from typing_extensions before 3.12
+from typing_extensions import TypedDict
+
+import admission
+import content
+import deadline
+import health
+import metrics
+import outbox
+import profiling
+import shared_cache
+import subscriptions
+import upstream
+from warmup import warmup_lifespan
+
+# Writable cache location; deploy.sh points XDG_CACHE_HOME inside the deployment dir
+CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "mcp-bolster"
+)
+
+# With several workers, feeds and Click results are shared through SQLite
+SHARED_CACHE = shared_cache.from_env()
+upstream.shared_cache = SHARED_CACHE
+
 # Initialize the MCP server
 mcp = FastMCP(
     name="Andrew Bolster Resources",
@@ -24,232 +53,36 @@ mcp = FastMCP(
         and key projects like Farset Labs. Use these resources to learn about Andrew's
         work in data science, AI research, autonomous systems, and technology community building.
     """,
+    lifespan=(
+        upstream.http_lifespan
+        | health.health_lifespan
+        | content.content_lifespan
+        | subscriptions.subscriptions_lifespan
+        | outbox.outbox_lifespan
+        | warmup_lifespan
+    ),
+)
+metrics.install(mcp)
+admission.install(mcp)
+deadline.install(mcp)
+health.install(mcp)
+profiling.install(mcp)
+
+
+# Resource text lives in resources/<name>.md and is reloaded when edited
+content.register(
+    mcp,
+    {
+        "personal-website": "Andrew Bolster's main personal website and blog.",
+        "professional-profile": "Andrew Bolster's professional background and current roles.",
+        "farset-labs": "Information about Farset Labs, Northern Ireland's first hackerspace co-founded by Andrew Bolster.",
+        "social-media": "Andrew Bolster's social media and professional networking profiles.",
+        "research-interests": "Andrew Bolster's research interests and academic focus areas.",
+        "community-involvement": "Andrew Bolster's community involvement and organizational roles.",
+        "technical-blog": "Information about Andrew Bolster's technical blog and writing.",
+    },
+    prefix="resource://andrew-bolster/",
 )
-
-
-@mcp.resource("resource://andrew-bolster/personal-website")
-def get_personal_website() -> str:
-    """Andrew Bolster's main personal website and blog."""
-    return """# Andrew Bolster - Personal Website
-
-**URL:** https://andrewbolster.info/
-
-Andrew Bolster's main personal website featuring:
-- Professional background and current role as Senior R&D Manager (Data Science) at Black Duck Software
-- Technical blog with posts on AI, machine learning, autonomous systems, and software development
-- Research interests including generative AI, software development, and autonomous systems
-- Personal projects and community involvement
-
-Key sections:
-- Resume and professional experience
-- Blog posts on technical topics
-- About page with background information
-"""
-
-
-@mcp.resource("resource://andrew-bolster/professional-profile")
-def get_professional_profile() -> str:
-    """Andrew Bolster's professional background and current roles."""
-    return """# Andrew Bolster - Professional Profile
-
-## Current Roles
-- **Head of Data Science** at Black Duck Software
-- **Director and Treasurer** at BSides Belfast
-- **Director** at Northern Ireland Open Government Network
-
-## Background
-- PhD Research at University of Liverpool (Anglo-French Defence Programme)
-- Former Data Scientist at AlertLogic, Sensum Co
-- Specializes in AI/ML productionisation, cybersecurity, and trust frameworks
-- Extensive experience in enterprise AI adoption and LLM governance
-
-## Key Areas of Expertise
-- AI/LLM Productionisation and Governance
-- Data Science and Machine Learning Operations (MLOps/LLMOps)
-- Generative AI and AI Ethics
-- Cybersecurity AI Applications
-- Data Governance and Privacy
-- Enterprise AI Strategy and Implementation
-
-## Leadership Experience
-- Managing cross-functional data science teams
-- Leading AI tools review board and approval processes
-- Establishing data mobility standards and governance frameworks
-- "Data Tzar" for enterprise data privacy and cataloging
-
-## Academic Achievements
-- Queen's University Belfast TG Christie Award
-- Queen's University Belfast Linggard Prize
-- IET Excellence Grant for Academic Progress and STEM outreach
-- Fellow of the Royal Statistical Society
-"""
-
-
-@mcp.resource("resource://andrew-bolster/farset-labs")
-def get_farset_labs() -> str:
-    """Information about Farset Labs, Northern Ireland's first hackerspace co-founded by Andrew Bolster."""
-    return """# Farset Labs - Belfast Hackerspace
-
-**Founding Director:** Andrew Bolster
-
-Farset Labs is Northern Ireland's first hackerspace, established in January 2012 and located in Weavers Court Business Park, Belfast.
-
-## Key Information
-- **Website:** https://www.farsetlabs.org.uk/
-- **Location:** Sandy Row, Belfast
-- **Founded:** January 2012
-- **Status:** First collaborative technology space in Northern Ireland
-
-## Mission
-A collaborative hub for technology professionals and enthusiasts in Belfast and Northern Ireland, providing:
-- Workspace for technology projects
-- Community events and workshops
-- Networking opportunities for the local tech community
-- Support for STEM education and outreach
-
-## Andrew's Role
-As founding director, Andrew has been instrumental in building Farset Labs as a community hub while ensuring the organization remains true to its core values and mission.
-"""
-
-
-@mcp.resource("resource://andrew-bolster/social-media")
-def get_social_media() -> str:
-    """Andrew Bolster's social media and professional networking profiles."""
-    return """# Andrew Bolster - Social Media & Professional Networks
-
-## Primary Professional Profiles
-- **LinkedIn:** https://www.linkedin.com/in/andrewbolster/
-- **GitHub:** https://github.com/andrewbolster
-- **X (Twitter):** https://x.com/bolster
-- **Personal Website:** https://andrewbolster.info/
-- **Email:** andrew@bolster.online
-- **Phone:** +447783249547
-
-## Professional Activities & Presence
-- **Thought Leadership:** Regular expert commentary in Forbes, DarkReading, SecurityBuzz, Computer Weekly
-- **Technical Blogging:** Active blog at andrewbolster.info with 15+ years of technical content
-- **Conference Speaking:** TEDx, NIDC, Dublin Tech Summit, BelTech, PyConIE
-- **Academic Engagement:** Guest lectures at University of Ulster MSc Data Analytics
-- **Open Source:** Active contributor to various projects, especially in data science and security
-
-## Conference Speaking & Media
-- **TEDx Belfast:** "Dr Strange Sub or How I learned to stop worrying and accept Emergence"
-- **Recent Speaking:** Dublin Tech Summit 2025, Northern Ireland Developers Conference
-- **Media Appearances:** Regular interviews and commentary on AI, cybersecurity, and technology trends
-- **International Representation:** Trade delegations representing Northern Ireland tech community
-- **Community Events:** BSides Belfast, InfoSec NI, PyBelfast, BLUG
-
-## Online Presence
-- **Blog RSS Feed:** https://feeds.feedburner.com/ofpenguinsandcoffee
-- **Professional Resume:** https://andrewbolster.info/resume/
-- **Current Status:** https://andrewbolster.info/now/
-"""
-
-
-@mcp.resource("resource://andrew-bolster/research-interests")
-def get_research_interests() -> str:
-    """Andrew Bolster's research interests and academic focus areas."""
-    return """# Andrew Bolster - Research Interests
-
-## Current Focus Areas
-- **Generative AI** impact on software development
-- **AI/Machine Learning** methodologies and ethics
-- **Experience injection** for Large Language Models
-- **AIOps** maturity models and implementation
-
-## Academic Background
-- **PhD Research:** Cyber-security and autonomous underwater vehicles at Queen's University Belfast
-- **Specialization:** Trust frameworks in insecure network environments
-- **Previous Research:** Distributed systems and behavior-based control systems
-
-## Technical Interests
-- Autonomous systems and robotics
-- Software engineering best practices
-- CUDA programming and high-performance computing
-- Network security and trust mechanisms
-- Data science and machine learning applications
-
-## Publications and Writing
-- Regular technical blog posts at andrewbolster.info
-- Academic publications in autonomous systems and cybersecurity
-- Community articles and opinion pieces on technology innovation
-"""
-
-
-@mcp.resource("resource://andrew-bolster/community-involvement")
-def get_community_involvement() -> str:
-    """Andrew Bolster's community involvement and organizational roles."""
-    return """# Andrew Bolster - Community Involvement
-
-## Current Organizational Roles
-- **Director and Treasurer:** BSides Belfast CIC (Information Security Conference) - organizing BSides Belfast 2025
-- **Director:** Northern Ireland Open Government Network
-- **Active Member:** InfoSec NI - seeking attendees and supporters
-
-## Recent Leadership Transitions
-- **Former Founding Director:** Farset Labs (Belfast Hackerspace, 2011-2024) - stepped down in 2024 after 13 years of leadership
-- Continuing to support Farset Labs as community member and advocate
-
-## Current Community Needs & Initiatives
-- **BSides Belfast 2025:** Actively seeking sponsors for Northern Ireland's premier information security conference
-- **InfoSec NI:** Growing the cybersecurity community and seeking new attendees
-- **Farset Labs:** Encouraging ongoing community support and donations for Belfast's hackerspace
-
-## Community Activities
-- **Thought Leadership:** Regular expert commentary in Forbes, DarkReading, and cybersecurity publications
-- **Education:** Guest lectures at University of Ulster MSc Data Analytics program
-- **Mentorship:** Supporting emerging technology and cybersecurity professionals
-- **Public Speaking:** Regular appearances at tech conferences, AI summits, and industry events
-- **Policy Engagement:** Contributing to AI governance and Northern Ireland innovation strategy
-
-## Recognition and Awards
-- Fellow of the Royal Statistical Society
-- Queen's University Belfast TG Christie Award (most promising incoming research student)
-- Queen's University Belfast Linggard Prize (best Masters project in Communication Engineering)
-- IET Excellence Grant for Academic Progress and STEM outreach activities
-
-## Community Impact
-Andrew has been instrumental in building Northern Ireland's technology ecosystem over 13+ years, particularly through:
-- Co-founding and scaling Farset Labs as Northern Ireland's first hackerspace
-- Establishing Belfast as a recognized hub for cybersecurity expertise through BSides Belfast
-- Representing NI tech community internationally at conferences and trade delegations
-- Promoting AI governance and ethical technology adoption in enterprise environments
-- Supporting diversity and inclusion in technology through mentorship and outreach
-"""
-
-
-@mcp.resource("resource://andrew-bolster/technical-blog")
-def get_technical_blog() -> str:
-    """Information about Andrew Bolster's technical blog and writing."""
-    return """# Andrew Bolster - Technical Blog
-
-**Blog URL:** https://andrewbolster.info/blog/
-
-Andrew maintains an active technical blog covering a wide range of topics in technology, research, and innovation.
-
-## Recent Blog Topics
-- Generative AI and its impact on software development
-- Machine learning methodologies and best practices
-- Autonomous systems and robotics
-- Software engineering techniques
-- Data science workflows and tools
-- Technology policy and innovation strategy
-
-## Writing Style and Focus
-- Practical, hands-on technical tutorials
-- Research insights and academic perspectives
-- Industry analysis and commentary
-- Community building and technology advocacy
-- Open source software and tools
-
-## Notable Series
-- PhD diary entries during research
-- Technology setup and configuration guides
-- Analysis of Northern Ireland's innovation landscape
-- Reviews of technical books and resources
-
-The blog serves as both a technical resource and a window into Andrew's thinking on current technology trends and challenges.
-"""
 
 
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=False))
@@ -260,16 +93,171 @@ async def send_contact_message(
 ) -> str:
     """Send a message to Andrew Bolster for professional inquiries or collaboration requests."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    await ctx.info(f"Contact message received from {sender} ({len(message)} chars)")
+    # Only queued here; the outbox's delivery task does the emailing
+    message_id = await outbox.get().queue(sender, message)
+    await ctx.info(
+        f"Contact message {message_id} queued from {sender} ({len(message)} chars)"
+    )
 
-    # Placeholder — will be replaced with actual email integration
     return f"""Message received and queued for delivery to Andrew Bolster.
 
+Message ID: {message_id}
 Message from: {sender}
 Timestamp: {timestamp}
 Length: {len(message)} characters
 
-Note: This is currently a placeholder implementation. The message has been logged but not yet delivered via email. Email integration will be added in a future update."""
+Use get_contact_message_status with this message ID to check on delivery."""
+
+
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+async def get_contact_message_status(
+    message_id: Annotated[str, "The message ID returned by send_contact_message"],
+) -> str:
+    """Check whether a contact message sent with send_contact_message has been delivered."""
+    queued = await anyio.to_thread.run_sync(outbox.get().get, message_id.strip())
+    if queued is None:
+        return f"No contact message with ID {message_id!r} was found."
+
+    def when(timestamp: float) -> str:
+        return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+    descriptions = {
+        "queued": "Waiting to be delivered",
+        "sending": "Being delivered now",
+        "sent": "Delivered",
+        "failed": "Could not be delivered",
+    }
+    lines = [
+        f"Message {queued.id}: {descriptions.get(queued.state, queued.state)}",
+        f"Message from: {queued.sender}",
+        f"Queued: {when(queued.queued_at)}",
+        f"Delivery attempts: {queued.attempts}",
+    ]
+    if queued.sent_at is not None:
+        lines.append(f"Delivered: {when(queued.sent_at)}")
+    elif queued.state == "queued" and queued.attempts:
+        lines.append(f"Next attempt: {when(queued.next_attempt_at)}")
+    if queued.last_error and queued.state != "sent":
+        lines.append(f"Last error: {queued.last_error}")
+    return "\n".join(lines)
+
+
+def _parse_ical_datetime(line: str, prop: str) -> datetime | None:
+    dt_match = re.search(rf"{prop}[^:]*:(\d{{8}}T?\d{{0,6}}Z?)", line)
+    if not dt_match:
+        return None
+    dt_str = dt_match.group(1)
+    try:
+        if "T" in dt_str:
+            if dt_str.endswith("Z"):
+                return datetime.strptime(dt_str, "%Y%m%dT%H%M%SZ")
+            return datetime.strptime(dt_str, "%Y%m%dT%H%M%S")
+        return datetime.strptime(dt_str, "%Y%m%d")
+    except ValueError:
+        return None
+
+
+def _parse_ical(ical_content: str) -> list[dict[str, Any]]:
+    """The events in an iCal document, with `start`, `end` and `summary` where given."""
+    events: list[dict[str, Any]] = []
+    current_event: dict[str, Any] = {}
+
+    for line in ical_content.split("\n"):
+        line = line.strip()
+        if line == "BEGIN:VEVENT":
+            current_event = {}
+        elif line == "END:VEVENT":
+            if current_event:
+                events.append(current_event.copy())
+            current_event = {}
+        elif line.startswith("DTSTART"):
+            dt = _parse_ical_datetime(line, "DTSTART")
+            if dt is not None:
+                current_event["start"] = dt
+        elif line.startswith("DTEND"):
+            dt = _parse_ical_datetime(line, "DTEND")
+            if dt is not None:
+                current_event["end"] = dt
+        elif line.startswith("SUMMARY"):
+            current_event["summary"] = line.split(":", 1)[1] if ":" in line else ""
+    return events
+
+
+# The events parsed from the latest calendar snapshot, reused until it changes
+_parsed_calendar: tuple[upstream.Snapshot, list[dict[str, Any]]] | None = None
+
+
+def _calendar_events(snapshot: upstream.Snapshot) -> list[dict[str, Any]]:
+    global _parsed_calendar
+    if _parsed_calendar is None or _parsed_calendar[0] is not snapshot:
+        _parsed_calendar = (snapshot, _parse_ical(snapshot.text))
+    return _parsed_calendar[1]
+
+
+def _events_between(
+    events: list[dict[str, Any]], start_dt: datetime, end_dt: datetime
+) -> list[dict[str, Any]]:
+    """Events with a start and end that overlap `start_dt` to `end_dt`."""
+    return [
+        event
+        for event in events
+        if "start" in event
+        and "end" in event
+        and isinstance(event["start"], datetime)
+        and isinstance(event["end"], datetime)
+        and event["start"] <= end_dt
+        and event["end"] >= start_dt
+    ]
+
+
+def _minutes(dt: datetime) -> str:
+    """ISO 8601 to the minute, which is as precise as calendar events get."""
+    return dt.isoformat(timespec="minutes")
+
+
+class BusyInterval(TypedDict):
+    """A calendar event: ISO 8601 start and end, and its summary."""
+
+    start: str
+    end: str
+    summary: str
+
+
+class Coverage(TypedDict):
+    """What an availability answer is based on."""
+
+    # Only events on the public calendar are seen; private ones are not
+    public_only: bool
+    # Seconds since the calendar was downloaded
+    snapshot_age: int
+    # True when the calendar could not be refreshed and an older copy was used
+    stale: bool
+
+
+class Availability(TypedDict):
+    """
+    What is busy between `start` and `end` (ISO 8601), earliest first.
+
+    Full answers list each event in `busy`; compact ones give only `blocks`,
+    `[start, end]` pairs with overlapping and back-to-back events merged.
+    """
+
+    start: str
+    end: str
+    busy: NotRequired[list[BusyInterval]]
+    blocks: NotRequired[list[tuple[str, str]]]
+    coverage: Coverage
+
+
+def _merged_blocks(events: list[dict[str, Any]]) -> list[tuple[str, str]]:
+    """The time covered by `events`, with overlapping or touching ones joined."""
+    blocks: list[list[datetime]] = []
+    for event in sorted(events, key=lambda e: e["start"]):
+        if blocks and event["start"] <= blocks[-1][1]:
+            blocks[-1][1] = max(blocks[-1][1], event["end"])
+        else:
+            blocks.append([event["start"], event["end"]])
+    return [(_minutes(start), _minutes(end)) for start, end in blocks]
 
 
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
@@ -279,8 +267,16 @@ async def check_availability(
         str | None, "Start date in YYYY-MM-DD format (defaults to today)"
     ] = None,
     days_ahead: Annotated[int, "Number of days to check ahead"] = 7,
-) -> str:
-    """Check Andrew Bolster's calendar availability using his public iCal feed."""
+    compact: Annotated[
+        bool, "Return only merged busy blocks, without event summaries"
+    ] = False,
+) -> Availability:
+    """
+    Check Andrew Bolster's calendar availability using his public iCal feed.
+
+    Returns the busy periods in the range; any time not listed is free as
+    far as the public calendar shows.
+    """
     try:
         if start_date:
             start_dt = datetime.strptime(start_date, "%Y-%m-%d")
@@ -292,154 +288,132 @@ async def check_availability(
             f"Checking availability from {start_dt.date()} for {days_ahead} days"
         )
 
-        ical_url = "https://calendar.google.com/calendar/ical/andrew.bolster%40gmail.com/public/basic.ics"
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(ical_url)
-            response.raise_for_status()
-
-        ical_content = response.text
-        events: list[dict[str, Any]] = []
-        current_event: dict[str, Any] = {}
-
-        for line in ical_content.split("\n"):
-            line = line.strip()
-            if line == "BEGIN:VEVENT":
-                current_event = {}
-            elif line == "END:VEVENT":
-                if current_event:
-                    events.append(current_event.copy())
-                current_event = {}
-            elif line.startswith("DTSTART"):
-                dt_match = re.search(r"DTSTART[^:]*:(\d{8}T?\d{0,6}Z?)", line)
-                if dt_match:
-                    dt_str = dt_match.group(1)
-                    try:
-                        if "T" in dt_str:
-                            if dt_str.endswith("Z"):
-                                dt = datetime.strptime(dt_str, "%Y%m%dT%H%M%SZ")
-                            else:
-                                dt = datetime.strptime(dt_str, "%Y%m%dT%H%M%S")
-                        else:
-                            dt = datetime.strptime(dt_str, "%Y%m%d")
-                        current_event["start"] = dt
-                    except ValueError:
-                        pass
-            elif line.startswith("DTEND"):
-                dt_match = re.search(r"DTEND[^:]*:(\d{8}T?\d{0,6}Z?)", line)
-                if dt_match:
-                    dt_str = dt_match.group(1)
-                    try:
-                        if "T" in dt_str:
-                            if dt_str.endswith("Z"):
-                                dt = datetime.strptime(dt_str, "%Y%m%dT%H%M%SZ")
-                            else:
-                                dt = datetime.strptime(dt_str, "%Y%m%dT%H%M%S")
-                        else:
-                            dt = datetime.strptime(dt_str, "%Y%m%d")
-                        current_event["end"] = dt
-                    except ValueError:
-                        pass
-            elif line.startswith("SUMMARY"):
-                current_event["summary"] = line.split(":", 1)[1] if ":" in line else ""
-
-        relevant_events = [
-            event
-            for event in events
-            if "start" in event
-            and "end" in event
-            and isinstance(event["start"], datetime)
-            and isinstance(event["end"], datetime)
-            and event["start"] <= end_dt
-            and event["end"] >= start_dt
-        ]
+        snapshot, error = await upstream.fetch_or_last(upstream.ICAL_URL)
+        if error is not None:
+            await ctx.warning(f"Calendar feed unavailable, using last copy: {error}")
+        events = _calendar_events(snapshot)
+        relevant_events = _events_between(events, start_dt, end_dt)
 
         await ctx.info(f"Found {len(relevant_events)} events in range")
 
-        if not relevant_events:
-            return f"""Calendar availability for {start_dt.strftime("%Y-%m-%d")} to {end_dt.strftime("%Y-%m-%d")}:
-
-✅ No scheduled events found in the public calendar for this period.
-
-Note: This shows only publicly visible calendar events. Private events and detailed scheduling should be confirmed directly."""
-
-        event_list = []
-        for event in sorted(relevant_events, key=lambda x: x["start"]):
-            start_str = event["start"].strftime("%Y-%m-%d %H:%M")
-            end_str = event["end"].strftime("%Y-%m-%d %H:%M")
-            summary = event.get("summary", "Busy")
-            event_list.append(f"  📅 {start_str} - {end_str}: {summary}")
-
-        return f"""Calendar availability for {start_dt.strftime("%Y-%m-%d")} to {end_dt.strftime("%Y-%m-%d")}:
-
-⚠️  Scheduled events found:
-{chr(10).join(event_list)}
-
-Note: This shows only publicly visible calendar events. For detailed scheduling or to check additional availability, please use the contact tool to reach out directly."""
+        availability = Availability(
+            start=_minutes(start_dt),
+            end=_minutes(end_dt),
+            coverage=Coverage(
+                public_only=True,
+                snapshot_age=round(snapshot.age),
+                stale=error is not None,
+            ),
+        )
+        if compact:
+            availability["blocks"] = _merged_blocks(relevant_events)
+        else:
+            availability["busy"] = [
+                BusyInterval(
+                    start=_minutes(event["start"]),
+                    end=_minutes(event["end"]),
+                    summary=event.get("summary", "Busy"),
+                )
+                for event in sorted(relevant_events, key=lambda x: x["start"])
+            ]
+        return availability
 
     except httpx.HTTPError as e:
         await ctx.warning(f"HTTP error fetching calendar: {e}")
-        return f"Error fetching calendar data: {str(e)}. Please try again later or contact directly."
+        raise ToolError(
+            f"Error fetching calendar data: {str(e)}. Please try again later or contact directly."
+        ) from e
     except Exception as e:
         await ctx.warning(f"Unexpected error in check_availability: {e}")
-        return f"Error processing calendar information: {str(e)}. Please contact directly for availability."
+        raise ToolError(
+            f"Error processing calendar information: {str(e)}. Please contact directly for availability."
+        ) from e
 
 
 class BlogPost(dict):  # type: ignore[type-arg]
     """A single blog post with title, date, url, and summary fields."""
 
 
+def _truncate(text: str, max_chars: int | None) -> str:
+    if max_chars is not None and len(text) > max_chars:
+        return text[: max_chars - 3] + "..."
+    return text
+
+
+def _post_from_item(item: Any, *, max_summary: int | None = 500) -> BlogPost:
+    """A post from an RSS `<item>`, its summary stripped of HTML and truncated."""
+    title_elem = item.find("title")
+    link_elem = item.find("link")
+    description_elem = item.find("description")
+    pub_date_elem = item.find("pubDate")
+
+    title = (title_elem.text or "No title") if title_elem is not None else "No title"
+    link = (link_elem.text or "") if link_elem is not None else ""
+    description = (description_elem.text or "") if description_elem is not None else ""
+    pub_date = (pub_date_elem.text or "") if pub_date_elem is not None else ""
+
+    # Strip HTML tags and truncate
+    description = _truncate(re.sub(r"<[^>]+>", "", description).strip(), max_summary)
+
+    return BlogPost(title=title, date=pub_date, url=link, summary=description)
+
+
+def _slug(url: str) -> str:
+    """The last path segment of a post's URL, without any extension."""
+    return PurePosixPath(urlsplit(url).path).stem.lower()
+
+
+def _parse_rss(content: bytes) -> list[BlogPost]:
+    """Every post in an RSS feed, with full summaries; none if it has no channel."""
+    import xml.etree.ElementTree as ET
+
+    channel = ET.fromstring(content).find("channel")
+    if channel is None:
+        return []
+    return [_post_from_item(item, max_summary=None) for item in channel.findall("item")]
+
+
+# The posts parsed from the latest blog snapshot, reused until it changes
+_parsed_blog: tuple[upstream.Snapshot, list[BlogPost]] | None = None
+
+
+def _feed_posts(snapshot: upstream.Snapshot) -> list[BlogPost]:
+    global _parsed_blog
+    if _parsed_blog is None or _parsed_blog[0] is not snapshot:
+        _parsed_blog = (snapshot, _parse_rss(snapshot.content))
+    return _parsed_blog[1]
+
+
 @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
 async def get_recent_blog_posts(
     ctx: Context,
     limit: Annotated[int, "Number of recent posts to return (1-10)"] = 5,
 ) -> list[BlogPost]:
     """Fetch recent blog posts from Andrew Bolster's RSS feed."""
+    # Deferred so server start-up doesn't pay for the XML parser
+    import xml.etree.ElementTree as ET
+
     limit = min(max(1, limit), 10)
     await ctx.info(f"Fetching {limit} recent blog posts from RSS feed")
 
     try:
-        rss_url = "https://feeds.feedburner.com/ofpenguinsandcoffee"
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(rss_url)
-            response.raise_for_status()
-
-        root = ET.fromstring(response.content)
-        channel = root.find("channel")
-        if channel is None:
-            await ctx.warning("RSS feed has no channel element")
-            return []
-
-        items = channel.findall("item")
-        if not items:
-            await ctx.warning("RSS feed channel has no items")
-            return []
-
-        posts: list[BlogPost] = []
-        for item in items[:limit]:
-            title_elem = item.find("title")
-            link_elem = item.find("link")
-            description_elem = item.find("description")
-            pub_date_elem = item.find("pubDate")
-
-            title = (
-                (title_elem.text or "No title")
-                if title_elem is not None
-                else "No title"
-            )
-            link = (link_elem.text or "") if link_elem is not None else ""
-            description = (
-                (description_elem.text or "") if description_elem is not None else ""
+        snapshot, error = await upstream.fetch_or_last(upstream.RSS_URL)
+        if error is not None:
+            # The posts themselves have no room for a note, so it goes to the log
+            await ctx.warning(
+                f"Blog feed unavailable ({error}); these posts are from a copy "
+                f"fetched {snapshot.age:.0f}s ago"
             )
-            pub_date = (pub_date_elem.text or "") if pub_date_elem is not None else ""
-
-            # Strip HTML tags and truncate
-            description = re.sub(r"<[^>]+>", "", description).strip()
-            if len(description) > 500:
-                description = description[:497] + "..."
+        feed = _feed_posts(snapshot)
+        if not feed:
+            await ctx.warning("RSS feed has no posts")
+            return []
 
-            posts.append(
-                BlogPost(title=title, date=pub_date, url=link, summary=description)
-            )
+        # Copies, so the cached posts keep their full summaries
+        posts = [
+            BlogPost(post, summary=_truncate(post["summary"], 500))
+            for post in feed[:limit]
+        ]
 
         await ctx.info(f"Returning {len(posts)} posts")
         return posts
@@ -455,17 +429,113 @@ async def get_recent_blog_posts(
         return []
 
 
-try:
-    from bolster.cli import cli as _bolster_cli
+@mcp.resource("resource://andrew-bolster/calendar/{date}", mime_type="application/json")
+async def get_calendar_day(date: str) -> dict[str, Any]:
+    """Public calendar events on one day (YYYY-MM-DD). Subscribe to hear when they change."""
+    try:
+        day = datetime.strptime(date, "%Y-%m-%d")
+    except ValueError as e:
+        raise ResourceError(f"Dates are YYYY-MM-DD, not {date!r}") from e
+    events = _calendar_events(await upstream.fetch(upstream.ICAL_URL))
+    on_day = _events_between(events, day, day + timedelta(days=1))
+    return {
+        "date": date,
+        "events": [
+            {
+                "start": event["start"].isoformat(),
+                "end": event["end"].isoformat(),
+                "summary": event.get("summary", "Busy"),
+            }
+            for event in sorted(on_day, key=lambda e: e["start"])
+        ],
+    }
+
+
+@mcp.resource("resource://andrew-bolster/blog", mime_type="application/json")
+async def get_blog_index() -> dict[str, Any]:
+    """The ten most recent blog posts. Subscribe to hear about new ones."""
+    posts = _feed_posts(await upstream.fetch(upstream.RSS_URL))
+    return {
+        "posts": [
+            {
+                "title": post["title"],
+                "date": post["date"],
+                "url": post["url"],
+                "slug": _slug(post["url"]),
+            }
+            for post in posts[:10]
+        ]
+    }
+
+
+@mcp.resource("resource://andrew-bolster/blog/{slug}", mime_type="application/json")
+async def get_blog_post(slug: str) -> BlogPost:
+    """One blog post from the RSS feed, by the last part of its URL."""
+    posts = _feed_posts(await upstream.fetch(upstream.RSS_URL))
+    for post in posts:
+        if _slug(post["url"]) == slug.lower():
+            return post
+    raise ResourceError(f"No post {slug!r} in the blog feed")
+
+
+# Subscribers to these hear when a refresh of the feed changes what they read
+subscriptions.install(
+    mcp,
+    {
+        "resource://andrew-bolster/calendar/": "calendar",
+        "resource://andrew-bolster/blog": "blog",
+    },
+)
+
 
-    from click_mcp import register_click_commands
+try:
+    from click_mcp import ResultCache, ResultStore, register_click_manifest
 
-    register_click_commands(
-        mcp, _bolster_cli, prefix="bolster", exclude={"list-sources"}
+    if SHARED_CACHE is not None:
+        bolster_cache: ResultCache = shared_cache.SharedResultCache(
+            SHARED_CACHE, ttl=900
+        )
+        bolster_pages: ResultStore = shared_cache.SharedResultStore(SHARED_CACHE)
+    else:
+        bolster_cache, bolster_pages = ResultCache(ttl=900), ResultStore()
+    metrics.track_result_cache("bolster", bolster_cache)
+
+    # Tools come from a manifest keyed by the installed bolster version, so the
+    # bolster CLI (and its dependencies) is only imported on the first call.
+    register_click_manifest(
+        mcp,
+        "bolster.cli:cli",
+        manifest_path=CACHE_DIR / "bolster-click-manifest.json",
+        version=dist_version("bolster"),
+        prefix="bolster",
+        exclude={"list-sources"},
+        stream_output=True,
+        page_size=200,
+        result_store=bolster_pages,
+        timeout=120,
+        max_concurrency=4,
+        batch=True,
+        result_cache=bolster_cache,
+        observer=metrics.ClickMetrics(),
     )
 except ImportError:
     pass
 
 
+def http_app() -> Any:
+    """
+    ASGI app for serving with uvicorn, e.g. with several workers:
+
+        uvicorn app:http_app --factory --workers 4 --port 9001
+
+    Sessions are stateless unless `MCP_BOLSTER_STATELESS=0`, so any worker
+    can answer any request. Resource subscriptions need a session, so they
+    are only offered when sessions are kept.
+    """
+    stateless = os.environ.get("MCP_BOLSTER_STATELESS", "1") != "0"
+    subscriptions.enabled = not stateless
+    return mcp.http_app(stateless_http=stateless)
+
+
 if __name__ == "__main__":
     mcp.run()
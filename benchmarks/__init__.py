@@ -0,0 +1 @@
+"""Performance benchmarks for the MCP server and click_mcp harness."""
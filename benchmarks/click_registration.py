@@ -0,0 +1,77 @@
+"""
+Benchmark click_mcp registration against synthetic Click trees.
+
+Reports wall time and retained memory per registered tool so regressions in
+the registration path show up as numbers rather than slow deploys.
+
+Usage:
+    uv run python -m benchmarks.click_registration --commands 1000 10000
+    uv run python -m benchmarks.click_registration --output bench-click.json
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+from fastmcp import FastMCP
+
+from click_mcp import build_manifest, register_click_commands, register_from_manifest
+from tests.fixtures.fake_cli.generator import build_large_cli
+
+
+def measure(
+    n_commands: int, *, mode: str = "eager", fanout: int = 20
+) -> dict[str, Any]:
+    """
+    Register a synthetic CLI of `n_commands` leaves and measure the cost.
+
+    A small `fanout` makes the tree deep (e.g. 2 gives log2(n) levels).
+    """
+    cli = build_large_cli(n_commands, fanout=fanout)
+    manifest = build_manifest(cli, version="bench") if mode == "manifest" else None
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    server = FastMCP(name="bench")
+    if manifest is not None:
+        names = register_from_manifest(server, manifest, lambda: cli)
+    else:
+        names = register_click_commands(server, cli)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "mode": mode,
+        "commands": n_commands,
+        "tools": len(names),
+        "seconds": round(elapsed, 4),
+        "us_per_tool": round(elapsed / len(names) * 1e6, 1),
+        "bytes_per_tool": current // len(names),
+        "peak_bytes": peak,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = [
+        measure(n, mode=mode) for n in args.commands for mode in ("eager", "manifest")
+    ]
+    for r in results:
+        print(
+            f"{r['mode']:>8} {r['commands']:>6} commands: {r['seconds']:.3f}s "
+            f"({r['us_per_tool']:.0f} µs/tool, {r['bytes_per_tool'] / 1024:.1f} KiB/tool)"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
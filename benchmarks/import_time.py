@@ -0,0 +1,111 @@
+"""
+Report what a cold import of the server costs, from `python -X importtime`.
+
+Every deploy restarts the service, so import time is start-up time. The
+report gives the total, the time spent in this project's own modules, the
+slowest top-level packages and the modules imported that ought to be
+deferred until first use.
+
+Usage:
+    uv run python -m benchmarks.import_time
+    uv run python -m benchmarks.import_time --top 20 --output bench-import.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# This project's top-level modules (flat layout)
+OWN_MODULES = {p.stem for p in ROOT.glob("*.py")}
+
+# Imported only when first needed; a cold `import app` must not pull these in
+DEFERRED = ("bolster", "ctypes", "tomllib", "xml.etree.ElementTree")
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """`(module, self µs, cumulative µs)` for each line of `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(
+    target: str = "app:mcp", env: Mapping[str, str] | None = None
+) -> dict[str, Any]:
+    """Import `module:attribute` in a fresh interpreter and summarise the cost."""
+    module, _, attribute = target.partition(":")
+    code = (
+        "import json, sys; "
+        f"import {module}; "
+        + (f"{module}.{attribute}; " if attribute else "")
+        + "print(json.dumps(sorted(sys.modules)))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = parse_importtime(proc.stderr)
+    loaded = set(json.loads(proc.stdout.splitlines()[-1]))
+    by_package: dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    return {
+        "target": target,
+        "total_seconds": round(sum(r[1] for r in rows) / 1e6, 4),
+        "own_seconds": round(
+            sum(s for n, s, _ in rows if n.split(".")[0] in OWN_MODULES) / 1e6, 4
+        ),
+        "modules": len(rows),
+        "packages": {
+            name: round(us / 1e6, 4)
+            for name, us in sorted(by_package.items(), key=lambda kv: -kv[1])
+        },
+        "slowest": [
+            {"module": n, "self_seconds": round(s / 1e6, 4)}
+            for n, s, _ in sorted(rows, key=lambda r: -r[1])[:50]
+        ],
+        "not_deferred": [m for m in DEFERRED if m in loaded],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("target", nargs="?", default="app:mcp")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = measure(args.target)
+    print(
+        f"{report['target']}: {report['total_seconds']:.3f}s over "
+        f"{report['modules']} modules ({report['own_seconds']:.3f}s in this project)"
+    )
+    print("Slowest packages (self time):")
+    for name, seconds in list(report["packages"].items())[: args.top]:
+        print(f"  {seconds:8.3f}s  {name}")
+    print("Slowest modules (self time):")
+    for row in report["slowest"][: args.top]:
+        print(f"  {row['self_seconds']:8.3f}s  {row['module']}")
+    if report["not_deferred"]:
+        print(f"Imported eagerly but should be deferred: {report['not_deferred']}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Load-test the server's tools end to end against local stand-in upstreams.
+
+A local HTTP server serves generated calendars and RSS feeds in place of
+Google Calendar and Feedburner, and the real tools are driven through a
+`fastmcp` `Client` over the in-memory and streamable HTTP transports at
+each requested concurrency. The `fake_cli` Click tools are covered too.
+Throughput and p50/p99 latency are printed and can be saved as JSON for
+comparison between runs. Admission control is switched off so the
+server's own capacity is measured; `--admission` keeps it on to see how
+load is shed (rejected calls are counted as errors).
+
+Usage:
+    uv run python -m benchmarks.load_test
+    uv run python -m benchmarks.load_test --events 1000 100000 --items 10000 \\
+        --concurrency 1 16 --transport memory http --output bench-load.json
+"""
+
+import argparse
+import contextlib
+import json
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import anyio
+import uvicorn
+from fastmcp import Client, FastMCP
+
+import upstream
+from click_mcp import register_click_commands
+from tests.fixtures.fake_cli.cli import cli as fake_cli
+from tests.fixtures.feeds import generate_ical, generate_rss
+
+SCENARIOS = ("calendar", "blog", "click")
+TRANSPORTS = ("memory", "http")
+
+
+@dataclass
+class Scenario:
+    name: str
+    tool: str
+    args: dict[str, Any]
+    size: int | None = None
+
+
+@contextlib.contextmanager
+def stand_in_upstreams(events: int, items: int) -> Iterator[str]:
+    """Serve generated feeds locally and point `upstream` at them."""
+    bodies = {
+        "/calendar.ics": generate_ical(events).encode(),
+        "/feed.xml": generate_rss(items).encode(),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            body = bodies.get(self.path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    saved = upstream.ICAL_URL, upstream.RSS_URL, dict(upstream.FEEDS)
+    upstream.ICAL_URL = f"{base}/calendar.ics"
+    upstream.RSS_URL = f"{base}/feed.xml"
+    upstream.FEEDS.update(calendar=upstream.ICAL_URL, blog=upstream.RSS_URL)
+    upstream.clear_snapshots()
+    try:
+        yield base
+    finally:
+        upstream.ICAL_URL, upstream.RSS_URL = saved[:2]
+        upstream.FEEDS.clear()
+        upstream.FEEDS.update(saved[2])
+        upstream.clear_snapshots()
+        httpd.shutdown()
+        httpd.server_close()
+
+
+@contextlib.asynccontextmanager
+async def serve_http(server: FastMCP) -> AsyncIterator[str]:
+    """Run `server` under uvicorn on a free local port; yields its MCP URL."""
+    config = uvicorn.Config(
+        server.http_app(), host="127.0.0.1", port=0, log_level="warning"
+    )
+    http = uvicorn.Server(config)
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(http.serve)
+        while not http.started:
+            await anyio.sleep(0.01)
+        port = http.servers[0].sockets[0].getsockname()[1]
+        try:
+            yield f"http://127.0.0.1:{port}/mcp"
+        finally:
+            http.should_exit = True
+
+
+@contextlib.asynccontextmanager
+async def connect(server: FastMCP, transport: str) -> AsyncIterator[Client]:
+    if transport == "memory":
+        async with Client(server) as client:
+            yield client
+    else:
+        async with serve_http(server) as url, Client(url) as client:
+            yield client
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted `values`."""
+    if not values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+async def drive(
+    client: Client,
+    tool: str,
+    args: dict[str, Any],
+    *,
+    requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    """Call `tool` `requests` times with at most `concurrency` in flight."""
+    latencies: list[float] = []
+    errors = 0
+    limiter = anyio.CapacityLimiter(concurrency)
+
+    async def one() -> None:
+        nonlocal errors
+        async with limiter:
+            start = time.perf_counter()
+            result = await client.call_tool(tool, args, raise_on_error=False)
+            latencies.append(time.perf_counter() - start)
+            errors += bool(result.is_error)
+
+    start = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        for _ in range(requests):
+            tg.start_soon(one)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+def _click_server() -> FastMCP:
+    server = FastMCP(name="fake-cli")
+    register_click_commands(server, fake_cli, prefix="fake", max_concurrency=8)
+    return server
+
+
+async def run(
+    *,
+    events: list[int],
+    items: list[int],
+    concurrency: list[int],
+    transports: list[str],
+    scenarios: list[str],
+    requests: int,
+    snapshot_max_age: float | None = None,
+    admission_control: bool = False,
+) -> list[dict[str, Any]]:
+    """Run every scenario/size/transport/concurrency combination."""
+    import admission
+    from app import mcp
+
+    if admission.active is not None:
+        admission.active.enabled = admission_control
+
+    plans: list[tuple[FastMCP, Scenario, int, int]] = []
+    if "calendar" in scenarios:
+        args = {"start_date": "2026-01-01", "days_ahead": 7}
+        plans += [
+            (mcp, Scenario("calendar", "check_availability", args, n), n, 1)
+            for n in events
+        ]
+    if "blog" in scenarios:
+        plans += [
+            (mcp, Scenario("blog", "get_recent_blog_posts", {"limit": 10}, n), 1, n)
+            for n in items
+        ]
+    if "click" in scenarios:
+        click_server = _click_server()
+        plans += [
+            (
+                click_server,
+                Scenario("click-text", "fake_greet", {"name": "load"}),
+                1,
+                1,
+            ),
+            (
+                click_server,
+                Scenario("click-json", "fake_data_fetch", {"limit": 50}),
+                1,
+                1,
+            ),
+        ]
+
+    saved_max_age = upstream.SNAPSHOT_MAX_AGE
+    if snapshot_max_age is not None:
+        upstream.SNAPSHOT_MAX_AGE = snapshot_max_age
+    results = []
+    try:
+        for server, scenario, n_events, n_items in plans:
+            with stand_in_upstreams(n_events, n_items):
+                for transport in transports:
+                    async with connect(server, transport) as client:
+                        # One untimed call warms the snapshot and connections
+                        await client.call_tool(
+                            scenario.tool, scenario.args, raise_on_error=False
+                        )
+                        for c in concurrency:
+                            stats = await drive(
+                                client,
+                                scenario.tool,
+                                scenario.args,
+                                requests=requests,
+                                concurrency=c,
+                            )
+                            results.append(
+                                {
+                                    "scenario": scenario.name,
+                                    "size": scenario.size,
+                                    "transport": transport,
+                                    "concurrency": c,
+                                    **stats,
+                                }
+                            )
+    finally:
+        upstream.SNAPSHOT_MAX_AGE = saved_max_age
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, nargs="+", default=[1000, 100_000])
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 10_000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument(
+        "--transport", nargs="+", choices=TRANSPORTS, default=list(TRANSPORTS)
+    )
+    parser.add_argument(
+        "--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument(
+        "--snapshot-max-age",
+        type=float,
+        help="Feed snapshot lifetime in seconds (0 downloads on every call)",
+    )
+    parser.add_argument(
+        "--admission",
+        action="store_true",
+        help="Keep the server's rate limits and concurrency admission on",
+    )
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = anyio.run(
+        lambda: run(
+            events=args.events,
+            items=args.items,
+            concurrency=args.concurrency,
+            transports=args.transport,
+            scenarios=args.scenario,
+            requests=args.requests,
+            snapshot_max_age=args.snapshot_max_age,
+            admission_control=args.admission,
+        )
+    )
+    for r in results:
+        size = "" if r["size"] is None else f" ×{r['size']}"
+        print(
+            f"{r['scenario'] + size:>18} {r['transport']:>6} c={r['concurrency']:<3} "
+            f"{r['throughput']:>8.1f} req/s  p50 {r['p50_ms']:>8.2f} ms  "
+            f"p99 {r['p99_ms']:>8.2f} ms  errors {r['errors']}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
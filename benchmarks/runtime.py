@@ -0,0 +1,214 @@
+"""
+Compare the server's runtime modes (see `main.py`) on its own tools.
+
+Each mode is started with `python main.py --mode <mode>` in a subprocess,
+reading generated feeds from local stand-in upstreams, and driven over
+streamable HTTP by a `fastmcp` `Client` at each requested concurrency.
+A plain `GET /live` scenario isolates the event loop and HTTP parser from
+the tools' own work. The modes take turns over several rounds, so drift
+in a shared machine's load does not favour whichever ran first. Requests
+per second and p50/p99 latency are printed per mode and round and can be
+saved as JSON.
+
+Usage:
+    uv sync --extra fast
+    uv run python -m benchmarks.runtime
+    uv run python -m benchmarks.runtime --mode standard fast --workers 2 \\
+        --concurrency 1 32 --output bench-runtime.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import anyio
+import httpx
+from fastmcp import Client
+
+from benchmarks.load_test import drive, percentile, stand_in_upstreams
+from main import MODES
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "live": None,
+    "calendar": ("check_availability", {"start_date": "2026-01-01", "days_ahead": 7}),
+    "blog": ("get_recent_blog_posts", {"limit": 10}),
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def serve(mode: str, workers: int, feeds: str) -> AsyncIterator[str]:
+    """Run `main.py` in `mode` against the stand-in feeds; yields its base URL."""
+    port = _free_port()
+    env = dict(
+        os.environ,
+        MCP_BOLSTER_ICAL_URL=f"{feeds}/calendar.ics",
+        MCP_BOLSTER_RSS_URL=f"{feeds}/feed.xml",
+    )
+    env.pop("MCP_BOLSTER_SHARED_CACHE", None)
+    proc = subprocess.Popen(
+        [sys.executable, "main.py", "--mode", mode, "--port", str(port)]
+        + ["--workers", str(workers)],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient() as client:
+            deadline = time.monotonic() + 30
+            while True:
+                with contextlib.suppress(httpx.TransportError):
+                    if (await client.get(f"{base}/live")).status_code == 200:
+                        break
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"{mode} server did not start")
+                await anyio.sleep(0.1)
+        yield base
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+async def _ignore_log(message: Any) -> None:
+    pass
+
+
+async def drive_live(base: str, *, requests: int, concurrency: int) -> dict[str, Any]:
+    """`GET /live` `requests` times over keep-alive connections."""
+    latencies: list[float] = []
+    errors = 0
+    limiter = anyio.CapacityLimiter(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits) as client:
+
+        async def one() -> None:
+            nonlocal errors
+            async with limiter:
+                start = time.perf_counter()
+                response = await client.get("/live")
+                latencies.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+
+        await one()
+        latencies.clear()
+        start = time.perf_counter()
+        async with anyio.create_task_group() as tg:
+            for _ in range(requests):
+                tg.start_soon(one)
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "throughput": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+async def run(
+    *,
+    modes: list[str],
+    scenarios: list[str],
+    concurrency: list[int],
+    requests: int,
+    workers: int,
+    events: int,
+    items: int,
+    rounds: int = 1,
+) -> list[dict[str, Any]]:
+    """Run every mode/scenario/concurrency combination, `rounds` times over."""
+    results = []
+    with stand_in_upstreams(events, items) as feeds:
+        for round, mode in ((r, m) for r in range(1, rounds + 1) for m in modes):
+            async with serve(mode, workers, feeds) as base:
+                for name in scenarios:
+                    for c in concurrency:
+                        if SCENARIOS[name] is None:
+                            stats = await drive_live(
+                                base, requests=requests, concurrency=c
+                            )
+                        else:
+                            tool, args = SCENARIOS[name]
+                            async with Client(
+                                f"{base}/mcp", log_handler=_ignore_log
+                            ) as client:
+                                # One untimed call warms the snapshot
+                                await client.call_tool(tool, args, raise_on_error=False)
+                                stats = await drive(
+                                    client,
+                                    tool,
+                                    args,
+                                    requests=requests,
+                                    concurrency=c,
+                                )
+                        results.append(
+                            {
+                                "mode": mode,
+                                "round": round,
+                                "scenario": name,
+                                "concurrency": c,
+                                **stats,
+                            }
+                        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", nargs="+", choices=sorted(MODES), default=list(MODES))
+    parser.add_argument(
+        "--scenario", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS)
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = anyio.run(
+        lambda: run(
+            modes=args.mode,
+            scenarios=args.scenario,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            workers=args.workers,
+            events=args.events,
+            items=args.items,
+            rounds=args.rounds,
+        )
+    )
+    for r in results:
+        print(
+            f"{r['mode']:>9} #{r['round']} {r['scenario']:>9} c={r['concurrency']:<3} "
+            f"{r['throughput']:>8.1f} req/s  p50 {r['p50_ms']:>8.2f} ms  "
+            f"p99 {r['p99_ms']:>8.2f} ms  errors {r['errors']}"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
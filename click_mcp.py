@@ -12,13 +12,119 @@ Usage:
 
     mcp = FastMCP(name="My Server")
     register_click_commands(mcp, my_cli, prefix="my")
+
+For large CLIs, `register_click_manifest` caches the introspected tool
+definitions in a JSON manifest so later starts never import the CLI until a
+tool is actually called:
+
+    register_click_manifest(
+        mcp,
+        "mypackage.cli:cli",
+        manifest_path=Path("~/.cache/my-manifest.json").expanduser(),
+        version=importlib.metadata.version("mypackage"),
+        prefix="my",
+    )
 """
 
-from typing import Any
+import contextlib
+import functools
+import importlib
+import inspect
+import io
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Generic, TypeVar
 
+import anyio
+import anyio.lowlevel
 import click
-from click.testing import CliRunner
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
+from fastmcp.exceptions import ToolError
+from fastmcp.server.dependencies import get_context
+from fastmcp.server.providers import Provider
+from fastmcp.tools import Tool, ToolResult
+from fastmcp.utilities.versions import VersionSpec
+from mcp import McpError
+from mcp.types import ErrorData
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    ValidationError,
+    create_model,
+)
+from pydantic.json_schema import SkipJsonSchema
+
+# Bump when the manifest layout changes so stale files are rebuilt.
+MANIFEST_FORMAT = 3
+
+# Result cap for streamed commands; the client already saw the full output.
+STREAM_RESULT_CHARS = 8_000
+
+# Streamed output queued for the client before the command is made to wait.
+STREAM_PENDING_CHARS = 64_000
+
+# Output schema for commands run in JSON mode. Row shapes depend on the
+# upstream data, so the parsed document is declared as an untyped `result`.
+JSON_RESULT_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "result": {"description": "Parsed JSON output of the command."},
+        "next_cursor": {
+            "anyOf": [{"type": "string"}, {"type": "null"}],
+            "description": "Cursor for the next page of a paginated result.",
+        },
+        "total": {"type": "integer", "description": "Rows in the full result."},
+    },
+    "required": ["result"],
+    "x-fastmcp-wrap-result": True,
+}
+
+# Most items one `<prefix>_batch` call may run.
+BATCH_MAX_ITEMS = 32
+
+BATCH_RESULT_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "result": {
+            "type": "array",
+            "description": "One entry per item, in input order.",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "command": {"type": "string"},
+                    "ok": {"type": "boolean"},
+                    "result": {"description": "Structured result, or the output text."},
+                    "next_cursor": {"type": "string"},
+                    "error": {"type": "string"},
+                },
+                "required": ["command", "ok"],
+            },
+        }
+    },
+    "required": ["result"],
+    "x-fastmcp-wrap-result": True,
+}
+
+# Lines where a JSON document may start after any status chatter
+_JSON_START = re.compile(r"^[ \t]*[\[{]", re.MULTILINE)
 
 
 def _click_type_to_python(param: click.Parameter) -> type:
@@ -51,134 +157,1118 @@ def _sentinel_is_unset(value: Any) -> bool:
     return type(value).__name__ == "Sentinel"
 
 
-def _build_tool_fn(
-    root_group: click.Group, command_path: list[str], params: list[click.Parameter]
-):
+def _json_format(cmd: click.Command) -> dict[str, str] | None:
+    """Return how to ask `cmd` for JSON output, if its `output_format` offers it."""
+    for param in cmd.params:
+        if param.name != "output_format" or not isinstance(param.type, click.Choice):
+            continue
+        for choice in param.type.choices:
+            if str(choice).lower() == "json":
+                return {**_param_spec(param), "value": str(choice)}
+    return None
+
+
+def _param_spec(param: click.Parameter) -> dict[str, Any]:
+    """Describe how a visible parameter is rendered back onto the command line."""
+    if isinstance(param, click.Argument):
+        return {"name": param.name, "kind": "argument"}
+    long_opts = [o for o in param.opts if o.startswith("--")]
+    opt = long_opts[0] if long_opts else param.opts[0]
+    return {
+        "name": param.name,
+        "kind": "flag" if _is_flag(param) else "option",
+        "opt": opt,
+    }
+
+
+def _build_argv(specs: list[dict[str, Any]], kwargs: dict[str, Any]) -> list[str]:
+    """Turn tool keyword arguments into Click argv (options first, then arguments)."""
+    args: list[str] = []
+    positional_args: list[str] = []
+    for spec in specs:
+        val = kwargs.get(spec["name"])
+        if val is None:
+            continue
+        if spec["kind"] == "argument":
+            positional_args.append(str(val))
+        elif spec["kind"] == "flag":
+            if val:
+                args.append(spec["opt"])
+        else:
+            args.extend([spec["opt"], str(val)])
+    args.extend(positional_args)
+    return args
+
+
+class _OutputCapture:
+    """
+    Collects a command's stdout/stderr, keeping at most `limit` characters.
+
+    Output past the limit is counted but not stored, so a command printing a
+    huge table costs bounded memory. `on_write` sees every chunk, including
+    the ones that are not kept.
+    """
+
+    def __init__(
+        self,
+        limit: int | None = None,
+        on_write: Callable[[str], None] | None = None,
+    ) -> None:
+        self.limit = limit
+        self.on_write = on_write
+        self.total = 0
+        self._parts: list[str] = []
+        self._kept = 0
+
+    def write(self, text: str) -> int:
+        self.total += len(text)
+        if self.limit is None or self._kept < self.limit:
+            keep = text if self.limit is None else text[: self.limit - self._kept]
+            self._parts.append(keep)
+            self._kept += len(keep)
+        if self.on_write is not None and text:
+            self.on_write(text)
+        return len(text)
+
+    def getvalue(self) -> str:
+        value = "".join(self._parts).strip()
+        omitted = self.total - self._kept
+        if omitted > 0:
+            value += (
+                f"\n… [output truncated: {omitted} of {self.total} characters "
+                "not shown]"
+            )
+        return value
+
+
+# Output of the command running in the current thread/task, if any
+_active_capture: ContextVar[_OutputCapture | None] = ContextVar(
+    "click_mcp_capture", default=None
+)
+
+
+class _StreamRouter(io.TextIOBase):
+    """
+    Stand-in for sys.stdout/sys.stderr that sends writes to the active capture.
+
+    CliRunner swaps the process-wide streams for the duration of a call, so
+    two commands running at once write into each other's buffers. Routing
+    through a context variable keeps concurrent calls separate, and anything
+    written outside a call still reaches the original stream.
+    """
+
+    encoding = "utf-8"
+    errors = "strict"
+
+    def __init__(self, fallback: Any) -> None:
+        self.fallback = fallback
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        capture = _active_capture.get()
+        if capture is None:
+            return self.fallback.write(text)
+        return capture.write(text)
+
+    def flush(self) -> None:
+        if _active_capture.get() is None:
+            self.fallback.flush()
+
+    def isatty(self) -> bool:
+        return _active_capture.get() is None and self.fallback.isatty()
+
+    def writable(self) -> bool:
+        return True
+
+    def fileno(self) -> int:
+        if _active_capture.get() is not None:
+            raise io.UnsupportedOperation("captured output has no file descriptor")
+        return self.fallback.fileno()
+
+    @property
+    def buffer(self) -> Any:
+        # Binary writes inside a call must not bypass the capture
+        if _active_capture.get() is not None:
+            raise AttributeError("buffer")
+        return self.fallback.buffer
+
+
+class _StdinRouter(io.TextIOBase):
+    """Stand-in for sys.stdin that reads as empty inside a captured command."""
+
+    encoding = "utf-8"
+
+    def __init__(self, fallback: Any) -> None:
+        self.fallback = fallback
+
+    def read(self, size: int | None = -1) -> str:
+        if _active_capture.get() is None:
+            return self.fallback.read(size)
+        return ""
+
+    def readline(self, size: int | None = -1) -> str:  # type: ignore[override]
+        if _active_capture.get() is None:
+            return self.fallback.readline(size)
+        return ""
+
+    def readable(self) -> bool:
+        return True
+
+
+_router_lock = threading.Lock()
+
+
+def _install_routers() -> None:
+    """Put the routers in place (again, if something restored the streams)."""
+    with _router_lock:
+        if not isinstance(sys.stdout, _StreamRouter):
+            sys.stdout = _StreamRouter(sys.stdout)
+        if not isinstance(sys.stderr, _StreamRouter):
+            sys.stderr = _StreamRouter(sys.stderr)
+        if not isinstance(sys.stdin, _StdinRouter):
+            sys.stdin = _StdinRouter(sys.stdin)
+
+
+def _run_command(
+    root_group: click.Group, argv: list[str], capture: _OutputCapture
+) -> int:
+    """Run a Click command in standalone mode with output captured; return its exit code."""
+    _install_routers()
+    token = _active_capture.set(capture)
+    try:
+        root_group.main(args=argv, prog_name=root_group.name, standalone_mode=True)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        # sys.exit("message") prints the message and exits 1
+        capture.write(f"{e.code}\n")
+        return 1
+    finally:
+        _active_capture.reset(token)
+    return 0
+
+
+async def _run_async_command(
+    root_group: click.Group, argv: list[str], capture: _OutputCapture
+) -> int:
     """
-    Build a callable that invokes a Click command via CliRunner and returns stdout.
-    The callable's __annotations__ are set so FastMCP can generate a proper schema.
+    Run a command with a coroutine callback, awaiting it on the current loop.
+
+    Click calls the callback and hands back the coroutine unawaited, so the
+    standalone-mode error handling of `_run_command` is repeated here around
+    the await. Click's context has been popped by then, so callbacks should
+    take it via `pass_context` rather than `get_current_context()`.
     """
-    annotations: dict[str, Any] = {}
-    defaults: dict[str, Any] = {}
+    _install_routers()
+    token = _active_capture.set(capture)
+    try:
+        rv = root_group.main(
+            args=argv, prog_name=root_group.name, standalone_mode=False
+        )
+        if inspect.isawaitable(rv):
+            await rv
+        elif isinstance(rv, int):
+            # Click returns the code of an Exit raised while parsing
+            return rv
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.exceptions.Exit as e:
+        return e.exit_code
+    except click.Abort:
+        capture.write("Aborted!\n")
+        return 1
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        capture.write(f"{e.code}\n")
+        return 1
+    finally:
+        _active_capture.reset(token)
+    return 0
+
+
+def _is_async_command(cmd: click.Command) -> bool:
+    """True if the command's callback, under any decorators, is a coroutine function."""
+    return cmd.callback is not None and inspect.iscoroutinefunction(
+        inspect.unwrap(cmd.callback)
+    )
+
+
+def _render_text(exit_code: int, output: str) -> str:
+    """Render a finished command's output as tool text."""
+    if exit_code != 0:
+        return f"Error (exit {exit_code}):\n{output}"
+    return output or "(no output)"
+
+
+def _parse_json_output(text: str) -> Any:
+    """
+    Parse the JSON document a command printed, skipping leading status lines.
+
+    CLIs often print progress messages before the payload, so the document is
+    taken from the first line where a value parses through to the end.
 
-    for p in params:
-        if _is_internal(p) or p.name is None:
+    Raises:
+        ValueError: If no such document is found.
+    """
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    decoder = json.JSONDecoder()
+    for match in _JSON_START.finditer(text):
+        try:
+            value, end = decoder.raw_decode(text, match.end() - 1)
+        except ValueError:
             continue
-        py_type = _click_type_to_python(p)
-        if _is_flag(p):
-            py_type = bool
-        # Optional if not required and has no non-sentinel default
-        if not p.required:
-            annotations[p.name] = py_type | None
-            default = p.default
-            defaults[p.name] = None if _sentinel_is_unset(default) else default
+        if not text[end:].strip():
+            return value
+    raise ValueError("no JSON document in command output")
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class _ExpiringDict:
+    """A thread-safe dict whose entries expire after `ttl` seconds, capped at `max_entries`."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._entries)
+
+    def get(self, key: Any) -> Any | None:
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._entries.get(key)
+        return None if entry is None else entry[1]
+
+    def put(self, key: Any, value: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._entries.pop(key, None)
+            self._entries[key] = (now + self.ttl, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _expire(self, now: float) -> None:
+        # The TTL is fixed, so insertion order is also expiry order
+        while self._entries:
+            key, (expires, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            del self._entries[key]
+
+
+class ResultStore:
+    """
+    Parks oversized tool results so later pages are served without a re-run.
+
+    Entries expire `ttl` seconds after they are stored, and once more than
+    `max_entries` are held the oldest is dropped, so memory stays bounded
+    however many large results are requested.
+    """
+
+    # Whether get/put block (on disk, say), so callers run them off the loop
+    blocking = False
+
+    def __init__(self, *, ttl: float = 600.0, max_entries: int = 64) -> None:
+        self._entries = _ExpiringDict(ttl, max_entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, items: list[Any], structured: bool) -> str:
+        """Store a result's rows (or lines) and return its key."""
+        key = secrets.token_urlsafe(12)
+        self._entries.put(key, (items, structured))
+        return key
+
+    def get(self, key: str) -> tuple[list[Any], bool] | None:
+        """Return `(items, structured)` for a live key, or None."""
+        return self._entries.get(key)
+
+
+class ResultCache(_ExpiringDict):
+    """
+    Reuses the output of successful runs for `ttl` seconds.
+
+    Keyed by tool name and the exact command line, so repeated calls (and
+    start-up warm-up) skip re-running a command. Only runs that exit 0 are
+    kept, and the raw output is stored so pagination still applies per call.
+    """
+
+    # Whether get/put block (on disk, say), so callers run them off the loop
+    blocking = False
+
+    def __init__(self, *, ttl: float = 300.0, max_entries: int = 256) -> None:
+        super().__init__(ttl, max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Any) -> Any | None:
+        value = super().get(key)
+        if value is None:
+            self.misses += 1
         else:
-            annotations[p.name] = py_type
-
-    annotations["return"] = str
-
-    def tool_fn(**kwargs):
-        args = []
-        positional_args = []
-        for p in params:
-            if _is_internal(p):
-                continue
-            val = kwargs.get(p.name)
-            if val is None:
-                continue
-            if isinstance(p, click.Argument):
-                positional_args.append(str(val))
-                continue
-            flag_name = f"--{p.name.replace('_', '-')}"
-            if _is_flag(p):
-                if val:
-                    args.append(flag_name)
-            else:
-                args.extend([flag_name, str(val)])
-        args.extend(positional_args)
+            self.hits += 1
+        return value
 
-        runner = CliRunner()
-        result = runner.invoke(root_group, command_path + args, catch_exceptions=False)
-        output = result.output.strip()
-        if result.exit_code != 0:
-            err = getattr(result, "stderr", "") or ""
-            return f"Error (exit {result.exit_code}):\n{err or output}"
-        return output or "(no output)"
 
-    tool_fn.__annotations__ = annotations
-    return tool_fn, defaults
+class RunObserver:
+    """
+    Hooks around each command run, e.g. for metrics. Every method is a no-op.
 
+    `queued` and `dequeued` bracket the wait for a concurrency slot (even if
+    the call is cancelled while waiting); `finished` reports how long the
+    command itself ran, whether it completed or not.
+    """
 
-def _walk_and_register(
-    mcp: FastMCP,
-    group: click.Command | click.Group,
-    root_group: click.Group,
-    path: list[str],
-    prefix: str,
-):
-    """Recursively walk the Click command tree, registering leaf commands as tools."""
-    if isinstance(group, click.Group):
-        for name, sub in group.commands.items():
-            _walk_and_register(mcp, sub, root_group, path + [name], prefix)
-        return
-
-    # Leaf command — register as a tool
-    cmd = group
-    tool_name_parts = ([prefix] if prefix else []) + path
-    tool_name = "_".join(p.replace("-", "_") for p in tool_name_parts)
-
-    # Build docstring from command help + param help
-    doc_parts = [cmd.help or f"Run the `{' '.join(path)}` command."]
-    visible_params = [p for p in cmd.params if not _is_internal(p)]
-    if visible_params:
-        doc_parts.append("\nParameters:")
-        for p in visible_params:
-            help_txt = getattr(p, "help", None) or ""
-            choices = (
-                f" Choices: {p.type.choices}"
-                if isinstance(p.type, click.Choice)
-                else ""
+    def queued(self, tool: str) -> None:
+        pass
+
+    def dequeued(self, tool: str) -> None:
+        pass
+
+    def finished(self, tool: str, seconds: float) -> None:
+        pass
+
+
+T = TypeVar("T")
+
+
+async def _off_loop(blocking: bool, fn: Callable[..., T], *args: Any) -> T:
+    """Call a cache method, on a worker thread if the cache blocks."""
+    if blocking:
+        return await anyio.to_thread.run_sync(fn, *args)
+    return fn(*args)
+
+
+class _Paginator:
+    """Splits long results into pages, keeping the remainder in a ResultStore."""
+
+    def __init__(self, store: ResultStore, page_size: int, tool_name: str) -> None:
+        self.store = store
+        self.page_size = page_size
+        self.tool_name = tool_name
+
+    async def first_page(self, items: list[Any], structured: bool) -> ToolResult | None:
+        """Page `items` if they exceed one page; None means return them whole."""
+        if len(items) <= self.page_size:
+            return None
+        key = await _off_loop(self.store.blocking, self.store.put, items, structured)
+        return self._render(key, items, 0, structured)
+
+    async def page(self, cursor: str) -> ToolResult:
+        key, _, offset = cursor.rpartition(":")
+        entry = await _off_loop(self.store.blocking, self.store.get, key)
+        if entry is None or not offset.isdigit():
+            raise ToolError("Unknown or expired cursor; run the command again.")
+        items, structured = entry
+        return self._render(key, items, int(offset), structured)
+
+    def _render(
+        self, key: str, items: list[Any], offset: int, structured: bool
+    ) -> ToolResult:
+        page = items[offset : offset + self.page_size]
+        end = offset + len(page)
+        next_cursor = f"{key}:{end}" if end < len(items) else None
+        text = _compact_json(page) if structured else "\n".join(page)
+        if next_cursor:
+            unit = "rows" if structured else "lines"
+            text += (
+                f"\n… [{unit} {offset + 1}-{end} of {len(items)}; call "
+                f'`{self.tool_name}` with cursor "{next_cursor}" for more]'
             )
-            default = p.default
-            default_str = (
-                "" if _sentinel_is_unset(default) else f" Default: {default!r}."
+        if structured:
+            return ToolResult(
+                content=text,
+                structured_content={
+                    "result": page,
+                    "next_cursor": next_cursor,
+                    "total": len(items),
+                },
+            )
+        return ToolResult(content=text, meta={"next_cursor": next_cursor})
+
+
+async def _text_result(
+    exit_code: int, output: str, paginator: _Paginator | None
+) -> ToolResult:
+    """Render a text-mode run, paging long output from a successful one."""
+    if exit_code != 0:
+        return ToolResult(content=_render_text(exit_code, output), is_error=True)
+    output = _render_text(exit_code, output)
+    if paginator is not None:
+        paged = await paginator.first_page(output.splitlines(), structured=False)
+        if paged is not None:
+            return paged
+    return ToolResult(content=output)
+
+
+async def _json_result(
+    exit_code: int, output: str, paginator: _Paginator | None = None
+) -> ToolResult:
+    """Render a JSON-mode run as compact text plus structured content."""
+    if exit_code != 0:
+        return ToolResult(content=f"Error (exit {exit_code}):\n{output}", is_error=True)
+    try:
+        value = _parse_json_output(output)
+    except ValueError:
+        # Not JSON after all; keep the text so nothing is lost
+        return ToolResult(
+            content=output or "(no output)", structured_content={"result": output}
+        )
+    if paginator is not None and isinstance(value, list):
+        paged = await paginator.first_page(value, structured=True)
+        if paged is not None:
+            return paged
+    return ToolResult(
+        content=_compact_json(value), structured_content={"result": value}
+    )
+
+
+class CommandCancelled(BaseException):
+    """
+    Raised inside a worker thread to stop a command nobody is waiting for.
+
+    A BaseException so the CLI's own `except Exception` handlers cannot
+    swallow it.
+    """
+
+
+class _WorkerCall(Generic[T]):
+    """
+    Wraps a blocking call so it can be interrupted on its worker thread.
+
+    Python cannot kill a thread, but it can raise an exception in one: the
+    command stops at its next bytecode boundary, or as soon as it returns
+    from a blocking C call.
+    """
+
+    def __init__(self, fn: Callable[[], T]) -> None:
+        self.fn = fn
+        self.cancelled = False
+        self._thread_id: int | None = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        with self._lock:
+            if self.cancelled:
+                raise CommandCancelled
+            self._thread_id = threading.get_ident()
+        try:
+            return self.fn()
+        finally:
+            with self._lock:
+                self._thread_id = None
+            if self.cancelled:
+                # Drop an interrupt still pending so it cannot fire in
+                # whatever the pooled thread runs next
+                _set_async_exc(threading.get_ident(), None)
+
+    def interrupt(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            if self._thread_id is not None:
+                _set_async_exc(self._thread_id, CommandCancelled)
+
+
+def _set_async_exc(thread_id: int, exc: type[BaseException] | None) -> None:
+    import ctypes  # Only needed once a run is cancelled
+
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id), ctypes.py_object(exc) if exc else None
+    )
+
+
+async def _run_interruptible(fn: Callable[[], T]) -> T:
+    """
+    Run `fn` on a worker thread, interrupting it if the caller is cancelled.
+
+    The awaiting task returns as soon as it is cancelled (by an MCP cancel
+    or a deadline) instead of waiting for the thread to notice.
+    """
+    call = _WorkerCall(fn)
+    try:
+        return await anyio.to_thread.run_sync(call, abandon_on_cancel=True)
+    except anyio.get_cancelled_exc_class():
+        call.interrupt()
+        raise
+
+
+class _ChunkForwarder:
+    """
+    Relays output written on a worker thread to the client as it happens.
+
+    Chunks are queued by the worker and sent from the event loop by `pump`:
+    as MCP progress notifications when the client supplied a progress token,
+    otherwise as log notifications. Writes coalesce while a send is in
+    flight, and the worker blocks once `max_pending` characters are queued,
+    so a slow client applies back-pressure rather than growing memory.
+    """
+
+    def __init__(self, ctx: Context, logger_name: str, max_pending: int) -> None:
+        self.ctx = ctx
+        self.logger_name = logger_name
+        self.max_pending = max_pending
+        self.sent = 0
+        self._pending: list[str] = []
+        self._pending_size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._wakeup = anyio.Event()
+        self._token = anyio.lowlevel.current_token()
+        self._loop_thread = threading.get_ident()
+
+    def feed(self, text: str) -> None:
+        """Queue a chunk (worker thread, or the loop for async commands)."""
+        if threading.get_ident() == self._loop_thread:
+            # Blocking here would stall the loop and the pump with it
+            with self._cond:
+                if not self._closed:
+                    self._pending.append(text)
+                    self._pending_size += len(text)
+            self._wakeup.set()
+            return
+        with self._cond:
+            while self._pending_size >= self.max_pending and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                return
+            first = not self._pending
+            self._pending.append(text)
+            self._pending_size += len(text)
+        if first:
+            anyio.from_thread.run_sync(self._wakeup.set, token=self._token)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._wakeup.set()
+
+    async def pump(self) -> None:
+        """Send queued chunks until closed and drained (event loop)."""
+        use_progress = bool(
+            self.ctx.request_context
+            and self.ctx.request_context.meta
+            and self.ctx.request_context.meta.progressToken is not None
+        )
+        while True:
+            await self._wakeup.wait()
+            self._wakeup = anyio.Event()
+            with self._cond:
+                chunk = "".join(self._pending)
+                self._pending.clear()
+                self._pending_size = 0
+                done = self._closed
+                self._cond.notify_all()
+            if chunk:
+                self.sent += len(chunk)
+                if use_progress:
+                    await self.ctx.report_progress(self.sent, message=chunk)
+                else:
+                    await self.ctx.log(
+                        chunk, level="info", logger_name=self.logger_name
+                    )
+            if done:
+                return
+
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+_PYTHON_TYPES = {v: k for k, v in _JSON_TYPES.items()}
+
+
+def _is_json_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, str | int | float | bool)
+
+
+def _param_help(param: click.Parameter) -> str:
+    """One-line description of a parameter: help text, choices and default."""
+    help_txt = getattr(param, "help", None) or ""
+    choices = (
+        f" Choices: {param.type.choices}"
+        if isinstance(param.type, click.Choice)
+        else ""
+    )
+    default = param.default
+    default_str = "" if _sentinel_is_unset(default) else f" Default: {default!r}."
+    return f"{help_txt}{choices}{default_str}"
+
+
+def _param_schema(param: click.Parameter) -> dict[str, Any]:
+    """JSON schema for one visible parameter, as FastMCP would derive it."""
+    py_type = bool if _is_flag(param) else _click_type_to_python(param)
+    schema: dict[str, Any] = {"type": _JSON_TYPES[py_type]}
+    if not param.required:
+        # Optional if not required; omitted values fall back to Click's default
+        default = None if _sentinel_is_unset(param.default) else param.default
+        schema = {"anyOf": [schema, {"type": "null"}]}
+        if _is_json_scalar(default):
+            schema["default"] = default
+    description = _param_help(param).strip()
+    if description:
+        schema["description"] = description
+    return schema
+
+
+def _input_schema(params: list[click.Parameter]) -> dict[str, Any]:
+    properties = {p.name: _param_schema(p) for p in params if p.name is not None}
+    schema: dict[str, Any] = {"additionalProperties": False, "properties": properties}
+    required = [p.name for p in params if p.required and p.name is not None]
+    if required:
+        schema["required"] = required
+    schema["type"] = "object"
+    return schema
+
+
+def _arguments_model(schema: dict[str, Any]) -> type[BaseModel]:
+    """
+    Pydantic model checking argument types against an `_input_schema` schema.
+
+    Built from the schema rather than the Click command so manifest tools,
+    which never import the CLI, are checked too. Fields are positional
+    names aliased to the parameters, which may clash with BaseModel's own.
+    """
+    fields: dict[str, Any] = {}
+    for i, (name, prop) in enumerate(schema.get("properties", {}).items()):
+        types = [s["type"] for s in prop.get("anyOf", [prop])]
+        py_type = _PYTHON_TYPES[next(t for t in types if t != "null")]
+        fields[f"p{i}"] = (py_type | None, Field(None, alias=name))
+    return create_model("Arguments", __config__=ConfigDict(extra="forbid"), **fields)
+
+
+def _iter_leaf_commands(
+    group: click.Command | click.Group, path: tuple[str, ...]
+) -> Iterator[tuple[tuple[str, ...], click.Command]]:
+    """Yield (command path, command) for every leaf below `group`, depth-first."""
+    stack = [(path, group)]
+    while stack:
+        path, cmd = stack.pop()
+        if isinstance(cmd, click.Group):
+            # Reversed so leaves come out in declaration order
+            stack.extend(
+                (path + (name,), sub)
+                for name, sub in reversed(list(cmd.commands.items()))
             )
-            doc_parts.append(f"  {p.name}: {help_txt}{choices}{default_str}")
-    docstring = "\n".join(doc_parts)
-
-    tool_fn, defaults = _build_tool_fn(root_group, path, cmd.params)
-    tool_fn.__name__ = tool_name
-    tool_fn.__doc__ = docstring
-
-    # Build keyword-argument wrapper so FastMCP sees named params, not **kwargs
-    # FastMCP inspects the function signature; we need real named args with defaults.
-    sig_params = []
-    for p in visible_params:
-        if p.name is None:
-            continue
-        name = p.name
-        if name in defaults:
-            sig_params.append(f"{name}=defaults['{name}']")
         else:
-            sig_params.append(name)
+            yield path, cmd
 
-    # Always build a named-param wrapper — FastMCP rejects **kwargs signatures.
-    fn_args = ", ".join(sig_params)
-    call_args = ", ".join(f"{p.name}={p.name}" for p in visible_params)
-    if sig_params:
-        wrapper_src = f"def _wrapper({fn_args}):\n    return tool_fn({call_args})\n"
-    else:
-        wrapper_src = "def _wrapper():\n    return tool_fn()\n"
-    ns: dict[str, Any] = {"tool_fn": tool_fn, "defaults": defaults}
-    exec(wrapper_src, ns)  # noqa: S102  # nosec B102
-    wrapper = ns["_wrapper"]
-    wrapper.__name__ = tool_name
-    wrapper.__doc__ = docstring
-    wrapper.__annotations__ = {
-        k: v for k, v in tool_fn.__annotations__.items() if k != "return"
+
+def _tool_name(path: tuple[str, ...], prefix: str) -> str:
+    tool_name_parts = ((prefix,) if prefix else ()) + path
+    return "_".join(p.replace("-", "_") for p in tool_name_parts)
+
+
+class ClickTool(Tool):
+    """A tool that runs one Click leaf command, resolving the CLI via `loader`."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    command_path: list[str]
+    param_specs: list[dict[str, Any]]
+    loader: SkipJsonSchema[Callable[[], click.Group]]
+    json_format: dict[str, str] | None = None
+    stream_output: bool = False
+    max_output_chars: int | None = None
+    paginator: SkipJsonSchema[_Paginator | None] = None
+    max_concurrency: int | None = None
+    is_async: bool = False
+    result_cache: SkipJsonSchema[ResultCache | None] = None
+    observer: SkipJsonSchema[RunObserver | None] = None
+    _limiter: anyio.CapacityLimiter | None = PrivateAttr(default=None)
+    _arguments: type[BaseModel] | None = PrivateAttr(default=None)
+
+    async def run(self, arguments: dict[str, Any]) -> ToolResult:
+        return await self.call(arguments, stream=self.stream_output)
+
+    async def call(self, arguments: dict[str, Any], *, stream: bool) -> ToolResult:
+        """Check the arguments, then run the command within this tool's deadline."""
+        arguments = self.validate_arguments(arguments)
+        if self.timeout is None:
+            return await self._execute(arguments, stream)
+        with anyio.move_on_after(self.timeout):
+            return await self._execute(arguments, stream)
+        # Same error FastMCP raises for its own function tools
+        raise McpError(
+            ErrorData(
+                code=-32000,
+                message=f"Tool '{self.name}' execution timed out after {self.timeout}s",
+            )
+        )
+
+    def validate_arguments(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        """Arguments checked against the input schema, coerced to its types."""
+        properties = self.parameters.get("properties", {})
+        unknown = sorted(set(arguments) - set(properties))
+        if unknown:
+            raise ToolError(f"Unknown arguments for {self.name}: {', '.join(unknown)}")
+        required = self.parameters.get("required", [])
+        missing = [n for n in required if arguments.get(n) is None]
+        if missing:
+            raise ToolError(f"Missing arguments for {self.name}: {', '.join(missing)}")
+        if self._arguments is None:
+            self._arguments = _arguments_model(self.parameters)
+        try:
+            model = self._arguments.model_validate(arguments)
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()
+            )
+            raise ToolError(f"Invalid arguments for {self.name}: {problems}") from e
+        return model.model_dump(by_alias=True)
+
+    def _concurrency_slot(self) -> contextlib.AbstractAsyncContextManager[Any]:
+        if self.max_concurrency is None:
+            return contextlib.nullcontext()
+        if self._limiter is None:
+            # Created on first use, inside the server's event loop
+            self._limiter = anyio.CapacityLimiter(self.max_concurrency)
+        return self._limiter
+
+    @contextlib.asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        """Hold a concurrency slot for one run, reporting to the observer."""
+        observer = self.observer or RunObserver()
+        async with contextlib.AsyncExitStack() as stack:
+            observer.queued(self.name)
+            try:
+                await stack.enter_async_context(self._concurrency_slot())
+            finally:
+                observer.dequeued(self.name)
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                observer.finished(self.name, time.perf_counter() - start)
+
+    async def _execute(self, arguments: dict[str, Any], stream: bool) -> ToolResult:
+        argv = self.command_path + _build_argv(self.param_specs, arguments)
+        if self.json_format is not None:
+            # Neither streamed nor capped: a partial document would not parse
+            argv[len(self.command_path) : len(self.command_path)] = [
+                self.json_format["opt"],
+                self.json_format["value"],
+            ]
+            exit_code, output = await self._output(argv, _OutputCapture())
+            return await _json_result(exit_code, output, self.paginator)
+
+        if not stream:
+            exit_code, output = await self._output(
+                argv, _OutputCapture(self.max_output_chars)
+            )
+            return await _text_result(exit_code, output, self.paginator)
+        cached = await self._cached(argv)
+        if cached is not None:
+            return await _text_result(*cached, self.paginator)
+
+        # The client has already seen the full output, so the result is capped
+        # (and not cached, since it may be cut short)
+        limit = self.max_output_chars or STREAM_RESULT_CHARS
+        forwarder = _ChunkForwarder(get_context(), self.name, STREAM_PENDING_CHARS)
+        capture = _OutputCapture(limit, on_write=forwarder.feed)
+        async with self._slot(), anyio.create_task_group() as tg:
+            tg.start_soon(forwarder.pump)
+            try:
+                exit_code = await self._run_argv(argv, capture)
+            finally:
+                forwarder.close()
+        return ToolResult(
+            content=_render_text(exit_code, capture.getvalue()), is_error=exit_code != 0
+        )
+
+    async def _cached(self, argv: list[str]) -> tuple[int, str] | None:
+        cache = self.result_cache
+        if cache is None:
+            return None
+        return await _off_loop(cache.blocking, cache.get, (self.name, tuple(argv)))
+
+    async def _output(
+        self, argv: list[str], capture: _OutputCapture
+    ) -> tuple[int, str]:
+        """Exit code and output of a run, from the result cache when possible."""
+        cached = await self._cached(argv)
+        if cached is not None:
+            return cached
+        async with self._slot():
+            exit_code = await self._run_argv(argv, capture)
+        output = capture.getvalue()
+        cache = self.result_cache
+        if exit_code == 0 and cache is not None:
+            await _off_loop(
+                cache.blocking, cache.put, (self.name, tuple(argv)), (exit_code, output)
+            )
+        return exit_code, output
+
+    async def _run_argv(self, argv: list[str], capture: _OutputCapture) -> int:
+        if self.is_async:
+            # The first call may import the CLI; keep that off the loop
+            root = await anyio.to_thread.run_sync(self.loader)
+            return await _run_async_command(root, argv, capture)
+        return await _run_interruptible(
+            lambda: _run_command(self.loader(), argv, capture)
+        )
+
+
+class ClickPageTool(Tool):
+    """Companion tool returning later pages of a paginated Click tool result."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    paginator: SkipJsonSchema[_Paginator]
+
+    @classmethod
+    def for_paginator(cls, paginator: _Paginator) -> "ClickPageTool":
+        return cls(
+            name=paginator.tool_name,
+            description=(
+                "Fetch the next page of a long command result, using the cursor "
+                "given with the previous page."
+            ),
+            parameters={
+                "additionalProperties": False,
+                "properties": {
+                    "cursor": {
+                        "type": "string",
+                        "description": "Cursor to resume from.",
+                    }
+                },
+                "required": ["cursor"],
+                "type": "object",
+            },
+            paginator=paginator,
+        )
+
+    async def run(self, arguments: dict[str, Any]) -> ToolResult:
+        return await self.paginator.page(arguments["cursor"])
+
+
+def _batch_item_result(name: str, result: ToolResult) -> dict[str, Any]:
+    entry: dict[str, Any] = {
+        "command": name,
+        "ok": not getattr(result, "is_error", False),
     }
-    wrapper.__annotations__["return"] = str
-    mcp.tool(name=tool_name)(wrapper)
+    if isinstance(result.structured_content, dict):
+        entry["result"] = result.structured_content.get("result")
+        cursor = result.structured_content.get("next_cursor")
+    else:
+        entry["result"] = "\n".join(
+            block.text for block in result.content if hasattr(block, "text")
+        )
+        cursor = (result.meta or {}).get("next_cursor")
+    if cursor:
+        entry["next_cursor"] = cursor
+    return entry
+
+
+class ClickBatchTool(Tool):
+    """
+    Runs several Click tools concurrently in one call.
+
+    Each item goes through its tool's own concurrency limit and deadline, so
+    a batch takes about as long as its slowest command. Items fail
+    independently and results keep the input order.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    tools: SkipJsonSchema[dict[str, Tool]]
+
+    @classmethod
+    def for_tools(cls, name: str, tools: dict[str, Tool]) -> "ClickBatchTool":
+        return cls(
+            name=name,
+            description=(
+                "Run several commands concurrently and return each result in "
+                "input order. Use it instead of consecutive calls, e.g. to "
+                "compare datasets."
+            ),
+            parameters={
+                "additionalProperties": False,
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "minItems": 1,
+                        "maxItems": BATCH_MAX_ITEMS,
+                        "items": {
+                            "additionalProperties": False,
+                            "properties": {
+                                "command": {
+                                    "type": "string",
+                                    "description": "Name of the tool to run.",
+                                },
+                                "args": {
+                                    "type": "object",
+                                    "description": "Arguments for that tool.",
+                                },
+                            },
+                            "required": ["command"],
+                            "type": "object",
+                        },
+                    }
+                },
+                "required": ["items"],
+                "type": "object",
+            },
+            output_schema=BATCH_RESULT_SCHEMA,
+            tools=tools,
+        )
+
+    async def run(self, arguments: dict[str, Any]) -> ToolResult:
+        items = arguments["items"]
+        if len(items) > BATCH_MAX_ITEMS:
+            raise ToolError(f"At most {BATCH_MAX_ITEMS} items per batch.")
+        results: list[dict[str, Any]] = [{} for _ in items]
+
+        async def run_item(index: int, item: dict[str, Any]) -> None:
+            name = item["command"]
+            try:
+                tool = self.tools.get(name)
+                if not isinstance(tool, ClickTool):
+                    raise ToolError(f"Unknown command {name!r}")
+                args = item.get("args") or {}
+                result = await tool.call(args, stream=False)
+            except Exception as e:
+                results[index] = {"command": name, "ok": False, "error": str(e)}
+            else:
+                results[index] = _batch_item_result(name, result)
+
+        async with anyio.create_task_group() as tg:
+            for index, item in enumerate(items):
+                tg.start_soon(run_item, index, item)
+        return ToolResult(
+            content=_compact_json(results), structured_content={"result": results}
+        )
+
+
+def _make_paginator(
+    prefix: str, page_size: int | None, result_store: ResultStore | None
+) -> _Paginator | None:
+    if page_size is None:
+        return None
+    if result_store is None:
+        result_store = ResultStore()
+    return _Paginator(result_store, page_size, _tool_name(("next-page",), prefix))
+
+
+def _json_fields(json_format: dict[str, str] | None, enabled: bool) -> dict[str, Any]:
+    """ClickTool fields for JSON mode, or none if disabled or unsupported."""
+    if not enabled or json_format is None:
+        return {}
+    return {"json_format": json_format, "output_schema": JSON_RESULT_SCHEMA}
+
+
+def _build_tool(
+    cmd: click.Command,
+    loader: Callable[[], click.Group],
+    path: tuple[str, ...],
+    prefix: str,
+    options: dict[str, Any],
+    structured_output: bool = True,
+) -> ClickTool:
+    """
+    Build the tool for a single leaf command.
+
+    The input schema is generated straight from the Click params rather than
+    from a synthesised Python signature: FastMCP's per-function pydantic
+    parsing dominated registration time for large CLIs.
+    """
+    visible_params = [
+        p for p in cmd.params if not _is_internal(p) and p.name is not None
+    ]
+    # Param help lives in the schema's property descriptions, not the docstring
+    description = inspect.cleandoc(cmd.help or f"Run the `{' '.join(path)}` command.")
+
+    return ClickTool(
+        name=_tool_name(path, prefix),
+        description=description,
+        parameters=_input_schema(visible_params),
+        command_path=list(path),
+        param_specs=[_param_spec(p) for p in visible_params],
+        loader=loader,
+        is_async=_is_async_command(cmd),
+        **_json_fields(_json_format(cmd), structured_output),
+        **options,
+    )
+
+
+def _iter_tools(
+    root: click.Group,
+    loader: Callable[[], click.Group],
+    prefix: str,
+    exclude: set[str],
+    options: dict[str, Any],
+    structured_output: bool = True,
+) -> Iterator[ClickTool]:
+    """Build a tool for every leaf command outside the excluded top-level names."""
+    for name, cmd in root.commands.items():
+        if name in exclude:
+            continue
+        for path, leaf in _iter_leaf_commands(cmd, (name,)):
+            yield _build_tool(leaf, loader, path, prefix, options, structured_output)
+
+
+class ClickToolProvider(Provider):
+    """
+    Serves Click tools from a name-keyed dict.
+
+    FastMCP's default provider checks every existing component on each
+    `add_tool`, which makes registering thousands of commands quadratic; a
+    dedicated provider keeps bulk registration linear and lookups O(1).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.tools: dict[str, Tool] = {}
+
+    def add(self, tool: Tool) -> None:
+        self.tools[tool.name] = tool
+
+    async def _list_tools(self) -> Sequence[Tool]:
+        return list(self.tools.values())
+
+    async def _get_tool(
+        self, name: str, version: VersionSpec | None = None
+    ) -> Tool | None:
+        return self.tools.get(name)
+
+
+def _register_tools(
+    mcp: FastMCP,
+    tools: Iterable[Tool],
+    paginator: _Paginator | None = None,
+    timeouts: Mapping[str, float] | None = None,
+    batch_name: str | None = None,
+) -> list[str]:
+    provider = ClickToolProvider()
+    for tool in tools:
+        provider.add(tool)
+    for name, timeout in (timeouts or {}).items():
+        if name not in provider.tools:
+            raise ValueError(f"timeout given for unknown tool {name!r}")
+        provider.tools[name].timeout = timeout
+    if batch_name is not None:
+        provider.add(ClickBatchTool.for_tools(batch_name, dict(provider.tools)))
+    if paginator is not None:
+        provider.add(ClickPageTool.for_paginator(paginator))
+    mcp.add_provider(provider)
+    return list(provider.tools)
 
 
 def register_click_commands(
@@ -187,6 +1277,17 @@ def register_click_commands(
     *,
     prefix: str = "",
     exclude: set[str] | None = None,
+    stream_output: bool = False,
+    max_output_chars: int | None = None,
+    structured_output: bool = True,
+    page_size: int | None = None,
+    result_store: ResultStore | None = None,
+    timeout: float | None = None,
+    timeouts: Mapping[str, float] | None = None,
+    max_concurrency: int | None = None,
+    batch: bool = False,
+    result_cache: ResultCache | None = None,
+    observer: RunObserver | None = None,
 ) -> list[str]:
     """
     Walk a Click command group and register every leaf command as an MCP tool.
@@ -196,16 +1297,246 @@ def register_click_commands(
         root: The root Click group to introspect.
         prefix: Optional prefix for all tool names (e.g. the package name).
         exclude: Set of top-level command names to skip.
+        stream_output: Forward output to the client while the command runs,
+            as progress notifications (or log messages if the client sent no
+            progress token).
+        max_output_chars: Cap on the text returned as the tool result; extra
+            output is dropped with a note. Defaults to unlimited, or
+            `STREAM_RESULT_CHARS` when streaming.
+        structured_output: For commands whose `--format` offers `json`, request
+            JSON and return it as structured content (with compact JSON text)
+            instead of the human-oriented table.
+        page_size: Split JSON results longer than this many rows (or text
+            output longer than this many lines) into pages. The first page is
+            returned with a cursor and a `<prefix>_next_page` tool serves the
+            rest from `result_store`. Streamed text output is not paginated.
+        result_store: Where paginated results are kept; defaults to a new
+            `ResultStore`.
+        timeout: Deadline in seconds for every command. When it expires, or
+            the client cancels the call, the command's worker thread is
+            interrupted rather than left running.
+        timeouts: Per-tool deadlines keyed by tool name, overriding `timeout`.
+        max_concurrency: Most calls of any one command allowed to run at once;
+            further calls wait for a slot.
+        batch: Also register a `<prefix>_batch` tool that runs a list of
+            `{command, args}` items concurrently, within each command's
+            deadline and concurrency limit.
+        result_cache: Reuse the output of successful runs from this cache.
+        observer: Told when runs queue for a slot, start and finish.
 
     Returns:
         List of registered tool names.
     """
+    paginator = _make_paginator(prefix, page_size, result_store)
+    options = {
+        "stream_output": stream_output,
+        "max_output_chars": max_output_chars,
+        "paginator": paginator,
+        "timeout": timeout,
+        "max_concurrency": max_concurrency,
+        "result_cache": result_cache,
+        "observer": observer,
+    }
+    tools = _iter_tools(
+        root, lambda: root, prefix, exclude or set(), options, structured_output
+    )
+    batch_name = _tool_name(("batch",), prefix) if batch else None
+    return _register_tools(mcp, tools, paginator, timeouts, batch_name)
+
+
+def build_manifest(
+    root: click.Group,
+    *,
+    version: str,
+    prefix: str = "",
+    exclude: set[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Introspect a Click group into a JSON-serialisable tool manifest.
+
+    The manifest records everything needed to advertise the tools (name,
+    description, input schema) and to rebuild the command line for a call, so
+    `register_from_manifest` never has to import the CLI up front.
+
+    Args:
+        root: The root Click group to introspect.
+        version: Version of the package providing the CLI; the manifest is
+            only reused while this matches.
+        prefix: Optional prefix for all tool names.
+        exclude: Set of top-level command names to skip.
+
+    Returns:
+        The manifest as a plain dict.
+    """
     exclude = exclude or set()
-    registered: list[str] = []
+    tools = [
+        {
+            "name": tool.name,
+            "path": tool.command_path,
+            "description": tool.description,
+            "parameters": tool.parameters,
+            "params": tool.param_specs,
+            "json_format": tool.json_format,
+            "is_async": tool.is_async,
+        }
+        for tool in _iter_tools(root, lambda: root, prefix, exclude, {})
+    ]
+    return {
+        "format": MANIFEST_FORMAT,
+        "version": version,
+        "prefix": prefix,
+        "exclude": sorted(exclude),
+        "tools": tools,
+    }
+
+
+def write_manifest(path: Path, manifest: dict[str, Any]) -> None:
+    """Atomically write a manifest so a concurrent reader never sees half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest))
+    os.replace(tmp, path)
 
-    for name, cmd in root.commands.items():
-        if name in exclude:
-            continue
-        _walk_and_register(mcp, cmd, root, [name], prefix)
 
-    return registered
+def load_manifest(
+    path: Path,
+    *,
+    version: str,
+    prefix: str = "",
+    exclude: set[str] | None = None,
+) -> dict[str, Any] | None:
+    """Return the manifest at `path` if it matches, or None if missing or stale."""
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    expected = {
+        "format": MANIFEST_FORMAT,
+        "version": version,
+        "prefix": prefix,
+        "exclude": sorted(exclude or set()),
+    }
+    if any(manifest.get(k) != v for k, v in expected.items()):
+        return None
+    return manifest
+
+
+def _import_object(import_path: str) -> Any:
+    """Resolve a `module:attribute` string."""
+    module_name, _, attr = import_path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def register_from_manifest(
+    mcp: FastMCP,
+    manifest: dict[str, Any],
+    loader: Callable[[], click.Group],
+    *,
+    stream_output: bool = False,
+    max_output_chars: int | None = None,
+    structured_output: bool = True,
+    page_size: int | None = None,
+    result_store: ResultStore | None = None,
+    timeout: float | None = None,
+    timeouts: Mapping[str, float] | None = None,
+    max_concurrency: int | None = None,
+    batch: bool = False,
+    result_cache: ResultCache | None = None,
+    observer: RunObserver | None = None,
+) -> list[str]:
+    """
+    Register lazy tool stubs described by a manifest.
+
+    Args:
+        mcp: The FastMCP server to register tools on.
+        manifest: A manifest produced by `build_manifest`.
+        loader: Zero-argument callable returning the root Click group. It is
+            first called when a tool is invoked, not at registration time.
+        stream_output: As for `register_click_commands`.
+        max_output_chars: As for `register_click_commands`.
+        structured_output: As for `register_click_commands`.
+        page_size: As for `register_click_commands`.
+        result_store: As for `register_click_commands`.
+        timeout: As for `register_click_commands`.
+        timeouts: As for `register_click_commands`.
+        max_concurrency: As for `register_click_commands`.
+        batch: As for `register_click_commands`.
+        result_cache: As for `register_click_commands`.
+        observer: As for `register_click_commands`.
+
+    Returns:
+        List of registered tool names.
+    """
+    paginator = _make_paginator(manifest["prefix"], page_size, result_store)
+    return _register_tools(
+        mcp,
+        (
+            ClickTool(
+                name=entry["name"],
+                description=entry["description"],
+                parameters=entry["parameters"],
+                command_path=entry["path"],
+                param_specs=entry["params"],
+                loader=loader,
+                stream_output=stream_output,
+                max_output_chars=max_output_chars,
+                paginator=paginator,
+                timeout=timeout,
+                max_concurrency=max_concurrency,
+                result_cache=result_cache,
+                observer=observer,
+                is_async=entry["is_async"],
+                **_json_fields(entry["json_format"], structured_output),
+            )
+            for entry in manifest["tools"]
+        ),
+        paginator,
+        timeouts,
+        _tool_name(("batch",), manifest["prefix"]) if batch else None,
+    )
+
+
+def register_click_manifest(
+    mcp: FastMCP,
+    import_path: str,
+    *,
+    manifest_path: Path,
+    version: str,
+    prefix: str = "",
+    exclude: set[str] | None = None,
+    **options: Any,
+) -> list[str]:
+    """
+    Register a Click CLI's commands from a cached manifest, building it if needed.
+
+    On a manifest hit the CLI module is not imported at all until the first
+    tool call, so server start-up no longer depends on the CLI's import graph.
+    On a miss (first start, or `version` changed) the CLI is imported, the
+    manifest rebuilt and written to `manifest_path`; failures to write it are
+    ignored so a read-only deployment still serves the tools.
+
+    Args:
+        mcp: The FastMCP server to register tools on.
+        import_path: `module:attribute` of the root Click group.
+        manifest_path: Where the JSON manifest is cached.
+        version: Version of the package providing the CLI (the cache key).
+        prefix: Optional prefix for all tool names.
+        exclude: Set of top-level command names to skip.
+        **options: Execution options passed on to `register_from_manifest`.
+
+    Returns:
+        List of registered tool names.
+    """
+    loader = functools.cache(lambda: _import_object(import_path))
+    manifest = load_manifest(
+        manifest_path, version=version, prefix=prefix, exclude=exclude
+    )
+    if manifest is None:
+        manifest = build_manifest(
+            loader(), version=version, prefix=prefix, exclude=exclude
+        )
+        try:
+            write_manifest(manifest_path, manifest)
+        except OSError:
+            pass
+    return register_from_manifest(mcp, manifest, loader, **options)
@@ -0,0 +1,21 @@
+"""Shared pytest fixtures for the app and tests/ suites."""
+
+import pytest
+
+import outbox
+import upstream
+
+
+@pytest.fixture(autouse=True)
+def _fresh_upstream_snapshots():
+    """Each test sees its own mocked feeds rather than an earlier test's snapshot."""
+    upstream.clear_snapshots()
+    yield
+    upstream.clear_snapshots()
+
+
+@pytest.fixture(autouse=True)
+def _own_outbox(tmp_path, monkeypatch):
+    """Contact messages go to a per-test outbox, opened only if used."""
+    monkeypatch.setenv(outbox.OUTBOX_ENV, str(tmp_path / "outbox.sqlite3"))
+    monkeypatch.setattr(outbox, "_outbox", None)
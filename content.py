@@ -0,0 +1,217 @@
+"""
+content.py — Resource text loaded from a data directory, reloaded in place.
+
+The `resource://andrew-bolster/*` documents live as Markdown files in
+`resources/` (or `MCP_BOLSTER_CONTENT_DIR`), one per resource, so editing
+one is a content change rather than a code change. `ContentStore` reads
+them once into immutable `Document`s with their byte size and SHA-256
+digest worked out up front, and `content_lifespan` polls the directory
+for changes, swapping in edited documents without a restart:
+
+    resources/personal-website.md  ->  resource://andrew-bolster/personal-website
+
+A file that is mid-write, unreadable or removed keeps serving its last
+good version.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import anyio.to_thread
+from fastmcp import FastMCP
+from fastmcp.resources import Resource, ResourceContent, ResourceResult
+from fastmcp.server.lifespan import lifespan
+from pydantic import AnyUrl, ConfigDict, Field
+from pydantic.json_schema import SkipJsonSchema
+
+logger = logging.getLogger(__name__)
+
+CONTENT_DIR = Path(
+    os.environ.get("MCP_BOLSTER_CONTENT_DIR", Path(__file__).parent / "resources")
+)
+SUFFIX = ".md"
+
+# How often the directory is checked for edited documents
+POLL_INTERVAL = 2.0
+
+
+@dataclass(frozen=True)
+class Document:
+    """One resource's content, as loaded from its file."""
+
+    name: str
+    text: str
+    data: bytes
+    sha256: str
+    mtime_ns: int
+
+    @classmethod
+    def from_bytes(cls, name: str, data: bytes, mtime_ns: int) -> "Document":
+        return cls(
+            name=name,
+            text=data.decode("utf-8"),
+            data=data,
+            sha256=hashlib.sha256(data).hexdigest(),
+            mtime_ns=mtime_ns,
+        )
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+class ContentStore:
+    """The documents in a directory, replaced wholesale when files change."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self._documents: dict[str, Document] = {}
+        self.loaded_at: float | None = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._documents
+
+    def names(self) -> list[str]:
+        return sorted(self._documents)
+
+    def get(self, name: str) -> Document:
+        """
+        The current version of `name`.
+
+        Raises:
+            KeyError: If there is no such document.
+        """
+        return self._documents[name]
+
+    def reload(self) -> list[str]:
+        """
+        Re-read files whose modification time or size changed.
+
+        Unchanged files are not read at all. Returns the names of documents
+        whose content changed (all of them on the first call).
+        """
+        documents = dict(self._documents)
+        changed = []
+        for path in sorted(self.directory.glob(f"*{SUFFIX}")):
+            name = path.name.removesuffix(SUFFIX)
+            current = documents.get(name)
+            try:
+                document = self._read(path, name, current)
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning("Keeping the last version of %s: %s", path, e)
+                continue
+            if document is None:
+                continue
+            documents[name] = document
+            if current is None or current.sha256 != document.sha256:
+                changed.append(name)
+        # Readers see either the old set of documents or the new one
+        self._documents = documents
+        self.loaded_at = time.time()
+        if changed:
+            logger.info("Loaded %s from %s", ", ".join(changed), self.directory)
+        return changed
+
+    def _read(self, path: Path, name: str, current: Document | None) -> Document | None:
+        """The file's document, or None if it is unchanged or still being written."""
+        before = path.stat()
+        if current is not None and before.st_mtime_ns == current.mtime_ns:
+            if before.st_size == current.size:
+                return None
+        data = path.read_bytes()
+        after = path.stat()
+        if (after.st_mtime_ns, after.st_size) != (before.st_mtime_ns, len(data)):
+            # Changed while we read it; pick it up on the next poll
+            return None
+        return Document.from_bytes(name, data, after.st_mtime_ns)
+
+
+store = ContentStore(CONTENT_DIR)
+
+
+async def _watch(store: ContentStore, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await anyio.to_thread.run_sync(store.reload)
+
+
+@lifespan
+async def content_lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
+    """Reload edited documents in the background for the server's lifetime."""
+    await anyio.to_thread.run_sync(store.reload)
+    task = asyncio.create_task(_watch(store, POLL_INTERVAL))
+    try:
+        yield {}
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+class DocumentResource(Resource):
+    """A resource serving the current version of one document in a store."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    store: SkipJsonSchema[ContentStore] = Field(exclude=True)
+    document: str
+
+    async def read(self) -> ResourceResult:
+        document = self.store.get(self.document)
+        return ResourceResult(
+            [
+                ResourceContent(
+                    document.text,
+                    mime_type=self.mime_type,
+                    meta={"sha256": document.sha256},
+                )
+            ]
+        )
+
+    def to_mcp_resource(self, **overrides: Any) -> Any:
+        """Listed with the current document's size and digest."""
+        resource = super().to_mcp_resource(**overrides)
+        document = self.store.get(self.document)
+        meta = {**(resource.meta or {}), "sha256": document.sha256}
+        return resource.model_copy(update={"size": document.size, "meta": meta})
+
+
+def register(
+    mcp: FastMCP,
+    documents: dict[str, str],
+    *,
+    prefix: str,
+    store: ContentStore = store,
+) -> None:
+    """
+    Register a resource for each `{name: description}` in `documents`.
+
+    Documents are loaded now if the store is empty, so a missing file fails
+    at start-up rather than on first read.
+
+    Raises:
+        FileNotFoundError: If a document has no file in the store's directory.
+    """
+    if store.loaded_at is None:
+        store.reload()
+    for name, description in documents.items():
+        if name not in store:
+            raise FileNotFoundError(store.directory / f"{name}{SUFFIX}")
+        mcp.add_resource(
+            DocumentResource(
+                uri=AnyUrl(f"{prefix}{name}"),
+                # Named as the functions that served them before were
+                name="get_" + name.replace("-", "_"),
+                description=description,
+                store=store,
+                document=name,
+            )
+        )
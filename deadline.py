@@ -0,0 +1,74 @@
+"""
+deadline.py — An overall time budget for each tool call.
+
+A tool call may wait on upstream feeds several times over (a download, a
+retry, a hedged second request), each of which used to have its own
+`timeout=10`. Instead each call now runs under a deadline, and everything
+it waits on takes its time from what is left:
+
+    with deadline.budget(5):
+        ...                       # deadline.remaining() counts down from 5
+
+Budgets nest, and an inner one never extends the outer. Outside any budget
+`remaining()` is None and callers apply their own limits.
+
+The tool budget is `MCP_BOLSTER_TOOL_DEADLINE` seconds (8 by default,
+inside nginx's 60s proxy timeout with room to answer from a stale copy);
+`0` turns it off.
+"""
+
+import contextlib
+import os
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+
+from fastmcp import FastMCP
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+
+ENV_VAR = "MCP_BOLSTER_TOOL_DEADLINE"
+TOOL_BUDGET = 8.0
+
+# The monotonic time by which the current call should be answered
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+def remaining() -> float | None:
+    """Seconds left in the current budget (possibly negative), or None if unbounded."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@contextlib.contextmanager
+def budget(seconds: float) -> Iterator[None]:
+    """Run the block with at most `seconds` left, within any enclosing budget."""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class DeadlineMiddleware(Middleware):
+    """Gives every tool call a budget of `seconds`."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        with budget(self.seconds):
+            return await call_next(context)
+
+
+def install(mcp: FastMCP, seconds: float | None = None) -> bool:
+    """Budget `mcp`'s tool calls unless the budget is 0; returns whether it was."""
+    if seconds is None:
+        seconds = float(os.environ.get(ENV_VAR, TOOL_BUDGET))
+    if seconds <= 0:
+        return False
+    mcp.add_middleware(DeadlineMiddleware(seconds))
+    return True
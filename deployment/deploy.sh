@@ -21,7 +21,11 @@ log_message() {
 # Function to handle errors
 handle_error() {
     log_message "ERROR: Deployment failed at step: $1"
-    # Optionally restart the previous version
+    # The previous version is normally still running; put its code back so a
+    # later restart doesn't pick up the failed one, and make sure it runs
+    if [ -n "$PREVIOUS" ]; then
+        git reset --hard "$PREVIOUS" || true
+    fi
     sudo systemctl start "$SERVICE_NAME" || true
     exit 1
 }
@@ -30,13 +34,29 @@ log_message "Starting deployment process"
 
 cd "$DEPLOYMENT_DIR" || handle_error "Change to deployment directory"
 
-# Stop the service before deployment
-log_message "Stopping MCP service"
-sudo systemctl stop "$SERVICE_NAME" || handle_error "Stop service"
-
-# Pull latest changes
+# Fetch latest changes
 log_message "Pulling latest changes from GitHub"
 git fetch origin main || handle_error "Git fetch"
+
+# Resource text in resources/ is reloaded by the running service, so a push
+# that only changes it needs no restart
+CHANGED=$(git diff --name-only HEAD origin/main)
+CONTENT_ONLY=false
+if [ -n "$CHANGED" ] && ! echo "$CHANGED" | grep -qv '^resources/'; then
+    CONTENT_ONLY=true
+fi
+
+# The running service keeps serving while the new version is built and
+# tested; it is only swapped over at the end. Changes to the process that
+# holds the socket and supervises the workers need a full restart (the
+# socket unit queues connections meanwhile); anything else is a reload that
+# replaces the workers one at a time.
+PREVIOUS=$(git rev-parse HEAD)
+SWAP=reload
+if echo "$CHANGED" | grep -qE '^(main\.py|pyproject\.toml|uv\.lock|deployment/systemd/)'; then
+    SWAP=restart
+fi
+
 git reset --hard origin/main || handle_error "Git reset"
 
 # Re-inject webhook secret (git reset reverts webhook.json to its placeholder)
@@ -50,6 +70,12 @@ else
     log_message "WARNING: WEBHOOK_SECRET not set, skipping secret injection"
 fi
 
+if [ "$CONTENT_ONLY" = true ]; then
+    log_message "Content-only update ($(echo $CHANGED)); the service reloads it without a restart"
+    log_message "📝 Commit: $(git rev-parse HEAD) - $(git log -1 --pretty=format:"%s")"
+    exit 0
+fi
+
 # Redirect all cache dirs to writable location (ProtectSystem=strict makes /var/www/.cache read-only)
 export XDG_CACHE_HOME="/opt/mcp.bolster.online/.cache"
 export UV_CACHE_DIR="/opt/mcp.bolster.online/.cache/uv"
@@ -58,7 +84,8 @@ export PRE_COMMIT_HOME="/opt/mcp.bolster.online/.cache/pre-commit"
 # Update dependencies
 log_message "Updating dependencies"
 UV_CMD=$(which uv 2>/dev/null || echo "/usr/local/bin/uv")
-$UV_CMD sync || handle_error "Dependency update"
+# Compile bytecode up front so the first start after a deploy skips it
+$UV_CMD sync --compile-bytecode || handle_error "Dependency update"
 
 # Run pre-commit checks
 log_message "Running code quality checks"
@@ -83,14 +110,33 @@ print(f'✅ Server name: {app.mcp.name}')
 print(f'✅ Tools: {[t for t in dir(app) if callable(getattr(app, t, None)) and not t.startswith(\"_\")]}')
 " || handle_error "Configuration validation"
 
-# Start the service
-log_message "Starting MCP service"
-sudo systemctl start "$SERVICE_NAME" || handle_error "Start service"
+# Swap the running service over to the new version
+if [ "$SWAP" = restart ] || [ "$(sudo systemctl is-active "$SERVICE_NAME")" != "active" ]; then
+    log_message "Restarting MCP service (connections wait on the socket meanwhile)"
+    sudo systemctl daemon-reload || handle_error "Reload unit files"
+    SOCKET_SINCE=$(systemctl show -p ActiveEnterTimestampMonotonic --value "$SERVICE_NAME.socket")
+    sudo systemctl restart "$SERVICE_NAME" || handle_error "Restart service"
+    # The socket must outlive the service, or connections were refused meanwhile
+    if [ "$(sudo systemctl is-active "$SERVICE_NAME.socket")" != "active" ] ||
+        [ "$(systemctl show -p ActiveEnterTimestampMonotonic --value "$SERVICE_NAME.socket")" != "$SOCKET_SINCE" ]; then
+        log_message "WARNING: $SERVICE_NAME.socket was restarted with the service; connections were refused during the restart"
+    fi
+else
+    log_message "Reloading MCP service (workers replaced one at a time)"
+    sudo systemctl reload "$SERVICE_NAME" || handle_error "Reload service"
+fi
 
-# Wait for service to finish initializing before checking status
-sleep 5
+# Readiness may lag behind start-up (e.g. a feed is down); log it, don't fail
+READY="no response"
+for _ in $(seq 30); do
+    if READY=$(curl -sf --max-time 5 http://localhost:9001/ready); then
+        break
+    fi
+    sleep 1
+done
 if [ "$(sudo systemctl is-active "$SERVICE_NAME")" = "active" ]; then
     log_message "✅ Deployment successful - service is running"
+    log_message "Readiness: $READY"
 else
     handle_error "Service failed to start after deployment"
 fi
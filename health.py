@@ -0,0 +1,184 @@
+"""
+health.py — Liveness, readiness and health reports served by the app.
+
+nginx used to answer `/health` and `/live` itself with fixed JSON, and
+`/ready` only proved the port accepted connections. These routes report
+from inside the process instead:
+
+    /live    the event loop is answering requests
+    /ready   the report, with 200 when the checks below pass and 503 otherwise
+    /health  the same report, always with 200, for people and dashboards
+
+The checks: the event loop is not lagging, callers have not been queueing
+for the worker threads (more of them waiting than there are threads) for
+`MAX_BACKLOG_SECONDS`, and no feed is failing with nothing fresh enough to
+serve in its place. A burst that queues briefly does not make a busy worker
+unready.
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+import anyio
+import anyio.to_thread
+from fastmcp import FastMCP
+from fastmcp.server.lifespan import lifespan
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+import metrics
+import upstream
+import warmup
+
+# How often the event loop is sampled, and the lag above which it is unhealthy
+LAG_INTERVAL = 0.5
+MAX_LOOP_LAG = 1.0
+
+# A failing feed may keep being served from a snapshot up to this old
+MAX_STALE_AGE = 3600.0
+
+# How long more callers than there are worker threads may keep waiting
+MAX_BACKLOG_SECONDS = 5.0
+
+_started_at = time.monotonic()
+_started_wall = time.time()
+
+# Lag measured by the most recent sample; None until the monitor has run
+loop_lag: float | None = None
+
+# Since when the worker threads have been backlogged, if they still are
+_backlogged_since: float | None = None
+
+
+async def _monitor_loop_lag(interval: float) -> None:
+    global loop_lag
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        loop_lag = max(0.0, loop.time() - start - interval)
+        metrics.EVENT_LOOP_LAG.set(loop_lag)
+        _sample_workers()
+
+
+@lifespan
+async def health_lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
+    """Sample event-loop lag (and the worker threads) for the server's lifetime."""
+    global loop_lag, _backlogged_since
+    task = asyncio.create_task(_monitor_loop_lag(LAG_INTERVAL))
+    try:
+        yield {}
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        loop_lag = None
+        _backlogged_since = None
+
+
+def _feed_report(url: str) -> dict[str, Any]:
+    snapshot = upstream.snapshot(url)
+    failure = upstream.failure(url)
+    age = None if snapshot is None else snapshot.age
+    report: dict[str, Any] = {
+        "snapshot_age": age,
+        "stale": age is None or age >= upstream.SNAPSHOT_MAX_AGE,
+        "circuit": upstream.breaker_for(url).state,
+        # Unfetched feeds are fine (they load on first use) unless fetching fails
+        "ok": failure is None or (age is not None and age < MAX_STALE_AGE),
+    }
+    if failure is not None:
+        report["error"] = failure.message
+    return report
+
+
+def _sample_workers() -> anyio.CapacityLimiterStatistics:
+    """The worker thread pool's statistics, noting when a backlog starts or ends."""
+    global _backlogged_since
+    stats = anyio.to_thread.current_default_thread_limiter().statistics()
+    if stats.tasks_waiting <= stats.total_tokens:
+        _backlogged_since = None
+    elif _backlogged_since is None:
+        _backlogged_since = time.monotonic()
+    return stats
+
+
+def _worker_report() -> dict[str, Any]:
+    stats = _sample_workers()
+    backlogged = (
+        0.0 if _backlogged_since is None else time.monotonic() - _backlogged_since
+    )
+    return {
+        "threads_busy": stats.borrowed_tokens,
+        "threads_total": stats.total_tokens,
+        "threads_waiting": stats.tasks_waiting,
+        "backlogged_for": backlogged,
+        "click_queued": int(metrics.CLICK_QUEUE_DEPTH.total()),
+        "ok": backlogged < MAX_BACKLOG_SECONDS,
+    }
+
+
+def _warmup_report() -> dict[str, Any]:
+    status = warmup.status
+    return {
+        "started": status.started_at is not None,
+        "finished": status.finished_at is not None,
+        "pending": status.pending,
+        "failed": dict(status.failed),
+    }
+
+
+def report() -> dict[str, Any]:
+    """The health report; `status` is `ok` when every check passes."""
+    loop = {
+        "lag": loop_lag,
+        "ok": loop_lag is None or loop_lag < MAX_LOOP_LAG,
+    }
+    feeds = {name: _feed_report(url) for name, url in upstream.FEEDS.items()}
+    workers = _worker_report()
+    healthy = loop["ok"] and workers["ok"] and all(f["ok"] for f in feeds.values())
+    error = upstream.last_error
+    return {
+        "status": "ok" if healthy else "degraded",
+        "pid": os.getpid(),
+        "uptime": time.monotonic() - _started_at,
+        "started_at": _started_wall,
+        "event_loop": loop,
+        "feeds": feeds,
+        "workers": workers,
+        "warmup": _warmup_report(),
+        "last_upstream_error": None
+        if error is None
+        else {
+            "feed": upstream.feed_name(error.url),
+            "message": error.message,
+            "seconds_ago": time.monotonic() - error.failed_at,
+        },
+    }
+
+
+def install(mcp: FastMCP) -> None:
+    """Serve `/live`, `/ready` and `/health` from the server's HTTP app."""
+
+    @mcp.custom_route("/live", methods=["GET"], include_in_schema=False)
+    async def live(request: Request) -> JSONResponse:
+        return JSONResponse(
+            {
+                "status": "alive",
+                "pid": os.getpid(),
+                "uptime": time.monotonic() - _started_at,
+            }
+        )
+
+    @mcp.custom_route("/ready", methods=["GET"], include_in_schema=False)
+    async def ready(request: Request) -> JSONResponse:
+        body = report()
+        return JSONResponse(body, status_code=200 if body["status"] == "ok" else 503)
+
+    @mcp.custom_route("/health", methods=["GET"], include_in_schema=False)
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse(report())
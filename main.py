@@ -1,5 +1,221 @@
-def main():
-    print("Hello from mcp-bolster-online!")
+"""
+main.py — Serve the MCP server over HTTP with a chosen runtime mode.
+
+The runtime mode picks uvicorn's event loop and HTTP parser:
+
+- `standard`: asyncio and the pure-Python h11 parser
+- `fast`: uvloop and httptools (`uv sync --extra fast`), falling back to
+  the standard loop or parser, with a warning, when either is missing
+
+In both, idle connections are held open longer than nginx keeps idle
+upstream connections (60s), so a proxied request never lands on a socket
+the app is closing, and the listen backlog absorbs bursts of new
+connections. Every setting can come from the command line or from
+`MCP_BOLSTER_*` variables:
+
+    uv run python main.py --mode fast --workers 2 --port 9001
+    MCP_BOLSTER_RUNTIME=fast MCP_BOLSTER_WORKERS=2 uv run python main.py
+
+`benchmarks/runtime.py` compares the modes on this server's tools.
+
+Under systemd the listening socket can come from socket activation
+(`deployment/systemd/mcp-bolster.socket`), so the port stays open while
+the service restarts. With several workers, `SIGHUP` (`systemctl reload`)
+replaces them one at a time: each new worker finishes start-up, warming
+its feed snapshots from the shared cache, before the old one is sent
+`SIGTERM`, and the old worker stops accepting connections and gives
+requests in flight up to `graceful_shutdown` seconds to finish.
+"""
+
+import argparse
+import dataclasses
+import importlib.util
+import logging
+import os
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ENV_PREFIX = "MCP_BOLSTER_"
+
+# Event loop and HTTP parser per mode
+MODES: dict[str, dict[str, str]] = {
+    "standard": {"loop": "asyncio", "http": "h11"},
+    "fast": {"loop": "uvloop", "http": "httptools"},
+}
+
+# The first descriptor systemd passes with socket activation
+SD_LISTEN_FDS_START = 3
+
+# The module each loop or parser needs, and what to use without it
+_FALLBACKS = {"uvloop": "asyncio", "httptools": "h11"}
+
+
+@dataclass
+class RuntimeConfig:
+    """How to serve `app:http_app` with uvicorn."""
+
+    mode: str = "standard"
+    host: str = "127.0.0.1"
+    port: int = 9001
+    workers: int = 1
+    loop: str | None = None
+    http: str | None = None
+    # Seconds; longer than nginx's 60s upstream `keepalive_timeout`
+    keep_alive: int = 75
+    backlog: int = 2048
+    limit_concurrency: int | None = None
+    # Seconds an old worker is given to finish requests in flight when stopped
+    graceful_shutdown: int = 30
+    # Seconds a replacement worker is given to start before a reload gives up
+    worker_startup: int = 60
+
+    def __post_init__(self) -> None:
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown runtime mode {self.mode!r}")
+        # Anything not set explicitly comes from the mode
+        for name, value in MODES[self.mode].items():
+            if getattr(self, name) is None:
+                setattr(self, name, value)
+
+    @classmethod
+    def from_env(cls, environ: dict[str, str] | None = None) -> "RuntimeConfig":
+        """Read the configuration from `MCP_BOLSTER_*` variables."""
+        return cls(**_env_values(environ))
+
+    def resolved(self) -> "RuntimeConfig":
+        """This configuration, with loops and parsers that are not installed replaced."""
+        choices: dict[str, Any] = {}
+        for name in ("loop", "http"):
+            wanted = getattr(self, name)
+            if wanted in _FALLBACKS and importlib.util.find_spec(wanted) is None:
+                logger.warning(
+                    "%s is not installed; using %s instead", wanted, _FALLBACKS[wanted]
+                )
+                choices[name] = _FALLBACKS[wanted]
+        return dataclasses.replace(self, **choices)
+
+    def uvicorn_options(self, fd: int | None = None) -> dict[str, Any]:
+        """Keyword arguments for `uvicorn.run`, serving on `fd` if given."""
+        address: dict[str, Any] = (
+            {"host": self.host, "port": self.port} if fd is None else {"fd": fd}
+        )
+        return {
+            **address,
+            "workers": self.workers,
+            "loop": self.loop,
+            "http": self.http,
+            "timeout_keep_alive": self.keep_alive,
+            "backlog": self.backlog,
+            "limit_concurrency": self.limit_concurrency,
+            "timeout_graceful_shutdown": self.graceful_shutdown,
+            "timeout_worker_healthcheck": self.worker_startup,
+        }
+
+
+def listen_fd(environ: dict[str, str] | None = None) -> int | None:
+    """
+    The listening socket passed by systemd socket activation, if any.
+
+    Follows `sd_listen_fds(3)`: the sockets start at descriptor 3 and are
+    only meant for the process whose ID is `LISTEN_PID`.
+
+    Raises:
+        ValueError: If more than one socket was passed.
+    """
+    env = os.environ if environ is None else environ
+    if env.get("LISTEN_PID") != str(os.getpid()):
+        return None
+    count = int(env.get("LISTEN_FDS", "0"))
+    if count > 1:
+        raise ValueError(f"Expected one socket from systemd, got {count}")
+    return SD_LISTEN_FDS_START if count else None
+
+
+# How `_env_values` parses each RuntimeConfig setting
+_CONVERTERS: dict[str, Callable[[str], Any]] = {
+    "mode": str,
+    "host": str,
+    "port": int,
+    "workers": int,
+    "loop": str,
+    "http": str,
+    "keep_alive": int,
+    "backlog": int,
+    "limit_concurrency": int,
+    "graceful_shutdown": int,
+    "worker_startup": int,
+}
+
+
+def _env_values(environ: dict[str, str] | None = None) -> dict[str, Any]:
+    """The settings given as `MCP_BOLSTER_*` variables (the mode as `_RUNTIME`)."""
+    env = os.environ if environ is None else environ
+    values: dict[str, Any] = {}
+    for f in dataclasses.fields(RuntimeConfig):
+        raw = env.get(ENV_PREFIX + ("RUNTIME" if f.name == "mode" else f.name.upper()))
+        if raw:
+            values[f.name] = _CONVERTERS[f.name](raw)
+    return values
+
+
+def parse_args(
+    argv: list[str] | None = None, environ: dict[str, str] | None = None
+) -> RuntimeConfig:
+    """Command-line options, over the environment, over the mode's defaults."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=sorted(MODES))
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--loop", choices=["asyncio", "uvloop"])
+    parser.add_argument("--http", choices=["h11", "httptools"])
+    parser.add_argument(
+        "--keep-alive", type=int, help="Seconds to hold an idle connection open"
+    )
+    parser.add_argument("--backlog", type=int, help="Listen backlog")
+    parser.add_argument(
+        "--limit-concurrency",
+        type=int,
+        help="Refuse connections (503) beyond this many at once, per worker",
+    )
+    parser.add_argument(
+        "--graceful-shutdown",
+        type=int,
+        help="Seconds a stopping worker waits for requests in flight",
+    )
+    parser.add_argument(
+        "--worker-startup",
+        type=int,
+        help="Seconds a replacement worker has to start during a reload",
+    )
+    args = parser.parse_args(argv)
+    given = {k: v for k, v in vars(args).items() if v is not None}
+    return RuntimeConfig(**(_env_values(environ) | given))
+
+
+def main(argv: list[str] | None = None) -> None:
+    import uvicorn
+
+    logging.basicConfig(level=logging.INFO)
+    config = parse_args(argv).resolved()
+    fd = listen_fd()
+    if fd is not None:
+        logger.info("Serving on the socket passed by systemd")
+        # Worker processes must not mistake these for their own
+        for name in ("LISTEN_PID", "LISTEN_FDS", "LISTEN_FDNAMES"):
+            os.environ.pop(name, None)
+    logger.info(
+        "Serving in %s mode: %s loop, %s parser, keep-alive %ss, backlog %s",
+        config.mode,
+        config.loop,
+        config.http,
+        config.keep_alive,
+        config.backlog,
+    )
+    uvicorn.run("app:http_app", factory=True, **config.uvicorn_options(fd))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,407 @@
+"""
+metrics.py — Prometheus-style metrics for the server.
+
+Counters, gauges and histograms are kept in process and served by the HTTP
+app at `/metrics` in the Prometheus text format, so CPU and memory limits
+can be sized from real latencies and queue depths. They are hand-rolled
+rather than taken from `prometheus_client`: a handful of labelled series is
+all that is needed.
+
+What is recorded:
+    - `mcp_tool_duration_seconds` / `mcp_resource_duration_seconds`: latency
+      per registered tool or resource template (`unknown` for names that
+      match none) and outcome, with `mcp_in_flight_requests`
+    - `upstream_fetch_duration_seconds` / `upstream_fetch_total`: requests
+      for the calendar and blog feeds, by status code (or `error`, or
+      `cancelled` for a hedged request that lost), with
+      `upstream_retries_total` and `upstream_hedged_total` (by which of the
+      two hedged requests answered first)
+    - `cache_requests_total`: hits and misses of the feed snapshots and of
+      the Click result cache; for feeds also `negative` (a recent failure
+      given back without a download) and `stale` (an old snapshot served
+      because the feed could not be fetched)
+    - `upstream_circuit_state`: each feed's circuit breaker, 0 closed,
+      1 half-open (probing), 2 open
+    - `click_queue_depth` / `click_run_seconds`: Click commands waiting for a
+      concurrency slot, and how long they run
+    - `outbox_messages_total`: contact messages queued, sent, retried after a
+      temporary failure, or given up on (`outbox.py`)
+    - `mcp_admission_rejected_total`: requests refused for being over a
+      client's rate (`rate_limited`) or the server's concurrency (`overloaded`)
+    - `event_loop_lag_seconds`: set by the health monitor (`health.py`)
+"""
+
+import bisect
+import contextlib
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping, Sequence
+
+from fastmcp import FastMCP
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from click_mcp import ResultCache, RunObserver
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans sub-millisecond cache hits up to the bolster tools' deadline
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+Labels = tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _series(name: str, labelnames: Sequence[str], labels: Labels) -> str:
+    if not labelnames:
+        return name
+    pairs = ",".join(
+        f'{k}="{_escape(v)}"' for k, v in zip(labelnames, labels, strict=True)
+    )
+    return f"{name}{{{pairs}}}"
+
+
+class Registry:
+    """The metrics rendered together at one endpoint."""
+
+    def __init__(self) -> None:
+        self.metrics: list[_Metric] = []
+
+    def register(self, metric: "_Metric") -> None:
+        if any(m.name == metric.name for m in self.metrics):
+            raise ValueError(f"Duplicate metric {metric.name!r}")
+        self.metrics.append(metric)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return "".join(metric.render() for metric in self.metrics)
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        *,
+        registry: Registry | None = REGISTRY,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: Mapping[str, str]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _lines(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self._lines())
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, optionally with scrape-time sources."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[Labels, float] = {}
+        self._sources: list[Callable[[], Mapping[Labels, float]]] = []
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def track(self, source: Callable[[], Mapping[Labels, float]]) -> None:
+        """Add series read at scrape time, for counts kept by other objects."""
+        self._sources.append(source)
+
+    def value(self, **labels: str) -> float:
+        return self._collect().get(self._key(labels), 0.0)
+
+    def _collect(self) -> dict[Labels, float]:
+        with self._lock:
+            values = dict(self._values)
+        for source in self._sources:
+            for key, value in source().items():
+                values[key] = values.get(key, 0.0) + value
+        return values
+
+    def _lines(self) -> Iterator[str]:
+        for key, value in sorted(self._collect().items()):
+            yield f"{_series(self.name, self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """A value that goes up and down."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def total(self) -> float:
+        """Sum over every label set."""
+        with self._lock:
+            return sum(self._values.values())
+
+    @contextlib.contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        self.inc(1.0, **labels)
+        try:
+            yield
+        finally:
+            self.dec(1.0, **labels)
+
+    def _lines(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{_series(self.name, self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative `le` buckets, with sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: non-cumulative bucket counts (plus +Inf), sum
+        self._values: dict[Labels, tuple[list[int], float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or (
+                [0] * (len(self.buckets) + 1),
+                0.0,
+            )
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+        return 0 if entry is None else sum(entry[0])
+
+    def _lines(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted((k, (list(c), s)) for k, (c, s) in self._values.items())
+        bucket_labels = (*self.labelnames, "le")
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                series = _series(
+                    f"{self.name}_bucket", bucket_labels, (*key, _format_value(bound))
+                )
+                yield f"{series} {cumulative}"
+            yield f"{_series(f'{self.name}_sum', self.labelnames, key)} {_format_value(total)}"
+            yield f"{_series(f'{self.name}_count', self.labelnames, key)} {cumulative}"
+
+
+# Label for tool calls and resource reads that match nothing registered
+UNKNOWN = "unknown"
+
+TOOL_LATENCY = Histogram(
+    "mcp_tool_duration_seconds", "Time to answer a tool call.", ["tool", "outcome"]
+)
+RESOURCE_LATENCY = Histogram(
+    "mcp_resource_duration_seconds",
+    "Time to answer a resource read.",
+    ["resource", "outcome"],
+)
+IN_FLIGHT = Gauge(
+    "mcp_in_flight_requests", "Tool calls and resource reads in progress.", ["kind"]
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_fetch_duration_seconds", "Time to download an upstream feed.", ["feed"]
+)
+UPSTREAM_RESPONSES = Counter(
+    "upstream_fetch_total",
+    "Upstream feed requests by HTTP status (or `error`/`cancelled` without one).",
+    ["feed", "status"],
+)
+UPSTREAM_RETRIES = Counter(
+    "upstream_retries_total", "Upstream feed requests retried.", ["feed"]
+)
+UPSTREAM_HEDGES = Counter(
+    "upstream_hedged_total",
+    "Slow upstream feed requests hedged with a second, by which answered first.",
+    ["feed", "winner"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by cache and result.", ["cache", "result"]
+)
+UPSTREAM_CIRCUIT = Gauge(
+    "upstream_circuit_state",
+    "Upstream feed circuit breakers: 0 closed, 1 half-open, 2 open.",
+    ["feed"],
+)
+CLICK_QUEUE_DEPTH = Gauge(
+    "click_queue_depth", "Click commands waiting for a concurrency slot.", ["tool"]
+)
+CLICK_RUN_SECONDS = Histogram(
+    "click_run_seconds", "Time Click commands spend running.", ["tool"]
+)
+RESOURCE_SUBSCRIPTIONS = Gauge(
+    "mcp_resource_subscriptions", "Resource subscriptions held by open sessions."
+)
+RESOURCE_UPDATES = Counter(
+    "mcp_resource_updates_total", "Resource-updated notifications sent to subscribers."
+)
+OUTBOX_MESSAGES = Counter(
+    "outbox_messages_total",
+    "Contact messages queued, sent, retried or failed in this process.",
+    ["state"],
+)
+ADMISSION_REJECTIONS = Counter(
+    "mcp_admission_rejected_total",
+    "Requests turned away by admission control, by budget and reason.",
+    ["budget", "reason"],
+)
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds", "How late the event loop last woke a sleeping task."
+)
+
+
+class MetricsMiddleware(Middleware):
+    """
+    Records latency and in-flight counts for tool calls and resource reads.
+
+    Series are labelled with the registered tool name or resource template,
+    never the raw name or URI the client sent, so clients cannot mint new
+    series; anything that matches nothing is counted as "unknown".
+    """
+
+    def __init__(self, mcp: FastMCP) -> None:
+        self.mcp = mcp
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        with IN_FLIGHT.track_inprogress(kind="tool"):
+            tool = await self.mcp.get_tool(context.message.name)
+            return await _timed(
+                TOOL_LATENCY,
+                {"tool": UNKNOWN if tool is None else tool.name},
+                context,
+                call_next,
+            )
+
+    async def on_read_resource(self, context: MiddlewareContext, call_next: CallNext):
+        with IN_FLIGHT.track_inprogress(kind="resource"):
+            return await _timed(
+                RESOURCE_LATENCY,
+                {"resource": await self._resource_label(str(context.message.uri))},
+                context,
+                call_next,
+            )
+
+    async def _resource_label(self, uri: str) -> str:
+        if await self.mcp.get_resource(uri) is not None:
+            return uri
+        template = await self.mcp.get_resource_template(uri)
+        return UNKNOWN if template is None else template.uri_template
+
+
+async def _timed(
+    histogram: Histogram,
+    labels: dict[str, str],
+    context: MiddlewareContext,
+    call_next: CallNext,
+):
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await call_next(context)
+        if not getattr(result, "is_error", False):
+            outcome = "ok"
+        return result
+    finally:
+        histogram.observe(time.perf_counter() - start, outcome=outcome, **labels)
+
+
+class ClickMetrics(RunObserver):
+    """Feeds Click command queueing and run times into the metrics above."""
+
+    def queued(self, tool: str) -> None:
+        CLICK_QUEUE_DEPTH.inc(tool=tool)
+
+    def dequeued(self, tool: str) -> None:
+        CLICK_QUEUE_DEPTH.dec(tool=tool)
+
+    def finished(self, tool: str, seconds: float) -> None:
+        CLICK_RUN_SECONDS.observe(seconds, tool=tool)
+
+
+def track_result_cache(name: str, cache: ResultCache) -> None:
+    """Report a Click result cache's hits and misses as `cache_requests_total`."""
+    CACHE_REQUESTS.track(
+        lambda: {(name, "hit"): cache.hits, (name, "miss"): cache.misses}
+    )
+
+
+def install(mcp: FastMCP, path: str = "/metrics") -> None:
+    """Add the recording middleware and serve the registry at `path`."""
+    mcp.add_middleware(MetricsMiddleware(mcp))
+
+    @mcp.custom_route(path, methods=["GET"], include_in_schema=False)
+    async def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
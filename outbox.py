@@ -0,0 +1,444 @@
+"""
+outbox.py — Contact messages queued durably and delivered by SMTP in batches.
+
+`send_contact_message` only appends the message to the outbox, a SQLite
+database in WAL mode, and returns its ID; nothing waits on a mail server.
+A lifespan task then claims due messages in batches, sends each batch over
+one SMTP connection in a worker thread, and records the outcome, so
+`get_contact_message_status` can report it:
+
+    queued   -> sending -> sent
+                        -> queued (temporary failure, retried with backoff)
+                        -> failed (rejected by the server, or out of attempts)
+
+Claims are leases: a message being sent by a worker that dies is retried
+once its lease runs out, so with several workers sharing the database each
+message is sent at least once. Commits are flushed at WAL checkpoints
+(`synchronous=NORMAL`), so a queued message survives the process crashing,
+though not necessarily the machine losing power.
+
+The outbox is `MCP_BOLSTER_OUTBOX` (default `$XDG_STATE_HOME/mcp-bolster/
+outbox.sqlite3`). Delivery needs an SMTP server, from `MCP_BOLSTER_SMTP_*`
+variables; without `MCP_BOLSTER_SMTP_HOST`, messages wait in the outbox:
+
+    MCP_BOLSTER_SMTP_HOST=smtp.example.com
+    MCP_BOLSTER_SMTP_PORT=587                 # STARTTLS; 465 for implicit TLS
+    MCP_BOLSTER_SMTP_USERNAME=mcp@example.com
+    MCP_BOLSTER_SMTP_PASSWORD=...
+    MCP_BOLSTER_SMTP_FROM=mcp@example.com
+    MCP_BOLSTER_SMTP_TO=andrew@example.com
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import secrets
+import smtplib
+import sqlite3
+import ssl
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.message import EmailMessage
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any
+
+import anyio.to_thread
+from fastmcp import FastMCP
+from fastmcp.server.lifespan import lifespan
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_ENV = "MCP_BOLSTER_OUTBOX"
+SMTP_PREFIX = "MCP_BOLSTER_SMTP_"
+
+# How often every worker looks for due messages (one that queued a message
+# looks straight away), and how many it sends per SMTP connection
+POLL_INTERVAL = 5.0
+BATCH_SIZE = 20
+# A claimed message is retried if not settled within this many seconds
+LEASE = 120.0
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 30.0
+BACKOFF_MAX = 3600.0
+# Delivered messages are kept this long for status queries
+KEEP_SENT = 30 * 86400.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    sender TEXT NOT NULL,
+    body TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    queued_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    sent_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_due ON messages (state, next_attempt_at);
+"""
+
+
+@dataclass(frozen=True)
+class Message:
+    """A contact message and where it is in delivery."""
+
+    id: str
+    sender: str
+    body: str
+    state: str
+    attempts: int
+    queued_at: float
+    next_attempt_at: float
+    sent_at: float | None
+    last_error: str | None
+
+
+def backoff(attempts: int) -> float:
+    """Seconds to wait before the next try after `attempts` failed ones."""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+
+
+class Outbox:
+    """Messages waiting for, or done with, delivery, in a SQLite database."""
+
+    def __init__(self, path: Path, *, timeout: float = 5.0) -> None:
+        self.path = Path(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        # Set when this process queues a message, to wake its delivery task
+        self.queued = asyncio.Event()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # A connection must not cross a fork into a new worker process
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add(self, sender: str, body: str) -> str:
+        """Queue a message for delivery now (blocking); returns its ID."""
+        message_id = secrets.token_hex(8)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO messages (id, sender, body, state, queued_at, "
+                "next_attempt_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (message_id, sender, body, now, now),
+            )
+        metrics.OUTBOX_MESSAGES.inc(state="queued")
+        return message_id
+
+    async def queue(self, sender: str, body: str) -> str:
+        """`add` in a worker thread, then wake this process's delivery task."""
+        message_id = await anyio.to_thread.run_sync(self.add, sender, body)
+        self.queued.set()
+        return message_id
+
+    def get(self, message_id: str) -> Message | None:
+        row = (
+            self._connect()
+            .execute("SELECT * FROM messages WHERE id = ?", (message_id,))
+            .fetchone()
+        )
+        return None if row is None else Message(*row)
+
+    def claim(self, limit: int = BATCH_SIZE, *, lease: float = LEASE) -> list[Message]:
+        """
+        Take up to `limit` due messages for sending, oldest first.
+
+        Includes messages whose earlier claim's lease ran out unsettled.
+        """
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            # Take the write lock before reading, so no other worker claims the same rows
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT * FROM messages WHERE state IN ('queued', 'sending') "
+                "AND next_attempt_at <= ? ORDER BY queued_at LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE messages SET state = 'sending', next_attempt_at = ? "
+                "WHERE id = ?",
+                [(now + lease, row[0]) for row in rows],
+            )
+        return [Message(*row) for row in rows]
+
+    def mark_sent(self, message_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE messages SET state = 'sent', attempts = attempts + 1, "
+                "sent_at = ?, last_error = NULL WHERE id = ?",
+                (time.time(), message_id),
+            )
+        metrics.OUTBOX_MESSAGES.inc(state="sent")
+
+    def mark_failed(
+        self, message_id: str, error: str, *, permanent: bool = False
+    ) -> str:
+        """Record a failed try; returns the new state (`queued` or `failed`)."""
+        with self._connect() as conn:
+            (attempts,) = conn.execute(
+                "SELECT attempts + 1 FROM messages WHERE id = ?", (message_id,)
+            ).fetchone()
+            state = "failed" if permanent or attempts >= MAX_ATTEMPTS else "queued"
+            conn.execute(
+                "UPDATE messages SET state = ?, attempts = ?, last_error = ?, "
+                "next_attempt_at = ? WHERE id = ?",
+                (state, attempts, error, time.time() + backoff(attempts), message_id),
+            )
+        metrics.OUTBOX_MESSAGES.inc(state="retried" if state == "queued" else state)
+        return state
+
+    def purge(self, older_than: float = KEEP_SENT) -> int:
+        """Delete messages delivered more than `older_than` seconds ago."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM messages WHERE state = 'sent' AND sent_at < ?",
+                (time.time() - older_than,),
+            )
+        return cursor.rowcount
+
+    def counts(self) -> dict[str, int]:
+        """How many messages are in each state."""
+        rows = (
+            self._connect()
+            .execute("SELECT state, COUNT(*) FROM messages GROUP BY state")
+            .fetchall()
+        )
+        return dict(rows)
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+@dataclass
+class SmtpConfig:
+    """Where and how to send contact messages."""
+
+    host: str
+    sender: str
+    recipient: str
+    port: int = 587
+    username: str | None = None
+    password: str | None = None
+    # "starttls", "tls" (implicit, usually port 465) or "none"
+    security: str = "starttls"
+    timeout: float = 30.0
+
+    def __post_init__(self) -> None:
+        if self.security not in ("starttls", "tls", "none"):
+            raise ValueError(f"Unknown SMTP security {self.security!r}")
+
+    @classmethod
+    def from_env(cls, environ: dict[str, str] | None = None) -> "SmtpConfig | None":
+        """
+        Read `MCP_BOLSTER_SMTP_*` variables; None if no host is set.
+
+        Raises:
+            ValueError: If a host is set without `FROM` and `TO` addresses.
+        """
+        env = os.environ if environ is None else environ
+        host = env.get(f"{SMTP_PREFIX}HOST")
+        if not host:
+            return None
+        sender = env.get(f"{SMTP_PREFIX}FROM")
+        recipient = env.get(f"{SMTP_PREFIX}TO")
+        if not sender or not recipient:
+            raise ValueError(f"{SMTP_PREFIX}FROM and {SMTP_PREFIX}TO must be set")
+        port = int(env.get(f"{SMTP_PREFIX}PORT", "587"))
+        return cls(
+            host=host,
+            sender=sender,
+            recipient=recipient,
+            port=port,
+            username=env.get(f"{SMTP_PREFIX}USERNAME") or None,
+            password=env.get(f"{SMTP_PREFIX}PASSWORD") or None,
+            security=env.get(
+                f"{SMTP_PREFIX}SECURITY", "tls" if port == 465 else "starttls"
+            ),
+            timeout=float(env.get(f"{SMTP_PREFIX}TIMEOUT", "30")),
+        )
+
+
+class UnsendableError(Exception):
+    """A message that cannot be turned into an email, so is never retried."""
+
+
+def _one_line(text: str) -> str:
+    """`text` with line breaks and runs of whitespace collapsed to single spaces."""
+    return " ".join(text.split())
+
+
+def _email(config: SmtpConfig, message: Message) -> EmailMessage:
+    email = EmailMessage()
+    # The sender is whatever the client gave; a line break would end the header
+    email["Subject"] = f"Contact message from {_one_line(message.sender)}"
+    email["From"] = config.sender
+    email["To"] = config.recipient
+    email["Date"] = formatdate(message.queued_at, localtime=True)
+    # Stable across retries, so a duplicate after a lost lease threads together
+    email["Message-ID"] = f"<{message.id}@mcp.bolster.online>"
+    queued = datetime.fromtimestamp(message.queued_at, UTC)
+    email.set_content(
+        f"{message.body}\n\n--\nFrom: {message.sender}\n"
+        f"Sent via mcp.bolster.online at {queued:%Y-%m-%d %H:%M:%S} UTC "
+        f"(message {message.id})\n"
+    )
+    return email
+
+
+def _connect_smtp(config: SmtpConfig) -> smtplib.SMTP:
+    if config.security == "tls":
+        smtp: smtplib.SMTP = smtplib.SMTP_SSL(
+            config.host,
+            config.port,
+            timeout=config.timeout,
+            context=ssl.create_default_context(),
+        )
+    else:
+        smtp = smtplib.SMTP(config.host, config.port, timeout=config.timeout)
+        if config.security == "starttls":
+            smtp.starttls(context=ssl.create_default_context())
+    if config.username:
+        smtp.login(config.username, config.password or "")
+    return smtp
+
+
+def _rejected(error: Exception) -> bool:
+    """Whether the server refused the message itself, so retrying won't help."""
+    if isinstance(error, UnsendableError):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def send_batch(
+    config: SmtpConfig, messages: Iterable[Message]
+) -> dict[str, Exception | None]:
+    """
+    Send `messages` over one SMTP connection (blocking).
+
+    Returns each message's error, or None if the server accepted it. A
+    message that cannot be built gets an `UnsendableError`; if the connection
+    fails, every message not yet sent gets that error.
+    """
+    pending = list(messages)
+    results: dict[str, Exception | None] = {}
+    try:
+        with _connect_smtp(config) as smtp:
+            for message in pending:
+                try:
+                    email = _email(config, message)
+                except Exception as e:
+                    results[message.id] = UnsendableError(str(e))
+                    continue
+                try:
+                    smtp.send_message(email)
+                except smtplib.SMTPServerDisconnected:
+                    raise
+                except (smtplib.SMTPException, OSError) as e:
+                    results[message.id] = e
+                else:
+                    results[message.id] = None
+    except Exception as e:
+        # Whatever went wrong, messages already accepted must not be re-sent
+        for message in pending:
+            results.setdefault(message.id, e)
+    return results
+
+
+async def deliver(
+    outbox: Outbox, config: SmtpConfig, *, limit: int = BATCH_SIZE
+) -> int:
+    """Send one batch of due messages; returns how many were claimed."""
+    batch = await anyio.to_thread.run_sync(outbox.claim, limit)
+    if not batch:
+        return 0
+    results = await anyio.to_thread.run_sync(send_batch, config, batch)
+    await anyio.to_thread.run_sync(_settle, outbox, batch, results)
+    return len(batch)
+
+
+def _settle(
+    outbox: Outbox, batch: list[Message], results: dict[str, Exception | None]
+) -> None:
+    """Record the outcome of sending `batch` (blocking)."""
+    for message in batch:
+        error = results.get(message.id)
+        if error is None:
+            outbox.mark_sent(message.id)
+            continue
+        state = outbox.mark_failed(
+            message.id, f"{type(error).__name__}: {error}", permanent=_rejected(error)
+        )
+        logger.warning(
+            "Contact message %s not delivered (%s): %s", message.id, state, error
+        )
+
+
+async def _deliver_loop(outbox: Outbox, config: SmtpConfig, interval: float) -> None:
+    while True:
+        try:
+            # Drain whatever is due, then purge before waiting again
+            while await deliver(outbox, config) == BATCH_SIZE:
+                pass
+            await anyio.to_thread.run_sync(outbox.purge)
+        except Exception:
+            logger.exception("Delivering contact messages failed")
+        outbox.queued.clear()
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(outbox.queued.wait(), interval)
+
+
+_outbox: Outbox | None = None
+
+
+def get() -> Outbox:
+    """This process's outbox, opened on first use."""
+    global _outbox
+    if _outbox is None:
+        state_home = os.environ.get("XDG_STATE_HOME", Path.home() / ".local" / "state")
+        default = Path(state_home) / "mcp-bolster" / "outbox.sqlite3"
+        _outbox = Outbox(Path(os.environ.get(OUTBOX_ENV, default)))
+    return _outbox
+
+
+@lifespan
+async def outbox_lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
+    """Deliver queued contact messages in the background, if SMTP is configured."""
+    config = SmtpConfig.from_env()
+    if config is None:
+        logger.info("No %sHOST set; contact messages stay in the outbox", SMTP_PREFIX)
+        yield {}
+        return
+    task = asyncio.create_task(_deliver_loop(get(), config, POLL_INTERVAL))
+    try:
+        yield {}
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
@@ -0,0 +1,304 @@
+"""
+profiling.py — Opt-in sampling profiler for slow tool calls.
+
+When `MCP_BOLSTER_PROFILE_DIR` is set, tool calls are profiled by a
+background thread that samples every thread's stack at a fixed interval
+(wall-clock, so time spent waiting on upstreams shows up too). A call's
+profile is written to that directory when it is picked by
+`MCP_BOLSTER_PROFILE_EVERY` (1 in N calls) or took longer than
+`MCP_BOLSTER_PROFILE_SLOWER_THAN` seconds:
+
+    MCP_BOLSTER_PROFILE_DIR=/opt/mcp.bolster.online/profiles
+    MCP_BOLSTER_PROFILE_SLOWER_THAN=2.0
+    MCP_BOLSTER_PROFILE_TOOLS=check_availability,bolster_*
+    MCP_BOLSTER_PROFILE_FORMAT=speedscope   # or collapsed (the default)
+
+Collapsed stacks feed `flamegraph.pl`/speedscope; `.speedscope.json` files
+open directly in https://www.speedscope.app. Samples cover the whole
+process while the call runs, so concurrent calls appear in each other's
+profiles. With no directory set nothing is installed, so there is no
+overhead at all.
+"""
+
+import fnmatch
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FrameType
+
+import anyio.to_thread
+from fastmcp import FastMCP
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+
+logger = logging.getLogger(__name__)
+
+ENV_PREFIX = "MCP_BOLSTER_PROFILE_"
+FORMATS = {"collapsed": ".collapsed", "speedscope": ".speedscope.json"}
+
+# Stacks whose innermost frame is in one of these files are idle worker threads
+_IDLE_FILES = ("threading.py", "queue.py")
+
+Frame = tuple[str, str, int]  # function, file, first line
+
+
+@dataclass
+class ProfileConfig:
+    """When to profile tool calls and where to write the results."""
+
+    directory: Path
+    every: int | None = None
+    slower_than: float | None = None
+    tools: list[str] = field(default_factory=lambda: ["*"])
+    format: str = "collapsed"
+    interval: float = 0.005
+    max_files: int = 200
+
+    def __post_init__(self) -> None:
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown profile format {self.format!r}")
+        if self.every is None and self.slower_than is None:
+            raise ValueError("Profiling needs an `every` or `slower_than` rule")
+
+    @classmethod
+    def from_env(cls, environ: dict[str, str] | None = None) -> "ProfileConfig | None":
+        """
+        Read the configuration from `MCP_BOLSTER_PROFILE_*` variables.
+
+        Returns None (profiling disabled) when no directory is set. Without a
+        rule, calls slower than 1 second are profiled.
+        """
+        env = os.environ if environ is None else environ
+        directory = env.get(f"{ENV_PREFIX}DIR")
+        if not directory:
+            return None
+        every = env.get(f"{ENV_PREFIX}EVERY")
+        slower_than = env.get(f"{ENV_PREFIX}SLOWER_THAN")
+        if not every and not slower_than:
+            slower_than = "1.0"
+        tools = env.get(f"{ENV_PREFIX}TOOLS", "*")
+        return cls(
+            directory=Path(directory),
+            every=int(every) if every else None,
+            slower_than=float(slower_than) if slower_than else None,
+            tools=[t.strip() for t in tools.split(",") if t.strip()],
+            format=env.get(f"{ENV_PREFIX}FORMAT", "collapsed"),
+            interval=float(env.get(f"{ENV_PREFIX}INTERVAL", "0.005")),
+        )
+
+
+class Profile:
+    """Stack samples collected while one call runs."""
+
+    def __init__(self, name: str, main_thread: int) -> None:
+        self.name = name
+        self.main_thread = main_thread
+        self.samples: Counter[tuple[Frame, ...]] = Counter()
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.elapsed = 0.0
+        self.cpu = 0.0
+
+    def add(self, frames: dict[int, FrameType], names: dict[int, str]) -> None:
+        for ident, frame in frames.items():
+            stack = _stack(frame)
+            if ident != self.main_thread and stack[-1][1].endswith(_IDLE_FILES):
+                continue
+            thread = "main" if ident == self.main_thread else names.get(ident, "?")
+            self.samples[((f"thread {thread}", "", 0), *stack)] += 1
+
+    def finish(self) -> None:
+        self.elapsed = time.perf_counter() - self.started
+        self.cpu = time.process_time() - self.cpu_started
+
+    def collapsed(self) -> str:
+        """One `frame;frame;frame count` line per distinct stack."""
+        return "".join(
+            ";".join(_label(f) for f in stack) + f" {count}\n"
+            for stack, count in sorted(self.samples.items())
+        )
+
+    def speedscope(self, interval: float) -> str:
+        """The samples as a speedscope "sampled" profile."""
+        index: dict[Frame, int] = {}
+        samples = []
+        for stack, count in self.samples.items():
+            ids = [index.setdefault(f, len(index)) for f in stack]
+            samples.extend([ids] * count)
+        document = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {
+                "frames": [
+                    {"name": name, "file": file, "line": line}
+                    for name, file, line in index
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": f"{self.name} ({self.elapsed:.3f}s wall, {self.cpu:.3f}s CPU)",
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": len(samples) * interval,
+                    "samples": samples,
+                    "weights": [interval] * len(samples),
+                }
+            ],
+            "name": self.name,
+            "exporter": "mcp-bolster profiling.py",
+        }
+        return json.dumps(document)
+
+
+def _stack(frame: FrameType | None) -> tuple[Frame, ...]:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_qualname, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+def _label(frame: Frame) -> str:
+    name, file, line = frame
+    if not file:
+        return name
+    return f"{name} ({Path(file).name}:{line})"
+
+
+class Sampler:
+    """One background thread sampling stacks for every active profile."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._active: set[Profile] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, profile: Profile) -> None:
+        with self._lock:
+            self._active.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="profile-sampler", daemon=True
+                )
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self, profile: Profile) -> None:
+        with self._lock:
+            self._active.discard(profile)
+        profile.finish()
+
+    def _loop(self) -> None:
+        own = threading.get_ident()
+        while True:
+            names = {
+                t.ident: t.name for t in threading.enumerate() if t.ident is not None
+            }
+            # Sampling under the lock means a stopped profile gets no more samples
+            with self._lock:
+                if not self._active:
+                    self._wake.clear()
+                else:
+                    frames = sys._current_frames()
+                    frames.pop(own, None)
+                    for profile in self._active:
+                        profile.add(frames, names)
+                    del frames
+            if not self._wake.is_set():
+                # Sleep until the next profiled call
+                self._wake.wait()
+                continue
+            time.sleep(self.interval)
+
+
+def _safe_name(name: str) -> str:
+    """`name` as a filename component; tool names come from the client."""
+    return re.sub(r"[^\w.-]", "_", name)
+
+
+class ProfilingMiddleware(Middleware):
+    """Samples tool calls and writes the profiles of picked or slow ones."""
+
+    def __init__(self, config: ProfileConfig) -> None:
+        self.config = config
+        self.sampler = Sampler(config.interval)
+        self._calls = itertools.count(1)
+        self._written = itertools.count(1)
+
+    def _wants(self, tool: str) -> bool:
+        return any(fnmatch.fnmatchcase(tool, pattern) for pattern in self.config.tools)
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext):
+        tool = context.message.name
+        if not self._wants(tool):
+            return await call_next(context)
+        every = self.config.every
+        picked = every is not None and next(self._calls) % every == 0
+        if not picked and self.config.slower_than is None:
+            return await call_next(context)
+
+        profile = Profile(tool, threading.get_ident())
+        self.sampler.start(profile)
+        try:
+            return await call_next(context)
+        finally:
+            self.sampler.stop(profile)
+            slow = (
+                self.config.slower_than is not None
+                and profile.elapsed >= self.config.slower_than
+            )
+            if picked or slow:
+                await anyio.to_thread.run_sync(self._write, profile)
+
+    def _write(self, profile: Profile) -> Path | None:
+        config = self.config
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        path = config.directory / (
+            f"{stamp}-{os.getpid()}-{next(self._written)}-{_safe_name(profile.name)}"
+            f"-{profile.elapsed * 1000:.0f}ms" + FORMATS[config.format]
+        )
+        if config.format == "speedscope":
+            body = profile.speedscope(config.interval)
+        else:
+            body = profile.collapsed()
+        try:
+            config.directory.mkdir(parents=True, exist_ok=True)
+            path.write_text(body)
+            self._prune()
+        except OSError as e:
+            logger.warning("Could not write profile %s: %s", path, e)
+            return None
+        logger.info("Wrote profile of %s to %s", profile.name, path)
+        return path
+
+    def _prune(self) -> None:
+        """Keep only the newest `max_files` profiles."""
+        files = sorted(
+            (
+                p
+                for p in self.config.directory.iterdir()
+                if p.name.endswith(tuple(FORMATS.values()))
+            ),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for old in files[: -self.config.max_files]:
+            old.unlink(missing_ok=True)
+
+
+def install(mcp: FastMCP, config: ProfileConfig | None = None) -> bool:
+    """Add the profiling middleware if enabled; returns whether it was."""
+    config = config or ProfileConfig.from_env()
+    if config is None:
+        return False
+    mcp.add_middleware(ProfilingMiddleware(config))
+    return True
@@ -0,0 +1,233 @@
+"""
+shared_cache.py — A cache shared by every worker process, in SQLite.
+
+With several HTTP workers, per-process caches mean each worker downloads
+the same feeds and re-runs the same Click commands. `SharedCache` keeps
+entries in one SQLite database in WAL mode (readers never block the
+writer) under the deployment's cache dir, so a feed fetched or a command
+run by one worker is reused by the others, and a page cursor can be
+redeemed on any worker. It is enabled by pointing
+`MCP_BOLSTER_SHARED_CACHE` at the database file:
+
+    MCP_BOLSTER_SHARED_CACHE=/opt/mcp.bolster.online/.cache/mcp-bolster/shared.sqlite3
+
+Each thread (and process) gets its own connection. Entries expire after
+their TTL, and expired rows are purged as new ones are written.
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from click_mcp import ResultCache, ResultStore
+
+CACHE_ENV = "MCP_BOLSTER_SHARED_CACHE"
+
+# Purge expired rows on every this-many writes
+_PURGE_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    meta TEXT NOT NULL DEFAULT '{}',
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+@dataclass(frozen=True)
+class Entry:
+    """A cached value, with its metadata and when it was stored (wall clock)."""
+
+    value: bytes
+    meta: dict[str, Any]
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class SharedCache:
+    """Namespaced, expiring key/value entries in a SQLite database."""
+
+    def __init__(self, path: Path, *, timeout: float = 5.0) -> None:
+        self.path = Path(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._writes = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        # A connection must not cross a fork into a new worker process
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str) -> Entry | None:
+        """The live entry for `key`, or None if missing or expired."""
+        row = (
+            self._connect()
+            .execute(
+                "SELECT value, meta, stored_at FROM entries "
+                "WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time()),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return Entry(bytes(row[0]), json.loads(row[1]), row[2])
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        value: bytes,
+        *,
+        ttl: float,
+        meta: dict[str, Any] | None = None,
+    ) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, value, json.dumps(meta or {}), now, now + ttl),
+            )
+            self._writes += 1
+            if self._writes % _PURGE_EVERY == 0:
+                conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+
+    def clear(self, namespace: str | None = None) -> None:
+        with self._connect() as conn:
+            if namespace is None:
+                conn.execute("DELETE FROM entries")
+            else:
+                conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def trim(self, namespace: str, max_entries: int) -> None:
+        """Drop the oldest entries in `namespace` beyond `max_entries`."""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key NOT IN ("
+                "SELECT key FROM entries WHERE namespace = ? "
+                "ORDER BY stored_at DESC LIMIT ?)",
+                (namespace, namespace, max_entries),
+            )
+
+    def count(self, namespace: str) -> int:
+        """Live entries in `namespace`."""
+        row = (
+            self._connect()
+            .execute(
+                "SELECT COUNT(*) FROM entries WHERE namespace = ? AND expires_at > ?",
+                (namespace, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0]
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class SharedResultCache(ResultCache):
+    """
+    A Click `ResultCache` kept in a `SharedCache`, so every worker reuses
+    a command's output. Hits and misses are counted per process.
+    """
+
+    blocking = True
+
+    def __init__(
+        self, store: SharedCache, *, ttl: float = 300.0, namespace: str = "click"
+    ) -> None:
+        super().__init__(ttl=ttl)
+        self.store = store
+        self.namespace = namespace
+
+    def get(self, key: Any) -> Any | None:
+        entry = self.store.get(self.namespace, json.dumps(key))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tuple(json.loads(entry.value))
+
+    def put(self, key: Any, value: Any) -> None:
+        self.store.put(
+            self.namespace, json.dumps(key), json.dumps(value).encode(), ttl=self.ttl
+        )
+
+    def clear(self) -> None:
+        self.store.clear(self.namespace)
+
+    def __len__(self) -> int:
+        return self.store.count(self.namespace)
+
+
+class SharedResultStore(ResultStore):
+    """
+    A Click `ResultStore` kept in a `SharedCache`, so a page cursor works
+    whichever worker the next request lands on.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        store: SharedCache,
+        *,
+        ttl: float = 600.0,
+        max_entries: int = 64,
+        namespace: str = "pages",
+    ) -> None:
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self.store = store
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.namespace = namespace
+
+    def __len__(self) -> int:
+        return self.store.count(self.namespace)
+
+    def put(self, items: list[Any], structured: bool) -> str:
+        key = secrets.token_urlsafe(12)
+        value = json.dumps([items, structured]).encode()
+        self.store.put(self.namespace, key, value, ttl=self.ttl)
+        self.store.trim(self.namespace, self.max_entries)
+        return key
+
+    def get(self, key: str) -> tuple[list[Any], bool] | None:
+        entry = self.store.get(self.namespace, key)
+        if entry is None:
+            return None
+        items, structured = json.loads(entry.value)
+        return items, structured
+
+
+def from_env() -> SharedCache | None:
+    """The shared cache named by `MCP_BOLSTER_SHARED_CACHE`, if set."""
+    path = os.environ.get(CACHE_ENV)
+    return SharedCache(Path(path)) if path else None
@@ -0,0 +1,236 @@
+"""
+subscriptions.py — Resource subscriptions, with updates pushed on change.
+
+Clients can `resources/subscribe` to any resource, such as a day of the
+calendar or the blog index:
+
+    resource://andrew-bolster/calendar/2026-03-14
+    resource://andrew-bolster/blog
+
+While anything is subscribed, a lifespan task refreshes the feeds those
+resources are read from every `REFRESH_INTERVAL` seconds. When a feed's
+snapshot is replaced, each subscribed resource built from it is read again,
+and its subscribers are sent `notifications/resources/updated` only if the
+content's digest differs from the last one, so a refresh that changes
+nothing, or changes other days, sends nothing. Resources not built from a
+feed (the documents in `resources/`) are re-read on every refresh.
+
+Subscriptions belong to a session, so they need stateful HTTP
+(`MCP_BOLSTER_STATELESS=0`) with every request in a session reaching the
+same worker, or stdio. When serving stateless HTTP the capability is not
+advertised and subscribing is refused.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import weakref
+from collections.abc import AsyncIterator
+from typing import Any
+
+import anyio
+import httpx
+from fastmcp import FastMCP
+from fastmcp.server.lifespan import lifespan
+from mcp.server.lowlevel.server import request_ctx
+from mcp.server.session import ServerSession
+from mcp.shared.exceptions import McpError
+from mcp.types import INVALID_REQUEST, ErrorData
+from pydantic import AnyUrl
+
+import metrics
+import upstream
+
+logger = logging.getLogger(__name__)
+
+# How often subscribed feeds are refreshed
+REFRESH_INTERVAL = 60.0
+
+# Off when serving stateless HTTP, where a session ends with its request
+enabled = True
+
+
+class Subscriptions:
+    """Which sessions are subscribed to which resources, and what they last saw."""
+
+    def __init__(self, server: FastMCP, sources: dict[str, str]) -> None:
+        self.server = server
+        # URI prefix -> name of the upstream feed those resources are read from
+        self.sources = sources
+        self._sessions: weakref.WeakKeyDictionary[ServerSession, set[str]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._digests: dict[str, str] = {}
+        # The snapshot of each feed that subscribed resources were last read from
+        self._seen: dict[str, upstream.Snapshot] = {}
+
+    def uris(self) -> set[str]:
+        """Every URI with at least one subscriber."""
+        return set().union(*self._sessions.values())
+
+    async def subscribe(self, session: ServerSession, uri: str) -> None:
+        """
+        Subscribe `session` to `uri`, remembering the content it starts from.
+
+        Raises:
+            Exception: Whatever reading the resource raised, if it cannot be read.
+        """
+        if uri not in self._digests:
+            self._digests[uri] = await self._digest(uri)
+        self._sessions.setdefault(session, set()).add(uri)
+        self._record()
+
+    def unsubscribe(self, session: ServerSession, uri: str) -> None:
+        self._sessions.get(session, set()).discard(uri)
+        self._forget_unwatched()
+
+    def _forget_unwatched(self) -> None:
+        watched = self.uris()
+        for uri in set(self._digests) - watched:
+            del self._digests[uri]
+        self._record()
+
+    def _record(self) -> None:
+        metrics.RESOURCE_SUBSCRIPTIONS.set(
+            sum(len(uris) for uris in self._sessions.values())
+        )
+
+    async def _digest(self, uri: str) -> str:
+        result = await self.server.read_resource(uri, run_middleware=False)
+        digest = hashlib.sha256()
+        for item in result.contents:
+            data = item.content
+            digest.update(data.encode() if isinstance(data, str) else data)
+        return digest.hexdigest()
+
+    def _feed(self, uri: str) -> str | None:
+        for prefix, feed in self.sources.items():
+            if uri.startswith(prefix):
+                return upstream.FEEDS[feed]
+        return None
+
+    async def refresh(self, max_age: float = REFRESH_INTERVAL) -> list[str]:
+        """
+        Refresh the feeds behind subscribed resources and notify subscribers
+        of those whose content changed. Returns the changed URIs.
+        """
+        # Sessions that closed have been garbage collected from the map
+        self._forget_unwatched()
+        uris = self.uris()
+        fresh = set()
+        for url in {self._feed(uri) for uri in uris}:
+            if url is None:
+                continue
+            try:
+                snapshot = await upstream.fetch(url, max_age=max_age)
+            except httpx.HTTPError as e:
+                # Keep what subscribers have; try again next time
+                logger.warning("Could not refresh %s: %s", url, e)
+                continue
+            if self._seen.get(url) is not snapshot:
+                self._seen[url] = snapshot
+                fresh.add(url)
+
+        changed = []
+        for uri in sorted(uris):
+            feed = self._feed(uri)
+            if feed is not None and feed not in fresh:
+                continue
+            try:
+                digest = await self._digest(uri)
+            except Exception as e:
+                logger.warning("Could not read subscribed %s: %s", uri, e)
+                continue
+            if digest != self._digests.get(uri):
+                self._digests[uri] = digest
+                changed.append(uri)
+                await self.notify(uri)
+        return changed
+
+    async def notify(self, uri: str) -> int:
+        """Tell every session subscribed to `uri` that it changed; returns how many."""
+        sent = dropped = 0
+        for session, uris in list(self._sessions.items()):
+            if uri not in uris:
+                continue
+            try:
+                await session.send_resource_updated(AnyUrl(uri))
+            except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+                # The client went away without unsubscribing
+                self._sessions.pop(session, None)
+                dropped += 1
+                continue
+            sent += 1
+        metrics.RESOURCE_UPDATES.inc(sent)
+        if dropped:
+            self._forget_unwatched()
+        return sent
+
+
+# The server's subscriptions, once installed
+active: Subscriptions | None = None
+
+
+async def _refresh_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        if active is None or not active.uris():
+            continue
+        try:
+            await active.refresh(max_age=interval)
+        except Exception:
+            logger.exception("Refreshing subscribed resources failed")
+
+
+@lifespan
+async def subscriptions_lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
+    """Refresh subscribed resources in the background for the server's lifetime."""
+    task = asyncio.create_task(_refresh_loop(REFRESH_INTERVAL))
+    try:
+        yield {}
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def install(mcp: FastMCP, sources: dict[str, str]) -> Subscriptions:
+    """
+    Handle `resources/subscribe` and `resources/unsubscribe` on `mcp`.
+
+    `sources` maps URI prefixes to the `upstream.FEEDS` feed their
+    resources are read from.
+    """
+    global active
+    active = Subscriptions(mcp, sources)
+    subscriptions = active
+    low_level = mcp._mcp_server
+
+    @low_level.subscribe_resource()
+    async def subscribe(uri: AnyUrl) -> None:
+        if not enabled:
+            raise McpError(
+                ErrorData(
+                    code=INVALID_REQUEST,
+                    message="Subscriptions need a stateful session; this server "
+                    "is serving stateless HTTP",
+                )
+            )
+        await subscriptions.subscribe(request_ctx.get().session, str(uri))
+
+    @low_level.unsubscribe_resource()
+    async def unsubscribe(uri: AnyUrl) -> None:
+        subscriptions.unsubscribe(request_ctx.get().session, str(uri))
+
+    # The MCP SDK always advertises `subscribe: false`; correct it
+    get_capabilities = low_level.get_capabilities
+
+    def with_subscribe(*args: Any, **kwargs: Any) -> Any:
+        capabilities = get_capabilities(*args, **kwargs)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = enabled
+        return capabilities
+
+    low_level.get_capabilities = with_subscribe  # type: ignore[method-assign]
+    return subscriptions
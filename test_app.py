@@ -13,6 +13,7 @@ import httpx
 import pytest
 from fastmcp import Client
 
+import app
 from app import mcp
 
 
@@ -128,7 +129,26 @@ class TestContactTool:
             response = result.data
             assert "Message received and queued for delivery" in response
             assert "Test User" in response
-            assert "placeholder implementation" in response.lower()
+            assert "Message ID:" in response
+
+    @pytest.mark.asyncio
+    async def test_contact_message_status(self):
+        async with Client(mcp) as client:
+            sent = await client.call_tool(
+                "send_contact_message", {"message": "Hello", "sender": "Test User"}
+            )
+            message_id = sent.data.split("Message ID: ")[1].split()[0]
+            result = await client.call_tool(
+                "get_contact_message_status", {"message_id": message_id}
+            )
+            assert f"Message {message_id}: Waiting to be delivered" in result.data
+            assert "Message from: Test User" in result.data
+            assert "Delivery attempts: 0" in result.data
+
+            missing = await client.call_tool(
+                "get_contact_message_status", {"message_id": "nope"}
+            )
+            assert "No contact message with ID 'nope'" in missing.data
 
     @pytest.mark.asyncio
     async def test_send_contact_message_empty_fields(self):
@@ -166,8 +186,10 @@ class TestAvailabilityTool:
                 result = await client.call_tool(
                     "check_availability", {"start_date": "2024-12-01", "days_ahead": 7}
                 )
-                assert "No scheduled events found" in result.data
-                assert "2024-12-01" in result.data
+                availability = result.structured_content
+                assert availability["busy"] == []
+                assert availability["start"] == "2024-12-01T00:00"
+                assert availability["coverage"]["public_only"] is True
 
     @pytest.mark.asyncio
     async def test_check_availability_with_events(self):
@@ -191,8 +213,13 @@ END:VCALENDAR"""
                 result = await client.call_tool(
                     "check_availability", {"start_date": "2024-12-01", "days_ahead": 7}
                 )
-                assert "Team Meeting" in result.data
-                assert "2024-12-02 10:00" in result.data
+                assert result.structured_content["busy"] == [
+                    {
+                        "start": "2024-12-02T10:00",
+                        "end": "2024-12-02T11:00",
+                        "summary": "Team Meeting",
+                    }
+                ]
 
     @pytest.mark.asyncio
     async def test_check_availability_default_parameters(self):
@@ -209,7 +236,7 @@ END:VCALENDAR"""
             async with Client(mcp) as client:
                 result = await client.call_tool("check_availability", {})
                 today = datetime.now().strftime("%Y-%m-%d")
-                assert today in result.data
+                assert result.structured_content["start"].startswith(today)
 
     @pytest.mark.asyncio
     async def test_check_availability_request_exception(self):
@@ -224,9 +251,41 @@ END:VCALENDAR"""
 
             async with Client(mcp) as client:
                 result = await client.call_tool(
-                    "check_availability", {"start_date": "2024-12-01", "days_ahead": 3}
+                    "check_availability",
+                    {"start_date": "2024-12-01", "days_ahead": 3},
+                    raise_on_error=False,
                 )
-                assert "Error fetching calendar data" in result.data
+                assert result.is_error
+                assert "Error fetching calendar data" in result.content[0].text
+
+    @pytest.mark.asyncio
+    async def test_check_availability_answers_from_last_copy(self, monkeypatch):
+        ical = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+DTSTART:20241202T100000Z
+DTEND:20241202T110000Z
+SUMMARY:Team Meeting
+END:VEVENT
+END:VCALENDAR"""
+        monkeypatch.setattr("upstream.SNAPSHOT_MAX_AGE", 0)
+        with patch("app.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=None)
+            mock_client.get = AsyncMock(
+                side_effect=[make_httpx_response(text=ical)]
+                + [httpx.RequestError("Connection refused")] * 3
+            )
+            mock_client_cls.return_value = mock_client
+
+            async with Client(mcp) as client:
+                args = {"start_date": "2024-12-01", "days_ahead": 7}
+                fresh = await client.call_tool("check_availability", args)
+                stale = await client.call_tool("check_availability", args)
+                assert fresh.structured_content["coverage"]["stale"] is False
+                assert stale.structured_content["coverage"]["stale"] is True
+                assert stale.structured_content["busy"][0]["summary"] == "Team Meeting"
 
     @pytest.mark.asyncio
     async def test_check_availability_network_error(self):
@@ -239,9 +298,12 @@ END:VCALENDAR"""
 
             async with Client(mcp) as client:
                 result = await client.call_tool(
-                    "check_availability", {"start_date": "2024-12-01", "days_ahead": 3}
+                    "check_availability",
+                    {"start_date": "2024-12-01", "days_ahead": 3},
+                    raise_on_error=False,
                 )
-                assert "Error processing calendar information" in result.data
+                assert result.is_error
+                assert "Error processing calendar information" in result.content[0].text
 
     @pytest.mark.asyncio
     async def test_check_availability_all_day_events(self):
@@ -265,7 +327,12 @@ END:VCALENDAR"""
                 result = await client.call_tool(
                     "check_availability", {"start_date": "2024-12-01", "days_ahead": 7}
                 )
-                assert "Conference Day" in result.data
+                [busy] = result.structured_content["busy"]
+                assert busy["summary"] == "Conference Day"
+                assert (busy["start"], busy["end"]) == (
+                    "2024-12-02T00:00",
+                    "2024-12-03T00:00",
+                )
 
     @pytest.mark.asyncio
     async def test_check_availability_custom_date_range(self):
@@ -283,8 +350,56 @@ END:VCALENDAR"""
                 result = await client.call_tool(
                     "check_availability", {"start_date": "2025-01-15", "days_ahead": 14}
                 )
-                assert "2025-01-15" in result.data
-                assert "2025-01-29" in result.data
+                assert result.structured_content["start"] == "2025-01-15T00:00"
+                assert result.structured_content["end"] == "2025-01-29T00:00"
+
+    @pytest.mark.asyncio
+    async def test_check_availability_compact(self):
+        ical = """BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+DTSTART:20241202T100000Z
+DTEND:20241202T110000Z
+SUMMARY:Team Meeting
+END:VEVENT
+BEGIN:VEVENT
+DTSTART:20241202T103000Z
+DTEND:20241202T120000Z
+SUMMARY:Overlapping call
+END:VEVENT
+BEGIN:VEVENT
+DTSTART:20241202T120000Z
+DTEND:20241202T130000Z
+SUMMARY:Lunch, straight after
+END:VEVENT
+BEGIN:VEVENT
+DTSTART:20241203T090000Z
+DTEND:20241203T093000Z
+SUMMARY:Stand-up
+END:VEVENT
+END:VCALENDAR"""
+        mock_response = make_httpx_response(text=ical)
+        with patch("app.httpx.AsyncClient") as mock_client_cls:
+            mock_client = AsyncMock()
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=None)
+            mock_client.get = AsyncMock(return_value=mock_response)
+            mock_client_cls.return_value = mock_client
+
+            async with Client(mcp) as client:
+                args = {"start_date": "2024-12-01", "days_ahead": 7}
+                full = await client.call_tool("check_availability", args)
+                compact = await client.call_tool(
+                    "check_availability", {**args, "compact": True}
+                )
+                assert len(full.structured_content["busy"]) == 4
+                assert "blocks" not in full.structured_content
+                assert "busy" not in compact.structured_content
+                assert compact.structured_content["blocks"] == [
+                    ["2024-12-02T10:00", "2024-12-02T13:00"],
+                    ["2024-12-03T09:00", "2024-12-03T09:30"],
+                ]
+                assert len(compact.content[0].text) < len(full.content[0].text)
 
 
 class TestRSSFeedTool:
@@ -418,6 +533,32 @@ class TestRSSFeedTool:
                 assert posts[0]["summary"].endswith("...")
                 assert len(posts[0]["summary"]) == 500
 
+    @pytest.mark.asyncio
+    async def test_blog_feed_is_parsed_once_per_snapshot(self):
+        feed = f"""<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <item><title>T</title><link>http://x.com/post</link><description>{"x" * 600}</description></item>
+</channel></rss>""".encode()
+        mock_response = make_httpx_response(content=feed)
+        with (
+            patch("app.httpx.AsyncClient") as mock_client_cls,
+            patch("app._parse_rss", wraps=app._parse_rss) as parse,
+        ):
+            mock_client = AsyncMock()
+            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+            mock_client.__aexit__ = AsyncMock(return_value=None)
+            mock_client.get = AsyncMock(return_value=mock_response)
+            mock_client_cls.return_value = mock_client
+
+            async with Client(mcp) as client:
+                for _ in range(2):
+                    result = await client.call_tool("get_recent_blog_posts", {})
+                    assert len(get_posts(result)[0]["summary"]) == 500
+                post = await client.read_resource("resource://andrew-bolster/blog/post")
+            # The resource gets the full summary the tool calls shortened
+            assert len(json.loads(post[0].text)["summary"]) == 600
+            assert parse.call_count == 1
+
 
 class TestIntegration:
     @pytest.mark.asyncio
@@ -462,7 +603,7 @@ class TestIntegration:
                 mock_client_cls.return_value = mock_client
 
                 avail = await client.call_tool("check_availability", {})
-                assert "Calendar availability" in avail.data
+                assert avail.structured_content["busy"] == []
 
             with patch("app.httpx.AsyncClient") as mock_client_cls:
                 mock_client = AsyncMock()
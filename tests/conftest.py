@@ -0,0 +1,72 @@
+"""Fixtures for the tests/ suite (the shared ones are in the top-level conftest)."""
+
+from collections import deque
+from collections.abc import Iterable
+
+import anyio
+import httpx
+import pytest
+
+import upstream
+
+
+class FakeFeeds:
+    """
+    Stands in for the upstream feed servers.
+
+    Each download is answered with the next of `statuses` (200 once they run
+    out) after the next of `delays` (then `delay`) seconds, with the body for
+    its URL in `bodies` or else `body`; str bodies are sent as UTF-8 text.
+    `calls` records the URLs asked for, in order.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.body: bytes | str = b"ok"
+        self.bodies: dict[str, bytes | str] = {}
+        self.headers: dict[str, str] = {}
+        self.delay = 0.0
+        self.statuses: deque[int] = deque()
+        self.delays: deque[float] = deque()
+
+    def serve(
+        self,
+        statuses: Iterable[int] = (),
+        *,
+        delays: Iterable[float] = (),
+        delay: float | None = None,
+        body: bytes | str | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> "FakeFeeds":
+        """Set how the next downloads are answered; returns self."""
+        self.statuses.extend(statuses)
+        self.delays.extend(delays)
+        if delay is not None:
+            self.delay = delay
+        if body is not None:
+            self.body = body
+        if headers is not None:
+            self.headers = headers
+        return self
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        self.calls.append(url)
+        await anyio.sleep(self.delays.popleft() if self.delays else self.delay)
+        status = self.statuses.popleft() if self.statuses else 200
+        body = self.bodies.get(url, self.body)
+        if isinstance(body, str):
+            return httpx.Response(status, text=body, headers=self.headers)
+        return httpx.Response(status, content=body, headers=self.headers)
+
+
+@pytest.fixture
+def upstream_feeds(monkeypatch) -> FakeFeeds:
+    """Route upstream's pooled transport to a `FakeFeeds`, set up per test."""
+    feeds = FakeFeeds()
+    monkeypatch.setattr(
+        upstream.httpx,
+        "AsyncHTTPTransport",
+        lambda **kwargs: httpx.MockTransport(feeds.handle),
+    )
+    return feeds
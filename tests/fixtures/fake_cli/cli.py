@@ -10,7 +10,9 @@ def cli():
 
 @cli.command()
 @click.option("--name", required=True, help="Name to greet.")
-@click.option("--count", default=1, type=int, help="Number of greetings.")
+@click.option(
+    "--count", default=1, type=click.IntRange(min=0), help="Number of greetings."
+)
 @click.option("--shout", is_flag=True, default=False, help="SHOUT the greeting.")
 def greet(name, count, shout):
     """Greet someone by name."""
@@ -0,0 +1,56 @@
+"""Synthetic Click trees for exercising click_mcp at scale."""
+
+import click
+
+_CHOICES = ["json", "csv", "table"]
+
+
+def _make_leaf(index: int) -> click.Command:
+    """A leaf command with the same mix of params as the hand-written fake CLI."""
+
+    def callback(**kwargs):
+        click.echo(f"cmd{index}: {sorted(kwargs.items())}")
+
+    return click.Command(
+        f"cmd-{index}",
+        callback=callback,
+        help=f"Synthetic command number {index}.",
+        params=[
+            click.Argument(["target"]),
+            click.Option(["--limit"], type=int, default=10, help="Maximum rows."),
+            click.Option(["--ratio"], type=float, default=None, help="A ratio."),
+            click.Option(["--mode"], type=click.Choice(_CHOICES), default="table"),
+            click.Option(["--verbose"], is_flag=True, default=False, help="Chatty."),
+            click.Option(["--format", "output_format"], default="table"),
+        ],
+    )
+
+
+def build_large_cli(n_commands: int, *, fanout: int = 20) -> click.Group:
+    """
+    Build a Click group with `n_commands` leaf commands.
+
+    Commands are spread over nested groups with at most `fanout` children per
+    group, so a 10k-command tree is a few levels deep like a real CLI rather
+    than one flat group.
+    """
+    leaves: list[click.Command] = [_make_leaf(i) for i in range(n_commands)]
+    level = 0
+    nodes: list[click.Command] = leaves
+    while len(nodes) > fanout:
+        groups = []
+        for start in range(0, len(nodes), fanout):
+            group = click.Group(
+                f"group-{level}-{start // fanout}",
+                help=f"Synthetic group {level}/{start // fanout}.",
+            )
+            for node in nodes[start : start + fanout]:
+                group.add_command(node)
+            groups.append(group)
+        nodes = groups
+        level += 1
+
+    root = click.Group("synthetic", help="Synthetic CLI for scale tests.")
+    for node in nodes:
+        root.add_command(node)
+    return root
@@ -0,0 +1,91 @@
+"""Synthetic calendar and RSS feeds for exercising the feed tools at scale."""
+
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+# Generated events start here and step forward a few hours at a time
+EPOCH = datetime(2026, 1, 1, 9, 0)
+
+# RFC 5545 folds content lines longer than 75 octets
+FOLD_AT = 75
+
+_LOREM = "Agenda, notes and dial-in details for a synthetic meeting. "
+
+
+def _fold(line: str) -> list[str]:
+    """Split a content line into RFC 5545 folded lines."""
+    if len(line) <= FOLD_AT:
+        return [line]
+    parts = [line[:FOLD_AT]]
+    rest = line[FOLD_AT:]
+    while rest:
+        parts.append(" " + rest[: FOLD_AT - 1])
+        rest = rest[FOLD_AT - 1 :]
+    return parts
+
+
+def generate_ical(
+    n_events: int,
+    *,
+    start: datetime = EPOCH,
+    tzid_every: int = 3,
+    recurring_every: int = 10,
+    description_chars: int = 240,
+) -> str:
+    """
+    An iCal document with `n_events` one-hour events, four per day.
+
+    Like a real exported calendar, every `tzid_every`th event uses a local
+    `TZID` time, every `recurring_every`th carries a weekly `RRULE`, and
+    long descriptions are folded over several lines. Set either to 0 to
+    turn it off.
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//mcp-bolster//synthetic//EN",
+        "BEGIN:VTIMEZONE",
+        "TZID:Europe/London",
+        "END:VTIMEZONE",
+    ]
+    description = (_LOREM * (description_chars // len(_LOREM) + 1))[:description_chars]
+    for i in range(n_events):
+        begin = start + timedelta(hours=6 * i)
+        end = begin + timedelta(hours=1)
+        if tzid_every and i % tzid_every == tzid_every - 1:
+            times = [
+                f"DTSTART;TZID=Europe/London:{begin:%Y%m%dT%H%M%S}",
+                f"DTEND;TZID=Europe/London:{end:%Y%m%dT%H%M%S}",
+            ]
+        else:
+            times = [f"DTSTART:{begin:%Y%m%dT%H%M%S}Z", f"DTEND:{end:%Y%m%dT%H%M%S}Z"]
+        lines += ["BEGIN:VEVENT", f"UID:event-{i}@synthetic", *times]
+        if recurring_every and i % recurring_every == recurring_every - 1:
+            lines.append("RRULE:FREQ=WEEKLY;COUNT=10")
+        lines.append(f"SUMMARY:Synthetic event {i}")
+        if description_chars:
+            lines += _fold(f"DESCRIPTION:{description}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def generate_rss(n_items: int, *, start: datetime = EPOCH) -> str:
+    """An RSS 2.0 feed with `n_items` posts, newest first."""
+    items = []
+    for i in reversed(range(n_items)):
+        published = format_datetime(start + timedelta(days=i))
+        items.append(
+            "<item>"
+            f"<title>Synthetic post {i}</title>"
+            f"<link>https://example.invalid/posts/{i}</link>"
+            f"<description>&lt;p&gt;Body of post {i}. {'Lorem ipsum. ' * 20}&lt;/p&gt;</description>"
+            f"<pubDate>{published}</pubDate>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel><title>Synthetic</title>'
+        + "".join(items)
+        + "</channel></rss>"
+    )
@@ -0,0 +1,170 @@
+"""Tests for per-client rate limits and concurrency admission."""
+
+import anyio
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.client.transports import StreamableHttpTransport
+from mcp.shared.exceptions import McpError
+
+import admission
+import metrics
+from benchmarks.load_test import serve_http
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _gate(clock, *, rate=1.0, burst=2, concurrency=4, max_clients=100, **kwargs):
+    budget = admission.Budget(rate, burst, concurrency, **kwargs)
+    return admission.Gate("tool", budget, max_clients=max_clients, clock=clock)
+
+
+def test_bucket_allows_bursts_then_the_rate():
+    bucket = admission.TokenBucket(rate=2.0, burst=3, now=0.0)
+    assert [bucket.take(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    assert bucket.take(0.5) == 0.0
+    # Idle time never banks more than the burst
+    bucket.take(100.0)
+    assert bucket.tokens == pytest.approx(2.0)
+
+
+def test_clients_have_their_own_buckets():
+    clock = Clock()
+    gate = _gate(clock)
+    before = metrics.ADMISSION_REJECTIONS.value(budget="tool", reason="rate_limited")
+    gate.check_rate("10.0.0.1")
+    gate.check_rate("10.0.0.1")
+    with pytest.raises(admission.AdmissionError) as rejected:
+        gate.check_rate("10.0.0.1")
+    gate.check_rate("10.0.0.2")
+    assert rejected.value.status == 429
+    assert rejected.value.error.data == {"status": 429, "retry_after": 1.0}
+    clock.now += 1
+    gate.check_rate("10.0.0.1")
+    after = metrics.ADMISSION_REJECTIONS.value(budget="tool", reason="rate_limited")
+    assert after == before + 1
+
+
+def test_idle_clients_are_forgotten_first():
+    clock = Clock()
+    gate = _gate(clock, burst=1, max_clients=2)
+    gate.check_rate("idle")
+    clock.now += 10
+    gate.check_rate("busy")
+    gate.check_rate("new")
+    assert gate.clients() == 2
+    # Evicting the refilled bucket kept the busy client's empty one
+    with pytest.raises(admission.AdmissionError):
+        gate.check_rate("busy")
+    # With nothing idle, the least recently seen goes
+    gate.check_rate("newer")
+    assert list(gate._buckets) == ["busy", "newer"]
+
+
+@pytest.mark.asyncio
+async def test_requests_over_the_concurrency_cap_are_shed():
+    gate = _gate(Clock(), concurrency=1, queue_timeout=0.05)
+    before = metrics.ADMISSION_REJECTIONS.value(budget="tool", reason="overloaded")
+    async with gate.slot():
+        with pytest.raises(admission.AdmissionError) as rejected:
+            async with gate.slot():
+                pass
+    assert rejected.value.status == 503
+    async with gate.slot():
+        pass
+    after = metrics.ADMISSION_REJECTIONS.value(budget="tool", reason="overloaded")
+    assert after == before + 1
+
+
+@pytest.mark.asyncio
+async def test_a_slot_freed_within_the_queue_timeout_is_taken():
+    gate = _gate(Clock(), concurrency=1, queue_timeout=5)
+    entered = anyio.Event()
+    release = anyio.Event()
+
+    async def hold():
+        async with gate.slot():
+            entered.set()
+            await release.wait()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(hold)
+        await entered.wait()
+        tg.start_soon(lambda: anyio.sleep(0.01))
+        release.set()
+        with anyio.fail_after(1):
+            async with gate.slot():
+                pass
+
+
+def test_config_from_environment():
+    config = admission.AdmissionConfig.from_env(
+        {
+            "MCP_BOLSTER_ADMISSION_TOOL_RATE": "0.5",
+            "MCP_BOLSTER_ADMISSION_TOOL_CONCURRENCY": "3",
+            "MCP_BOLSTER_ADMISSION_RESOURCE_BURST": "100",
+        }
+    )
+    assert (config.tool.rate, config.tool.burst, config.tool.concurrency) == (
+        0.5,
+        10,
+        3,
+    )
+    assert config.resource.burst == 100
+    assert admission.AdmissionConfig.from_env({"MCP_BOLSTER_ADMISSION": "0"}) is None
+    with pytest.raises(ValueError, match="Invalid admission budget"):
+        admission.AdmissionConfig.from_env(
+            {"MCP_BOLSTER_ADMISSION_TOOL_CONCURRENCY": "0"}
+        )
+
+
+def _server(config):
+    server = FastMCP(name="test")
+
+    @server.tool
+    def ping() -> str:
+        return "pong"
+
+    @server.resource("resource://test/about")
+    def about() -> str:
+        return "About"
+
+    server.add_middleware(admission.AdmissionMiddleware(config))
+    return server
+
+
+@pytest.mark.asyncio
+async def test_http_clients_are_limited_by_address():
+    config = admission.AdmissionConfig(
+        tool=admission.Budget(rate=0.01, burst=2, concurrency=4),
+        resource=admission.Budget(rate=0.01, burst=1, concurrency=4),
+    )
+    server = _server(config)
+
+    def client(url, ip):
+        return Client(StreamableHttpTransport(url, headers={"X-Real-IP": ip}))
+
+    async with serve_http(server) as url:
+        async with client(url, "192.0.2.1") as first, client(url, "192.0.2.2") as other:
+            await first.call_tool("ping")
+            await first.call_tool("ping")
+            limited = await first.call_tool("ping", raise_on_error=False)
+            # Tools and resources have separate budgets, as do clients
+            await first.read_resource("resource://test/about")
+            with pytest.raises(McpError, match="Too many resource requests") as error:
+                await first.read_resource("resource://test/about")
+            await other.call_tool("ping")
+    assert limited.is_error
+    assert limited.content[0].text.startswith("Too many tool requests")
+    assert limited.meta["status"] == error.value.error.data["status"] == 429
+    assert 0 < limited.meta["retry_after"] <= 100
+    # Over stdio or in memory there is only one client, so nothing is limited
+    async with Client(server) as local:
+        for _ in range(5):
+            await local.call_tool("ping")
@@ -12,7 +12,11 @@ pytest.importorskip("bolster", reason="bolster package not installed")
 
 from bolster.cli import cli as bolster_cli  # noqa: E402
 
-from click_mcp import register_click_commands  # noqa: E402
+from click_mcp import (  # noqa: E402
+    build_manifest,
+    register_click_commands,
+    register_from_manifest,
+)
 
 
 @pytest.fixture(scope="module")
@@ -53,3 +57,18 @@ async def test_bolster_all_tools_have_valid_input_schema(bolster_mcp):
         assert schema.get("type") == "object", (
             f"Tool {tool.name!r} inputSchema type != object"
         )
+
+
+@pytest.mark.asyncio
+async def test_bolster_manifest_matches_eager_tools(bolster_mcp):
+    """Lazy tools built from a manifest advertise the same tools as eager ones."""
+    lazy = FastMCP("bolster-manifest-test")
+    manifest = build_manifest(
+        bolster_cli, version="test", prefix="bolster", exclude={"list-sources"}
+    )
+    register_from_manifest(lazy, manifest, lambda: bolster_cli)
+    async with Client(bolster_mcp) as client:
+        eager = {t.name: t.inputSchema for t in await client.list_tools()}
+    async with Client(lazy) as client:
+        lazy_tools = {t.name: t.inputSchema for t in await client.list_tools()}
+    assert lazy_tools == eager
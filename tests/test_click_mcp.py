@@ -1,10 +1,28 @@
 """Tests for the click_mcp introspection harness using the fake CLI fixture."""
 
+import asyncio
+import json
+import threading
+import time
+
+import anyio
 import click
 import pytest
 from fastmcp import Client, FastMCP
-
-from click_mcp import register_click_commands
+from fastmcp.exceptions import ToolError
+
+from click_mcp import (
+    ResultCache,
+    ResultStore,
+    RunObserver,
+    _ChunkForwarder,
+    build_manifest,
+    load_manifest,
+    register_click_commands,
+    register_click_manifest,
+    register_from_manifest,
+    write_manifest,
+)
 from tests.fixtures.fake_cli.cli import cli as fake_cli
 
 
@@ -101,16 +119,14 @@ async def test_greet_with_flag(mcp):
 async def test_data_fetch_defaults(mcp):
     async with Client(mcp) as client:
         result = await client.call_tool("fake_data_fetch", {})
-    lines = result.content[0].text.strip().splitlines()
-    assert len(lines) == 10  # default limit=10
+    assert len(result.data) == 10  # default limit=10
 
 
 @pytest.mark.asyncio
 async def test_data_fetch_with_limit(mcp):
     async with Client(mcp) as client:
         result = await client.call_tool("fake_data_fetch", {"limit": 3})
-    lines = result.content[0].text.strip().splitlines()
-    assert len(lines) == 3
+    assert len(result.data) == 3
 
 
 @pytest.mark.asyncio
@@ -175,3 +191,640 @@ async def test_positional_argument_handling():
     async with Client(server) as client:
         result = await client.call_tool("ping", {"target": "localhost", "count": 2})
     assert result.content[0].text == "ping localhost x2"
+
+
+FAKE_CLI_IMPORT = "tests.fixtures.fake_cli.cli:cli"
+
+
+@pytest.mark.asyncio
+async def test_manifest_tools_match_eager_registration(mcp):
+    manifest = build_manifest(fake_cli, version="1.0", prefix="fake")
+    lazy = FastMCP(name="lazy")
+    register_from_manifest(lazy, manifest, lambda: fake_cli)
+    async with Client(mcp) as client:
+        eager_tools = {t.name: t for t in await client.list_tools()}
+    async with Client(lazy) as client:
+        lazy_tools = {t.name: t for t in await client.list_tools()}
+    assert lazy_tools.keys() == eager_tools.keys()
+    for name, tool in lazy_tools.items():
+        assert tool.inputSchema == eager_tools[name].inputSchema
+        assert tool.description == eager_tools[name].description
+
+
+@pytest.mark.asyncio
+async def test_manifest_loader_deferred_until_first_call():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return fake_cli
+
+    manifest = build_manifest(fake_cli, version="1.0", prefix="fake")
+    server = FastMCP(name="lazy")
+    register_from_manifest(server, manifest, loader)
+    async with Client(server) as client:
+        await client.list_tools()
+        assert calls == []
+        result = await client.call_tool("fake_greet", {"name": "Lazy", "count": 2})
+    assert result.content[0].text == "Hello, Lazy!" * 2
+    assert calls
+
+
+@pytest.mark.asyncio
+async def test_register_click_manifest_writes_and_reuses(tmp_path, monkeypatch):
+    manifest_path = tmp_path / "manifest.json"
+    first = register_click_manifest(
+        FastMCP(name="a"),
+        FAKE_CLI_IMPORT,
+        manifest_path=manifest_path,
+        version="1.0",
+        prefix="fake",
+    )
+    assert manifest_path.exists()
+    assert set(first) == {"fake_greet", "fake_data_fetch", "fake_data_summary"}
+
+    # A matching manifest must be used without building a new one
+    import click_mcp
+
+    def fail(*args, **kwargs):
+        raise AssertionError("manifest should have been reused")
+
+    monkeypatch.setattr(click_mcp, "build_manifest", fail)
+    second = register_click_manifest(
+        FastMCP(name="b"),
+        FAKE_CLI_IMPORT,
+        manifest_path=manifest_path,
+        version="1.0",
+        prefix="fake",
+    )
+    assert second == first
+
+
+def test_load_manifest_rejects_stale_version(tmp_path):
+    manifest_path = tmp_path / "manifest.json"
+    write_manifest(manifest_path, build_manifest(fake_cli, version="1.0"))
+    assert load_manifest(manifest_path, version="1.0") is not None
+    assert load_manifest(manifest_path, version="2.0") is None
+    assert load_manifest(manifest_path, version="1.0", prefix="other") is None
+    assert load_manifest(tmp_path / "missing.json", version="1.0") is None
+
+
+@pytest.mark.asyncio
+async def test_option_with_custom_dest_uses_declared_flag(mcp):
+    """--filter is stored as filter_str; the tool must still pass --filter."""
+    async with Client(mcp) as client:
+        result = await client.call_tool(
+            "fake_data_fetch", {"limit": 2, "filter_str": "x"}
+        )
+    assert result.data == [{"id": 0, "value": 0}, {"id": 1, "value": 2}]
+
+
+@pytest.mark.asyncio
+async def test_json_format_returns_structured_content(mcp):
+    async with Client(mcp) as client:
+        tools = await client.list_tools()
+        fetch = next(t for t in tools if t.name == "fake_data_fetch")
+        greet = next(t for t in tools if t.name == "fake_greet")
+        result = await client.call_tool("fake_data_fetch", {"limit": 2})
+    assert fetch.outputSchema["required"] == ["result"]
+    assert greet.outputSchema is None
+    assert result.structured_content == {
+        "result": [{"id": 0, "value": 0}, {"id": 1, "value": 2}]
+    }
+    # Text content is the same document, compacted
+    assert result.content[0].text == '[{"id":0,"value":0},{"id":1,"value":2}]'
+
+
+@pytest.mark.asyncio
+async def test_structured_output_can_be_disabled():
+    server = FastMCP(name="test")
+    register_click_commands(server, fake_cli, prefix="fake", structured_output=False)
+    async with Client(server) as client:
+        result = await client.call_tool("fake_data_fetch", {"limit": 2})
+    assert result.content[0].text.splitlines() == ["0: 0", "1: 2"]
+    assert result.structured_content is None
+
+
+@pytest.mark.asyncio
+async def test_manifest_records_json_format():
+    manifest = build_manifest(fake_cli, version="1.0", prefix="fake")
+    lazy = FastMCP(name="lazy")
+    register_from_manifest(lazy, manifest, lambda: fake_cli)
+    async with Client(lazy) as client:
+        result = await client.call_tool("fake_data_fetch", {"limit": 1})
+    assert result.data == [{"id": 0, "value": 0}]
+
+
+def _chatty_json_cli():
+    @click.group()
+    def root():
+        pass
+
+    @root.command()
+    @click.option("--format", "output_format", type=click.Choice(["csv", "JSON"]))
+    @click.option("--broken", is_flag=True, default=False)
+    def report(output_format, broken):
+        """Print status lines before the payload."""
+        click.echo("Fetching report...")
+        click.echo("[ok] 2 rows")
+        if broken:
+            click.echo("{not json")
+        else:
+            click.echo(json.dumps({"rows": [1, 2]}, indent=2))
+
+    return root
+
+
+@pytest.mark.asyncio
+async def test_json_output_skips_leading_status_lines():
+    server = FastMCP(name="test")
+    register_click_commands(server, _chatty_json_cli())
+    async with Client(server) as client:
+        result = await client.call_tool("report", {})
+        broken = await client.call_tool("report", {"broken": True})
+    assert result.data == {"rows": [1, 2]}
+    # Output that never becomes JSON is passed through as text
+    assert broken.data.endswith("{not json")
+
+
+def _rows_cli():
+    @click.group()
+    def root():
+        pass
+
+    @root.command()
+    @click.option("--rows", default=5, type=int)
+    @click.option("--label", default="row")
+    @click.option("--pause", default=0.0, type=float)
+    def dump(rows, label, pause):
+        """Print numbered rows."""
+        for i in range(rows):
+            click.echo(f"{label} {i}")
+            if pause:
+                time.sleep(pause)
+
+    return root
+
+
+@pytest.mark.asyncio
+async def test_streaming_falls_back_to_log_messages_without_progress_token():
+    class FakeContext:
+        request_context = None
+
+        def __init__(self):
+            self.logs = []
+
+        async def log(self, message, level=None, logger_name=None):
+            self.logs.append((logger_name, message))
+
+    ctx = FakeContext()
+    forwarder = _ChunkForwarder(ctx, "dump", max_pending=8)
+
+    def worker():
+        for i in range(20):
+            forwarder.feed(f"row {i}\n")
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(forwarder.pump)
+        await anyio.to_thread.run_sync(worker)
+        forwarder.close()
+    assert {name for name, _ in ctx.logs} == {"dump"}
+    assert "".join(m for _, m in ctx.logs).splitlines() == [
+        f"row {i}" for i in range(20)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_streaming_uses_progress_notifications_when_requested():
+    server = FastMCP(name="test")
+    register_click_commands(server, _rows_cli(), stream_output=True)
+    progress = []
+
+    async def on_progress(value, total, message):
+        progress.append((value, message))
+
+    async with Client(server) as client:
+        await client.call_tool("dump", {"rows": 3}, progress_handler=on_progress)
+    assert "".join(m for _, m in progress) == "row 0\nrow 1\nrow 2\n"
+    values = [v for v, _ in progress]
+    assert values == sorted(values)
+
+
+@pytest.mark.asyncio
+async def test_streaming_caps_final_result():
+    server = FastMCP(name="test")
+    register_click_commands(
+        server, _rows_cli(), stream_output=True, max_output_chars=20
+    )
+    async with Client(server) as client:
+        result = await client.call_tool("dump", {"rows": 1000})
+    text = result.content[0].text
+    assert text.startswith("row 0\nrow 1\n")
+    assert "[output truncated:" in text
+    assert len(text) < 200
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_capture_their_own_output():
+    server = FastMCP(name="test")
+    register_click_commands(server, _rows_cli())
+    async with Client(server) as client:
+        a, b = await asyncio.gather(
+            client.call_tool("dump", {"rows": 5, "label": "a", "pause": 0.01}),
+            client.call_tool("dump", {"rows": 5, "label": "b", "pause": 0.01}),
+        )
+    assert a.content[0].text.splitlines() == [f"a {i}" for i in range(5)]
+    assert b.content[0].text.splitlines() == [f"b {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_usage_error_reports_exit_code(mcp):
+    async with Client(mcp) as client:
+        result = await client.call_tool(
+            "fake_greet", {"name": "x", "count": -1}, raise_on_error=False
+        )
+    text = result.content[0].text
+    assert result.is_error
+    assert text.startswith("Error (exit 2):")
+    assert "Invalid value for '--count'" in text
+
+
+@pytest.mark.asyncio
+async def test_flag_argument_is_coerced_like_the_schema(mcp):
+    async with Client(mcp) as client:
+        result = await client.call_tool("fake_greet", {"name": "x", "shout": "false"})
+    assert result.content[0].text == "Hello, x!"
+
+
+@pytest.mark.asyncio
+async def test_unknown_argument_is_rejected(mcp):
+    async with Client(mcp) as client:
+        with pytest.raises(ToolError, match="Unknown arguments for fake_greet: colour"):
+            await client.call_tool("fake_greet", {"name": "x", "colour": "red"})
+
+
+@pytest.mark.asyncio
+async def test_argument_of_wrong_type_is_rejected(mcp):
+    async with Client(mcp) as client:
+        with pytest.raises(ToolError, match="Invalid arguments for fake_greet: count"):
+            await client.call_tool("fake_greet", {"name": "x", "count": 0.5})
+
+
+@pytest.mark.asyncio
+async def test_large_json_result_is_paginated_without_rerunning():
+    calls = 0
+
+    def loader():
+        nonlocal calls
+        calls += 1
+        return fake_cli
+
+    server = FastMCP(name="test")
+    manifest = build_manifest(fake_cli, version="1.0", prefix="fake")
+    register_from_manifest(server, manifest, loader, page_size=10)
+    async with Client(server) as client:
+        first = await client.call_tool("fake_data_fetch", {"limit": 25})
+        rows = list(first.data)
+        cursor = first.structured_content["next_cursor"]
+        while cursor:
+            page = await client.call_tool("fake_next_page", {"cursor": cursor})
+            rows.extend(page.structured_content["result"])
+            cursor = page.structured_content["next_cursor"]
+    assert len(first.data) == 10
+    assert first.structured_content["total"] == 25
+    assert rows == [{"id": i, "value": i * 2} for i in range(25)]
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_small_results_are_not_paginated(mcp):
+    server = FastMCP(name="test")
+    register_click_commands(server, fake_cli, prefix="fake", page_size=10)
+    async with Client(server) as client:
+        result = await client.call_tool("fake_data_fetch", {"limit": 10})
+    assert result.structured_content == {
+        "result": [{"id": i, "value": i * 2} for i in range(10)]
+    }
+
+
+@pytest.mark.asyncio
+async def test_long_text_output_is_paginated_by_line():
+    server = FastMCP(name="test")
+    register_click_commands(server, _rows_cli(), page_size=3)
+    async with Client(server) as client:
+        first = await client.call_tool("dump", {"rows": 7})
+        cursor = first.meta["next_cursor"]
+        second = await client.call_tool("next_page", {"cursor": cursor})
+    assert first.content[0].text.splitlines()[:3] == ["row 0", "row 1", "row 2"]
+    assert f'cursor "{cursor}"' in first.content[0].text
+    assert second.content[0].text.splitlines()[:3] == ["row 3", "row 4", "row 5"]
+
+
+@pytest.mark.asyncio
+async def test_expired_cursor_is_rejected():
+    server = FastMCP(name="test")
+    register_click_commands(
+        server, fake_cli, prefix="fake", page_size=5, result_store=ResultStore(ttl=0)
+    )
+    async with Client(server) as client:
+        first = await client.call_tool("fake_data_fetch", {"limit": 20})
+        with pytest.raises(ToolError, match="expired cursor"):
+            await client.call_tool(
+                "fake_next_page", {"cursor": first.structured_content["next_cursor"]}
+            )
+
+
+def test_result_store_evicts_oldest_beyond_capacity():
+    store = ResultStore(max_entries=2)
+    keys = [store.put([i], structured=True) for i in range(3)]
+    assert store.get(keys[0]) is None
+    assert store.get(keys[2]) == ([2], True)
+    assert len(store) == 2
+
+
+def _spin_cli(state):
+    @click.group()
+    def root():
+        pass
+
+    @root.command()
+    def spin():
+        """Loop until interrupted, swallowing ordinary exceptions like real CLIs."""
+        state["started"].set()
+        try:
+            while True:
+                try:
+                    time.sleep(0.005)
+                    state["ticks"] += 1
+                except Exception:
+                    pass
+        finally:
+            state["stopped"] = True
+
+    @root.command()
+    def ping():
+        click.echo("pong")
+
+    return root
+
+
+def _spin_state():
+    return {"started": threading.Event(), "ticks": 0, "stopped": False}
+
+
+async def _wait_stopped(state):
+    with anyio.fail_after(2):
+        while not state["stopped"]:
+            await anyio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_deadline_stops_running_command():
+    state = _spin_state()
+    server = FastMCP(name="test")
+    register_click_commands(server, _spin_cli(state), timeouts={"spin": 0.2})
+    async with Client(server) as client:
+        with pytest.raises(ToolError, match="timed out after 0.2s"):
+            await client.call_tool("spin", {})
+        await _wait_stopped(state)
+        # The interrupted worker thread is still usable
+        result = await client.call_tool("ping", {})
+    assert result.content[0].text == "pong"
+
+
+@pytest.mark.asyncio
+async def test_client_cancel_stops_running_command():
+    state = _spin_state()
+    server = FastMCP(name="test")
+    register_click_commands(server, _spin_cli(state))
+    tool = await server.get_tool("spin")
+    # An MCP cancel notification cancels the request's scope, as here
+    with anyio.move_on_after(0.2):
+        await tool.run({})
+    assert state["started"].is_set()
+    await _wait_stopped(state)
+
+
+def test_timeouts_for_unknown_tools_are_rejected():
+    with pytest.raises(ValueError, match="unknown tool 'fake_nope'"):
+        register_click_commands(
+            FastMCP(name="test"), fake_cli, prefix="fake", timeouts={"fake_nope": 1}
+        )
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_items_concurrently_in_input_order():
+    server = FastMCP(name="test")
+    register_click_commands(server, _rows_cli(), batch=True)
+    items = [
+        {"command": "dump", "args": {"rows": 1, "label": label, "pause": pause}}
+        for label, pause in [("slow", 0.3), ("mid", 0.2), ("fast", 0.1)]
+    ]
+    async with Client(server) as client:
+        start = time.perf_counter()
+        result = await client.call_tool("batch", {"items": items})
+        elapsed = time.perf_counter() - start
+    results = result.structured_content["result"]
+    assert [r["result"] for r in results] == ["slow 0", "mid 0", "fast 0"]
+    assert all(r["ok"] for r in results)
+    assert elapsed < 0.55  # the slowest item, not the sum
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_item_errors_independently():
+    server = FastMCP(name="test")
+    register_click_commands(server, fake_cli, prefix="fake", batch=True)
+    items = [
+        {"command": "fake_nope"},
+        {"command": "fake_greet"},
+        {"command": "fake_greet", "args": {"name": "Ann", "colour": "red"}},
+        {"command": "fake_data_fetch", "args": {"limit": 2}},
+    ]
+    async with Client(server) as client:
+        result = await client.call_tool("fake_batch", {"items": items})
+    unknown, missing, extra, fetched = result.structured_content["result"]
+    assert unknown["ok"] is False
+    assert "Unknown command" in unknown["error"]
+    assert "Missing arguments" in missing["error"]
+    assert "Unknown arguments for fake_greet: colour" in extra["error"]
+    assert fetched == {
+        "command": "fake_data_fetch",
+        "ok": True,
+        "result": [{"id": 0, "value": 0}, {"id": 1, "value": 2}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_failing_text_command():
+    server = FastMCP(name="test")
+    register_click_commands(server, fake_cli, prefix="fake", batch=True)
+    items = [
+        {"command": "fake_greet", "args": {"name": "Ann", "count": -1}},
+        {"command": "fake_greet", "args": {"name": "Bob"}},
+    ]
+    async with Client(server) as client:
+        result = await client.call_tool("fake_batch", {"items": items})
+    failed, greeted = result.structured_content["result"]
+    assert failed["ok"] is False
+    assert failed["result"].startswith("Error (exit 2):")
+    assert greeted == {"command": "fake_greet", "ok": True, "result": "Hello, Bob!"}
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_limits_calls_of_one_command():
+    server = FastMCP(name="test")
+    register_click_commands(server, _rows_cli(), batch=True, max_concurrency=1)
+    item = {"command": "dump", "args": {"rows": 1, "pause": 0.2}}
+    async with Client(server) as client:
+        start = time.perf_counter()
+        await client.call_tool("batch", {"items": [item, item]})
+        elapsed = time.perf_counter() - start
+    assert elapsed >= 0.4
+
+
+class _RecordingObserver(RunObserver):
+    def __init__(self):
+        self.events = []
+
+    def queued(self, tool):
+        self.events.append(("queued", tool))
+
+    def dequeued(self, tool):
+        self.events.append(("dequeued", tool))
+
+    def finished(self, tool, seconds):
+        self.events.append(("finished", tool, seconds))
+
+
+@pytest.mark.asyncio
+async def test_observer_sees_queueing_and_run_time():
+    observer = _RecordingObserver()
+    server = FastMCP(name="test")
+    register_click_commands(
+        server, _rows_cli(), batch=True, max_concurrency=1, observer=observer
+    )
+    item = {"command": "dump", "args": {"rows": 1, "pause": 0.2}}
+    async with Client(server) as client:
+        await client.call_tool("batch", {"items": [item, item]})
+    kinds = [event[0] for event in observer.events]
+    assert sorted(kinds) == ["dequeued"] * 2 + ["finished"] * 2 + ["queued"] * 2
+    run_times = [event[2] for event in observer.events if event[0] == "finished"]
+    assert all(0.2 <= seconds < 1.0 for seconds in run_times)
+
+
+def _async_cli(seen_loops):
+    @click.group()
+    def root():
+        pass
+
+    @root.command()
+    @click.option("--label", default="tick")
+    @click.option("--rows", default=3, type=int)
+    @click.option("--pause", default=0.0, type=float)
+    @click.pass_context
+    async def ticks(ctx, label, rows, pause):
+        """Print rows from a coroutine callback."""
+        seen_loops.append(asyncio.get_running_loop())
+        for i in range(rows):
+            await asyncio.sleep(pause)
+            click.echo(f"{label} {i}")
+
+    @root.command()
+    @click.option("--count", type=int, required=True)
+    async def check(count):
+        if count < 0:
+            raise click.BadParameter("must not be negative", param_hint="'--count'")
+        click.echo("ok")
+
+    return root
+
+
+@pytest.mark.asyncio
+async def test_async_callbacks_are_awaited_on_the_server_loop():
+    seen_loops = []
+    server = FastMCP(name="test")
+    register_click_commands(server, _async_cli(seen_loops))
+    async with Client(server) as client:
+        result = await client.call_tool("ticks", {"rows": 2})
+    assert result.content[0].text == "tick 0\ntick 1"
+    assert seen_loops == [asyncio.get_running_loop()]
+
+
+@pytest.mark.asyncio
+async def test_async_callback_errors_report_exit_code():
+    server = FastMCP(name="test")
+    register_click_commands(server, _async_cli([]))
+    async with Client(server) as client:
+        result = await client.call_tool("check", {"count": -1}, raise_on_error=False)
+        with pytest.raises(ToolError, match="Missing arguments for check: count"):
+            await client.call_tool("check", {})
+    assert result.content[0].text.startswith("Error (exit 2)")
+    assert "must not be negative" in result.content[0].text
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_calls_capture_their_own_output():
+    server = FastMCP(name="test")
+    register_click_commands(server, _async_cli([]))
+    async with Client(server) as client:
+        results = await asyncio.gather(
+            *(
+                client.call_tool("ticks", {"label": label, "rows": 5, "pause": 0.01})
+                for label in ("a", "b", "c")
+            )
+        )
+    for label, result in zip("abc", results, strict=True):
+        assert result.content[0].text.splitlines() == [f"{label} {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_async_callbacks_stream_and_time_out():
+    server = FastMCP(name="test")
+    register_click_commands(
+        server, _async_cli([]), stream_output=True, timeouts={"check": 5, "ticks": 0.2}
+    )
+    progress = []
+
+    async def on_progress(value, total, message):
+        progress.append(message)
+
+    async with Client(server, progress_handler=on_progress) as client:
+        with pytest.raises(ToolError, match="timed out"):
+            await client.call_tool("ticks", {"rows": 100, "pause": 0.05})
+    assert progress and progress[0].startswith("tick 0")
+
+
+def test_manifest_records_async_commands():
+    manifest = build_manifest(_async_cli([]), version="1.0")
+    assert all(entry["is_async"] for entry in manifest["tools"])
+    assert not any(
+        entry["is_async"] for entry in build_manifest(fake_cli, version="1")["tools"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_result_cache_skips_rerunning_successful_commands():
+    calls = 0
+
+    def loader():
+        nonlocal calls
+        calls += 1
+        return fake_cli
+
+    cache = ResultCache()
+    server = FastMCP(name="test")
+    manifest = build_manifest(fake_cli, version="1.0", prefix="fake")
+    register_from_manifest(server, manifest, loader, result_cache=cache)
+    async with Client(server) as client:
+        first = await client.call_tool("fake_greet", {"name": "Ann"})
+        second = await client.call_tool("fake_greet", {"name": "Ann"})
+        other = await client.call_tool("fake_greet", {"name": "Bob"})
+        for _ in range(2):
+            await client.call_tool(
+                "fake_greet", {"name": "Ann", "count": -1}, raise_on_error=False
+            )
+    assert first.content[0].text == second.content[0].text == "Hello, Ann!"
+    assert other.content[0].text == "Hello, Bob!"
+    # Failed runs are not cached
+    assert calls == 4
+    assert (cache.hits, len(cache)) == (1, 2)
@@ -0,0 +1,113 @@
+"""Tests for resource content loaded from a data directory."""
+
+import asyncio
+import hashlib
+import os
+
+import pytest
+from fastmcp import Client, FastMCP
+
+import content
+
+
+def _write(path, text, *, bump=0):
+    path.write_text(text)
+    if bump:
+        # Coarse filesystem timestamps could hide a quick second write
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+
+
+@pytest.fixture
+def store(tmp_path):
+    _write(tmp_path / "about.md", "# About\n")
+    _write(tmp_path / "links.md", "# Links\n")
+    (tmp_path / "notes.txt").write_text("not a document")
+    return content.ContentStore(tmp_path)
+
+
+def test_documents_are_loaded_with_size_and_digest(store):
+    assert store.reload() == ["about", "links"]
+    document = store.get("about")
+    assert document.text == "# About\n"
+    assert document.size == len(b"# About\n")
+    assert document.sha256 == hashlib.sha256(b"# About\n").hexdigest()
+    assert store.names() == ["about", "links"]
+
+
+def test_only_changed_documents_are_swapped(store):
+    store.reload()
+    links = store.get("links")
+    assert store.reload() == []
+    _write(store.directory / "about.md", "# About me\n", bump=10**9)
+    # Touched but identical content is re-read but not reported as changed
+    _write(store.directory / "links.md", "# Links\n", bump=10**9)
+    assert store.reload() == ["about"]
+    assert store.get("about").text == "# About me\n"
+    assert store.get("links").sha256 == links.sha256
+
+
+def test_unreadable_or_removed_files_keep_their_last_version(store):
+    store.reload()
+    (store.directory / "about.md").write_bytes(b"\xff\xfe broken")
+    (store.directory / "links.md").unlink()
+    assert store.reload() == []
+    assert store.get("about").text == "# About\n"
+    assert store.get("links").text == "# Links\n"
+
+
+@pytest.mark.asyncio
+async def test_resources_serve_the_current_version(store):
+    server = FastMCP(name="test")
+    content.register(
+        server, {"about": "About me."}, prefix="resource://test/", store=store
+    )
+    async with Client(server) as client:
+        [listed] = await client.list_resources()
+        first = await client.read_resource("resource://test/about")
+        _write(store.directory / "about.md", "# About, edited\n", bump=10**9)
+        store.reload()
+        second = await client.read_resource("resource://test/about")
+        [relisted] = await client.list_resources()
+    assert listed.name == "get_about"
+    assert listed.description == "About me."
+    assert listed.size == len("# About\n")
+    assert listed.meta["sha256"] == first[0].meta["sha256"]
+    assert relisted.meta["sha256"] == store.get("about").sha256
+    assert first[0].text == "# About\n"
+    assert second[0].text == "# About, edited\n"
+    assert relisted.size == len("# About, edited\n")
+
+
+def test_registering_a_missing_document_fails(store):
+    with pytest.raises(FileNotFoundError, match="missing.md"):
+        content.register(
+            FastMCP(name="test"),
+            {"missing": "?"},
+            prefix="resource://test/",
+            store=store,
+        )
+
+
+@pytest.mark.asyncio
+async def test_watcher_picks_up_edits(store):
+    store.reload()
+    task = asyncio.create_task(content._watch(store, 0.01))
+    try:
+        _write(store.directory / "links.md", "# More links\n", bump=10**9)
+        for _ in range(200):
+            if store.get("links").text == "# More links\n":
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+    assert store.get("links").text == "# More links\n"
+
+
+def test_app_resources_come_from_the_data_directory():
+    import app  # noqa: F401
+
+    for name in content.store.names():
+        path = content.CONTENT_DIR / f"{name}.md"
+        assert content.store.get(name).data == path.read_bytes()
+    assert len(content.store.names()) == 7
@@ -0,0 +1,35 @@
+"""Tests for per-call deadline budgets."""
+
+import pytest
+from fastmcp import Client, FastMCP
+
+import deadline
+
+
+def test_budgets_nest_without_extending():
+    assert deadline.remaining() is None
+    with deadline.budget(5):
+        assert 4.9 < deadline.remaining() <= 5
+        with deadline.budget(60):
+            assert deadline.remaining() <= 5
+        with deadline.budget(1):
+            assert deadline.remaining() <= 1
+        assert deadline.remaining() > 4.9
+    assert deadline.remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_run_within_the_budget(monkeypatch):
+    server = FastMCP(name="test")
+
+    @server.tool
+    def left() -> float | None:
+        return deadline.remaining()
+
+    assert deadline.install(server, seconds=3)
+    async with Client(server) as client:
+        result = await client.call_tool("left")
+    assert 2.9 < result.data <= 3
+
+    monkeypatch.setenv(deadline.ENV_VAR, "0")
+    assert not deadline.install(FastMCP(name="unbudgeted"))
@@ -0,0 +1,117 @@
+"""Tests for the in-app health, readiness and liveness routes."""
+
+import asyncio
+import threading
+import time
+
+import anyio
+import anyio.to_thread
+import httpx
+import pytest
+from fastmcp import FastMCP
+
+import health
+import upstream
+
+
+async def _get(path):
+    server = FastMCP(name="test")
+    health.install(server)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=server.http_app()), base_url="http://test"
+    ) as client:
+        return await client.get(path)
+
+
+@pytest.mark.asyncio
+async def test_fresh_process_is_ready():
+    response = await _get("/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["feeds"]["calendar"] == {
+        "snapshot_age": None,
+        "stale": True,
+        "circuit": "closed",
+        "ok": True,
+    }
+    assert body["workers"]["ok"]
+    assert body["last_upstream_error"] is None
+    assert (await _get("/live")).json()["status"] == "alive"
+
+
+@pytest.mark.asyncio
+async def test_failing_feed_without_snapshot_is_not_ready(monkeypatch, upstream_feeds):
+    monkeypatch.setattr(upstream, "RETRIES", 0)
+    monkeypatch.setattr(upstream, "FAILURE_TTL", 0)
+    upstream_feeds.serve([503, 200], body=b"<rss/>")
+    async with upstream.http_lifespan(None):
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.fetch(upstream.RSS_URL)
+        response = await _get("/ready")
+        assert response.status_code == 503
+        body = response.json()
+        assert not body["feeds"]["blog"]["ok"]
+        assert "503" in body["feeds"]["blog"]["error"]
+        assert body["last_upstream_error"]["feed"] == "blog"
+        # /health reports the same without failing the request
+        assert (await _get("/health")).status_code == 200
+
+        await upstream.fetch(upstream.RSS_URL)
+    body = (await _get("/ready")).json()
+    assert body["status"] == "ok"
+    assert body["feeds"]["blog"]["stale"] is False
+    # The last error is kept for diagnosis after the feed recovers
+    assert body["last_upstream_error"]["feed"] == "blog"
+
+
+@pytest.mark.asyncio
+async def test_failing_feed_with_recent_snapshot_stays_ready(
+    monkeypatch, upstream_feeds
+):
+    monkeypatch.setattr(upstream, "RETRIES", 0)
+    upstream_feeds.serve([200, 503], body=b"<rss/>")
+    async with upstream.http_lifespan(None):
+        await upstream.fetch(upstream.RSS_URL)
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.fetch(upstream.RSS_URL, max_age=0)
+    report = health.report()
+    assert report["status"] == "ok"
+    assert "error" in report["feeds"]["blog"]
+
+
+@pytest.mark.asyncio
+async def test_blocked_event_loop_is_reported(monkeypatch):
+    monkeypatch.setattr(health, "LAG_INTERVAL", 0.05)
+    monkeypatch.setattr(health, "MAX_LOOP_LAG", 0.1)
+    async with health.health_lifespan(None):
+        await asyncio.sleep(0.01)
+        time.sleep(0.3)  # Block the loop
+        await asyncio.sleep(0.01)
+        report = health.report()
+    assert report["event_loop"]["lag"] >= 0.2
+    assert report["status"] == "degraded"
+    assert health.loop_lag is None
+
+
+@pytest.mark.asyncio
+async def test_only_a_lasting_thread_backlog_makes_the_worker_unready(monkeypatch):
+    monkeypatch.setattr(health, "_backlogged_since", None)
+    monkeypatch.setattr(health, "MAX_BACKLOG_SECONDS", 0.2)
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    monkeypatch.setattr(limiter, "total_tokens", 1)
+    release = threading.Event()
+    async with anyio.create_task_group() as tg:
+        # One call running and two waiting: more waiting than there are threads
+        for _ in range(3):
+            tg.start_soon(anyio.to_thread.run_sync, release.wait)
+        await anyio.sleep(0.05)
+        brief = await _get("/ready")
+        await anyio.sleep(0.25)
+        lasting = await _get("/ready")
+        release.set()
+    assert brief.status_code == 200
+    assert brief.json()["workers"]["threads_waiting"] == 2
+    assert lasting.status_code == 503
+    assert lasting.json()["workers"]["backlogged_for"] >= 0.2
+    assert (await _get("/ready")).status_code == 200
@@ -0,0 +1,54 @@
+"""Smoke tests keeping the load-test harness runnable."""
+
+import json
+
+import pytest
+from fastmcp import Client
+
+import upstream
+from app import mcp
+from benchmarks.load_test import percentile, run, stand_in_upstreams
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_tools_read_the_stand_in_feeds():
+    original = upstream.ICAL_URL
+    with stand_in_upstreams(events=8, items=3):
+        async with Client(mcp) as client:
+            calendar = await client.call_tool(
+                "check_availability", {"start_date": "2026-01-01", "days_ahead": 1}
+            )
+            posts = await client.call_tool("get_recent_blog_posts", {"limit": 10})
+    assert "Synthetic event 0" in calendar.content[0].text
+    assert [p["title"] for p in json.loads(posts.content[0].text)] == [
+        "Synthetic post 2",
+        "Synthetic post 1",
+        "Synthetic post 0",
+    ]
+    assert upstream.ICAL_URL == original
+
+
+@pytest.mark.asyncio
+async def test_every_scenario_runs_over_both_transports():
+    results = await run(
+        events=[50],
+        items=[20],
+        concurrency=[2],
+        transports=["memory", "http"],
+        scenarios=["calendar", "blog", "click"],
+        requests=4,
+    )
+    assert {(r["scenario"], r["transport"]) for r in results} == {
+        (scenario, transport)
+        for scenario in ("calendar", "blog", "click-text", "click-json")
+        for transport in ("memory", "http")
+    }
+    assert all(r["errors"] == 0 and r["p99_ms"] >= r["p50_ms"] for r in results)
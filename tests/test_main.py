@@ -0,0 +1,156 @@
+"""Tests for the HTTP runtime modes in main.py."""
+
+import configparser
+import dataclasses
+import json
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+import uvicorn
+
+import main
+
+
+def test_modes_pick_the_loop_and_parser():
+    standard = main.RuntimeConfig()
+    fast = main.RuntimeConfig(mode="fast")
+    assert (standard.loop, standard.http) == ("asyncio", "h11")
+    assert (fast.loop, fast.http) == ("uvloop", "httptools")
+    # Keep-alive outlasts nginx's idle upstream connections in every mode
+    assert standard.keep_alive == fast.keep_alive > 60
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="turbo"):
+        main.RuntimeConfig(mode="turbo")
+
+
+def test_fast_mode_falls_back_when_not_installed(monkeypatch, caplog):
+    monkeypatch.setattr(
+        main.importlib.util,
+        "find_spec",
+        lambda name: None if name == "uvloop" else object(),
+    )
+    config = main.RuntimeConfig(mode="fast").resolved()
+    assert (config.loop, config.http) == ("asyncio", "httptools")
+    assert "uvloop is not installed" in caplog.text
+
+
+def test_command_line_overrides_environment():
+    environ = {
+        "MCP_BOLSTER_RUNTIME": "fast",
+        "MCP_BOLSTER_WORKERS": "3",
+        "MCP_BOLSTER_KEEP_ALIVE": "90",
+    }
+    config = main.parse_args(["--mode", "standard", "--workers", "2"], environ)
+    assert (config.mode, config.loop, config.http) == ("standard", "asyncio", "h11")
+    assert (config.workers, config.keep_alive, config.port) == (2, 90, 9001)
+    # An explicit loop wins over the mode's
+    assert main.parse_args(["--loop", "uvloop"], {}).loop == "uvloop"
+
+
+def test_every_setting_can_come_from_the_environment():
+    assert set(main._CONVERTERS) == {
+        f.name for f in dataclasses.fields(main.RuntimeConfig)
+    }
+    config = main.RuntimeConfig.from_env(
+        {"MCP_BOLSTER_HOST": "0.0.0.0", "MCP_BOLSTER_LIMIT_CONCURRENCY": "50"}
+    )
+    assert (config.host, config.limit_concurrency) == ("0.0.0.0", 50)
+
+
+def test_options_are_accepted_by_uvicorn():
+    options = main.RuntimeConfig(mode="fast", limit_concurrency=100).uvicorn_options()
+    config = uvicorn.Config("app:http_app", factory=True, **options)
+    assert (config.loop, config.http) == ("uvloop", "httptools")
+    assert (config.timeout_keep_alive, config.backlog) == (75, 2048)
+    assert config.limit_concurrency == 100
+
+
+def test_socket_from_systemd_is_used_only_by_its_process():
+    pid = str(main.os.getpid())
+    assert main.listen_fd({"LISTEN_PID": pid, "LISTEN_FDS": "1"}) == 3
+    assert main.listen_fd({"LISTEN_PID": "1", "LISTEN_FDS": "1"}) is None
+    assert main.listen_fd({}) is None
+    with pytest.raises(ValueError, match="one socket"):
+        main.listen_fd({"LISTEN_PID": pid, "LISTEN_FDS": "2"})
+    options = main.RuntimeConfig(graceful_shutdown=10).uvicorn_options(fd=3)
+    config = uvicorn.Config("app:http_app", factory=True, **options)
+    assert (config.fd, config.timeout_graceful_shutdown) == (3, 10)
+    assert "port" not in options
+
+
+def _get_json(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.load(response)
+
+
+def test_socket_unit_outlives_service_restarts():
+    # PartOf= would restart (and close) the socket along with the service
+    units = Path(__file__).resolve().parent.parent / "deployment" / "systemd"
+    socket_unit = configparser.ConfigParser(strict=False)
+    socket_unit.read(units / "mcp-bolster.socket")
+    service_unit = configparser.ConfigParser(strict=False)
+    service_unit.read(units / "mcp-bolster.service")
+    assert "PartOf" not in socket_unit["Unit"]
+    assert service_unit["Unit"]["Requires"] == "mcp-bolster.socket"
+    assert "mcp-bolster.socket" in service_unit["Unit"]["After"].split()
+
+
+def test_reload_hands_over_to_new_workers_without_dropping_requests(tmp_path):
+    listener = socket.create_server(("127.0.0.1", 0), backlog=128)
+    url = f"http://127.0.0.1:{listener.getsockname()[1]}/live"
+    # Stand in for systemd: the socket as descriptor 3, named for the server's pid
+    activate = (
+        "import os, sys; os.dup2(int(sys.argv[1]), 3); "
+        "os.environ.update(LISTEN_PID=str(os.getpid()), LISTEN_FDS='1'); "
+        "os.execv(sys.executable, [sys.executable, 'main.py', *sys.argv[2:]])"
+    )
+    env = dict(
+        main.os.environ,
+        MCP_BOLSTER_OUTBOX=str(tmp_path / "outbox.sqlite3"),
+        MCP_BOLSTER_WARMUP="",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-c", activate, str(listener.fileno()), "--workers", "2"],
+        cwd=Path(main.__file__).parent,
+        env=env,
+        pass_fds=(listener.fileno(),),
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    listener.close()
+    log = []
+    threading.Thread(target=lambda: log.extend(server.stderr), daemon=True).start()
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                before = _get_json(url)["pid"]
+                break
+            except OSError:
+                assert time.monotonic() < deadline, "".join(log)
+                time.sleep(0.2)
+
+        server.send_signal(signal.SIGHUP)
+        pids, failures = set(), []
+        # Both old workers drained and exited
+        while sum("Finished server process" in line for line in log) < 2:
+            assert time.monotonic() < deadline, "".join(log)
+            try:
+                pids.add(_get_json(url)["pid"])
+            except OSError as e:
+                failures.append(e)
+        after = {_get_json(url)["pid"] for _ in range(10)}
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    assert failures == []
+    assert before not in after
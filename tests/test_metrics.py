@@ -0,0 +1,153 @@
+"""Tests for the Prometheus-style metrics surface."""
+
+import httpx
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+from mcp import McpError
+
+import metrics
+import upstream
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    histogram = metrics.Histogram(
+        "demo_seconds", "Demo.", ["op"], buckets=(0.1, 1), registry=registry
+    )
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, op="read")
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{op="read",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{op="read",le="1"} 2' in text
+    assert 'demo_seconds_bucket{op="read",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{op="read"} 3' in text
+    assert 'demo_seconds_sum{op="read"} 5.55' in text
+
+
+def test_counter_merges_tracked_sources():
+    registry = metrics.Registry()
+    counter = metrics.Counter("demo_total", "Demo.", ["kind"], registry=registry)
+    counter.inc(kind="a")
+    counter.track(lambda: {("a",): 2, ("b",): 1})
+    assert counter.value(kind="a") == 3
+    assert 'demo_total{kind="b"} 1' in registry.render()
+
+
+def test_labels_must_match():
+    counter = metrics.Counter("demo_total", "Demo.", ["kind"], registry=None)
+    with pytest.raises(ValueError):
+        counter.inc(other="a")
+
+
+def _server():
+    server = FastMCP(name="test")
+    metrics.install(server)
+
+    @server.tool
+    def echo(text: str) -> str:
+        return text
+
+    @server.tool
+    def fail() -> str:
+        raise ValueError("boom")
+
+    @server.resource("resource://test/static")
+    def static() -> str:
+        return "static"
+
+    @server.resource("resource://test/items/{item}")
+    def item(item: str) -> str:
+        return item
+
+    return server
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_tool_and_resource_latency():
+    ok = metrics.TOOL_LATENCY.count(tool="echo", outcome="ok")
+    failed = metrics.TOOL_LATENCY.count(tool="fail", outcome="error")
+    read = metrics.RESOURCE_LATENCY.count(
+        resource="resource://test/static", outcome="ok"
+    )
+    async with Client(_server()) as client:
+        await client.call_tool("echo", {"text": "hi"})
+        with pytest.raises(ToolError):
+            await client.call_tool("fail", {})
+        await client.read_resource("resource://test/static")
+    assert metrics.TOOL_LATENCY.count(tool="echo", outcome="ok") == ok + 1
+    assert metrics.TOOL_LATENCY.count(tool="fail", outcome="error") == failed + 1
+    assert (
+        metrics.RESOURCE_LATENCY.count(resource="resource://test/static", outcome="ok")
+        == read + 1
+    )
+    assert metrics.IN_FLIGHT.value(kind="tool") == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_by_registered_name_not_client_input():
+    templated = metrics.RESOURCE_LATENCY.count(
+        resource="resource://test/items/{item}", outcome="ok"
+    )
+    unknown_tool = metrics.TOOL_LATENCY.count(tool="unknown", outcome="error")
+    unknown_resource = metrics.RESOURCE_LATENCY.count(
+        resource="unknown", outcome="error"
+    )
+    async with Client(_server()) as client:
+        for i in range(3):
+            await client.read_resource(f"resource://test/items/{i}")
+            with pytest.raises(ToolError):
+                await client.call_tool(f"nope-{i}", {})
+            with pytest.raises(McpError):
+                await client.read_resource(f"resource://test/nope/{i}")
+    assert (
+        metrics.RESOURCE_LATENCY.count(
+            resource="resource://test/items/{item}", outcome="ok"
+        )
+        == templated + 3
+    )
+    assert (
+        metrics.TOOL_LATENCY.count(tool="unknown", outcome="error") == unknown_tool + 3
+    )
+    assert (
+        metrics.RESOURCE_LATENCY.count(resource="unknown", outcome="error")
+        == unknown_resource + 3
+    )
+    assert metrics.TOOL_LATENCY.count(tool="nope-0", outcome="error") == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_route_serves_exposition_text():
+    app = _server().http_app()
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE mcp_tool_duration_seconds histogram" in response.text
+
+
+@pytest.mark.asyncio
+async def test_upstream_fetches_record_status_and_cache_hits(
+    monkeypatch, upstream_feeds
+):
+    monkeypatch.setattr(upstream, "RETRIES", 0)
+    monkeypatch.setattr(upstream, "FAILURE_TTL", 0)
+    upstream_feeds.serve([503, 200], body=b"<rss/>")
+    before = {
+        key: metrics.UPSTREAM_RESPONSES.value(feed="blog", status=key)
+        for key in ("200", "503")
+    }
+    hits = metrics.CACHE_REQUESTS.value(cache="blog", result="hit")
+    async with upstream.http_lifespan(None):
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.fetch(upstream.RSS_URL)
+        await upstream.fetch(upstream.RSS_URL)
+        await upstream.fetch(upstream.RSS_URL)
+    for key in ("200", "503"):
+        assert metrics.UPSTREAM_RESPONSES.value(feed="blog", status=key) == (
+            before[key] + 1
+        )
+    assert metrics.CACHE_REQUESTS.value(cache="blog", result="hit") == hits + 1
@@ -0,0 +1,275 @@
+"""Tests for the contact message outbox and its SMTP delivery."""
+
+import email
+import socketserver
+import threading
+
+import anyio
+import pytest
+from fastmcp import Client
+
+import outbox
+
+
+class StandInSmtp(socketserver.ThreadingTCPServer):
+    """Just enough SMTP to receive mail; bodies saying REJECT or LATER are refused."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SmtpHandler)
+        self.received: list[email.message.Message] = []
+        self.connections = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stand-in ready")
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 stand-in")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                self.receive()
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+    def receive(self):
+        lines = []
+        while (line := self.rfile.readline()) not in (b".\r\n", b""):
+            lines.append(line)
+        message = email.message_from_bytes(b"".join(lines))
+        body = message.get_payload()
+        if "REJECT" in body:
+            self.reply("554 rejected")
+        elif "LATER" in body:
+            self.reply("451 try again later")
+        else:
+            self.server.received.append(message)
+            self.reply("250 queued")
+
+
+@pytest.fixture
+def smtp():
+    server = StandInSmtp()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def config(smtp):
+    return outbox.SmtpConfig(
+        host="127.0.0.1",
+        port=smtp.port,
+        sender="mcp@example.com",
+        recipient="andrew@example.com",
+        security="none",
+        timeout=5,
+    )
+
+
+@pytest.fixture
+def box(tmp_path):
+    box = outbox.Outbox(tmp_path / "outbox.sqlite3")
+    yield box
+    box.close()
+
+
+def test_messages_are_claimed_once_until_their_lease_runs_out(box):
+    first = box.add("Alice", "Hello")
+    second = box.add("Bob", "Hi")
+    assert box.get(first).state == "queued"
+    assert [m.id for m in box.claim(1)] == [first]
+    assert [m.id for m in box.claim(10)] == [second]
+    assert box.claim(10) == []
+    assert box.get(first).state == "sending"
+    # A worker that died mid-send leaves the claim to expire
+    box.claim(10, lease=0)
+    assert box.claim(10) == []
+
+
+def test_lapsed_claims_are_retried(box):
+    message_id = box.add("Alice", "Hello")
+    box.claim(lease=0)
+    assert [m.id for m in box.claim()] == [message_id]
+
+
+def test_failures_back_off_and_give_up(box, monkeypatch):
+    monkeypatch.setattr(outbox, "MAX_ATTEMPTS", 3)
+    message_id = box.add("Alice", "Hello")
+    assert box.mark_failed(message_id, "down") == "queued"
+    message = box.get(message_id)
+    assert message.attempts == 1
+    assert message.next_attempt_at - message.queued_at >= outbox.BACKOFF_BASE
+    assert box.claim() == []
+    assert box.mark_failed(message_id, "down") == "queued"
+    assert box.mark_failed(message_id, "down") == "failed"
+    assert box.mark_failed(box.add("Bob", "Hi"), "no", permanent=True) == "failed"
+    assert box.counts() == {"failed": 2}
+    assert [outbox.backoff(n) for n in (1, 2, 3)] == [30, 60, 120]
+    assert outbox.backoff(20) == outbox.BACKOFF_MAX
+
+
+def test_old_delivered_messages_are_purged(box):
+    kept = box.add("Alice", "Hello")
+    box.mark_sent(kept)
+    assert box.purge(older_than=3600) == 0
+    assert box.purge(older_than=-1) == 1
+    assert box.get(kept) is None
+
+
+@pytest.mark.asyncio
+async def test_a_batch_is_sent_over_one_connection(box, smtp, config):
+    sent = box.add("Alice", "Hello Andrew")
+    rejected = box.add("Mallory", "REJECT this")
+    deferred = box.add("Bob", "LATER please")
+    assert await outbox.deliver(box, config) == 3
+    assert smtp.connections == 1
+    assert box.get(sent).state == "sent"
+    assert box.get(sent).sent_at is not None
+    assert box.get(rejected).state == "failed"
+    assert "554" in box.get(rejected).last_error
+    assert box.get(deferred).state == "queued"
+    assert box.get(deferred).attempts == 1
+
+    [received] = smtp.received
+    assert received["Subject"] == "Contact message from Alice"
+    assert received["To"] == "andrew@example.com"
+    assert sent in received["Message-ID"]
+    assert "Hello Andrew" in received.get_payload()
+
+
+def test_message_id_is_the_same_on_every_attempt(box, config):
+    message_id = box.add("Alice", "Hello")
+    (message,) = box.claim()
+    first, second = outbox._email(config, message), outbox._email(config, message)
+    assert first["Message-ID"] == second["Message-ID"]
+    assert first["Message-ID"] == f"<{message_id}@mcp.bolster.online>"
+
+
+@pytest.mark.asyncio
+async def test_line_breaks_in_the_sender_stay_out_of_the_headers(box, smtp, config):
+    message_id = box.add("Eve\r\nBcc: victim@example.com", "Hello")
+    await outbox.deliver(box, config)
+    assert box.get(message_id).state == "sent"
+    [received] = smtp.received
+    assert received["Subject"] == "Contact message from Eve Bcc: victim@example.com"
+    assert received["Bcc"] is None
+
+
+@pytest.mark.asyncio
+async def test_an_unbuildable_message_fails_alone(box, smtp, config, monkeypatch):
+    build = outbox._email
+
+    def email(config, message):
+        if message.sender == "Broken":
+            raise ValueError("cannot build")
+        return build(config, message)
+
+    monkeypatch.setattr(outbox, "_email", email)
+    before = box.add("Alice", "Hello")
+    broken = box.add("Broken", "Hello")
+    after = box.add("Bob", "Hello")
+    assert await outbox.deliver(box, config) == 3
+    assert [box.get(i).state for i in (before, broken, after)] == [
+        "sent",
+        "failed",
+        "sent",
+    ]
+    assert "cannot build" in box.get(broken).last_error
+    assert len(smtp.received) == 2
+
+
+def test_accepted_messages_are_recorded_if_the_batch_breaks(
+    box, smtp, config, monkeypatch
+):
+    sent, broken = box.add("Alice", "Hello"), box.add("Bob", "Hello")
+    batch = box.claim()
+    calls = 0
+
+    def send_message(self, message):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(outbox.smtplib.SMTP, "send_message", send_message)
+    results = outbox.send_batch(config, batch)
+    assert results[sent] is None
+    assert isinstance(results[broken], RuntimeError)
+
+
+@pytest.mark.asyncio
+async def test_an_unreachable_server_defers_the_batch(box, config, smtp):
+    smtp.shutdown()
+    smtp.server_close()
+    message_id = box.add("Alice", "Hello")
+    await outbox.deliver(box, config)
+    message = box.get(message_id)
+    assert (message.state, message.attempts) == ("queued", 1)
+    assert "ConnectionRefusedError" in message.last_error
+
+
+def test_smtp_config_from_environment():
+    assert outbox.SmtpConfig.from_env({}) is None
+    with pytest.raises(ValueError, match="FROM and"):
+        outbox.SmtpConfig.from_env({"MCP_BOLSTER_SMTP_HOST": "smtp.example.com"})
+    config = outbox.SmtpConfig.from_env(
+        {
+            "MCP_BOLSTER_SMTP_HOST": "smtp.example.com",
+            "MCP_BOLSTER_SMTP_PORT": "465",
+            "MCP_BOLSTER_SMTP_FROM": "mcp@example.com",
+            "MCP_BOLSTER_SMTP_TO": "andrew@example.com",
+        }
+    )
+    assert (config.port, config.security, config.username) == (465, "tls", None)
+
+
+@pytest.mark.asyncio
+async def test_queued_messages_are_delivered_in_the_background(
+    smtp, config, monkeypatch
+):
+    from app import mcp
+
+    for name, value in {
+        "HOST": config.host,
+        "PORT": str(config.port),
+        "SECURITY": "none",
+        "FROM": config.sender,
+        "TO": config.recipient,
+    }.items():
+        monkeypatch.setenv(f"{outbox.SMTP_PREFIX}{name}", value)
+    # Only the wake-up on queueing, not the poll, can deliver in time
+    monkeypatch.setattr(outbox, "POLL_INTERVAL", 60)
+
+    async with Client(mcp) as client:
+        result = await client.call_tool(
+            "send_contact_message", {"message": "Hello", "sender": "Alice"}
+        )
+        message_id = result.data.split("Message ID: ")[1].split()[0]
+        with anyio.fail_after(5):
+            while outbox.get().get(message_id).state != "sent":
+                await anyio.sleep(0.01)
+        status = await client.call_tool(
+            "get_contact_message_status", {"message_id": message_id}
+        )
+    assert f"Message {message_id}: Delivered" in status.data
+    assert "Delivery attempts: 1" in status.data
+    assert len(smtp.received) == 1
@@ -0,0 +1,189 @@
+"""Scaling budgets: fail the build when a code path stops scaling linearly.
+
+Budgets are deliberately loose (several times the measured cost on a laptop)
+so CI noise doesn't trip them; a quadratic regression blows through them.
+"""
+
+import gc
+import time
+import tracemalloc
+
+import pytest
+from fastmcp import Client, FastMCP
+
+import app
+import upstream
+from app import mcp
+from benchmarks.click_registration import measure
+from click_mcp import register_click_commands
+from tests.fixtures.fake_cli.generator import build_large_cli
+from tests.fixtures.feeds import generate_ical, generate_rss
+
+# Per-tool registration budgets (measured: ~250 µs and ~6 KiB per tool)
+REGISTRATION_US_PER_TOOL = 2_000
+REGISTRATION_BYTES_PER_TOOL = 16 * 1024
+
+# Per-event/per-item budgets for a call on an already-downloaded feed
+# (measured: ~30 µs and ~1.3 KiB per calendar event, ~20 µs and ~1.7 KiB
+# per RSS item)
+CALENDAR_US_PER_EVENT = 200
+CALENDAR_BYTES_PER_EVENT = 4 * 1024
+BLOG_US_PER_ITEM = 150
+BLOG_BYTES_PER_ITEM = 5 * 1024
+
+
+@pytest.mark.parametrize("mode", ["eager", "manifest"])
+def test_click_registration_per_tool_budget(mode):
+    result = measure(2_000, mode=mode)
+    assert result["tools"] == 2_000
+    assert result["us_per_tool"] < REGISTRATION_US_PER_TOOL
+    assert result["bytes_per_tool"] < REGISTRATION_BYTES_PER_TOOL
+
+
+def test_deep_click_tree_registration_budget():
+    # fanout=2 nests 2,048 commands eleven groups deep
+    result = measure(2_048, fanout=2)
+    assert result["tools"] == 2_048
+    assert result["us_per_tool"] < REGISTRATION_US_PER_TOOL
+    assert result["bytes_per_tool"] < REGISTRATION_BYTES_PER_TOOL
+
+
+def test_click_registration_scales_linearly():
+    small = measure(500)
+    large = measure(4_000)
+    # Linear registration keeps per-tool cost flat; quadratic would be ~8x
+    assert large["us_per_tool"] < small["us_per_tool"] * 3
+
+
+@pytest.mark.asyncio
+async def test_synthetic_cli_tools_are_callable():
+    server = FastMCP(name="synthetic")
+    names = register_click_commands(server, build_large_cli(250))
+    assert len(names) == 250
+    async with Client(server) as client:
+        result = await client.call_tool(
+            names[-1], {"target": "t", "limit": 3, "verbose": True}
+        )
+    text = result.content[0].text
+    assert text.startswith("cmd249:")
+    assert "('limit', 3)" in text
+    assert "('verbose', True)" in text
+
+
+def _forget_parsed_feeds(monkeypatch):
+    """Drop the feeds parsed per snapshot, so the next call parses again."""
+    monkeypatch.setattr(app, "_parsed_calendar", None)
+    monkeypatch.setattr(app, "_parsed_blog", None)
+
+
+async def _feed_tool_cost(
+    monkeypatch, upstream_feeds, tool, args, body, n, *, trace=False
+):
+    """
+    Microseconds per feed entry for a call of `tool`, and (if `trace`) the
+    peak traced bytes per entry. Tracing slows the call down ~15x.
+
+    The feed is downloaded once, but its parsed form is dropped before each
+    measured call, so parsing is part of the cost.
+    """
+    upstream_feeds.serve(body=body)
+    upstream.clear_snapshots()
+    async with Client(mcp) as client:
+        # Download once, so only parsing and filtering are measured
+        await client.call_tool(tool, args)
+        # Best of three, to keep scheduler noise out of the comparison
+        elapsed = float("inf")
+        for _ in range(3):
+            _forget_parsed_feeds(monkeypatch)
+            start = time.perf_counter()
+            await client.call_tool(tool, args)
+            elapsed = min(elapsed, time.perf_counter() - start)
+        peak = None
+        if trace:
+            _forget_parsed_feeds(monkeypatch)
+            gc.collect()
+            tracemalloc.start()
+            try:
+                await client.call_tool(tool, args)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+    return elapsed / n * 1e6, None if peak is None else peak / n
+
+
+CALENDAR_ARGS = {"start_date": "2026-01-01", "days_ahead": 7}
+
+
+@pytest.mark.asyncio
+async def test_check_availability_budget(monkeypatch, upstream_feeds):
+    n = 5_000
+    body = generate_ical(n).encode()
+    us, peak = await _feed_tool_cost(
+        monkeypatch,
+        upstream_feeds,
+        "check_availability",
+        CALENDAR_ARGS,
+        body,
+        n,
+        trace=True,
+    )
+    assert us < CALENDAR_US_PER_EVENT
+    assert peak < CALENDAR_BYTES_PER_EVENT
+
+
+@pytest.mark.asyncio
+async def test_check_availability_scales_linearly(monkeypatch, upstream_feeds):
+    small, _ = await _feed_tool_cost(
+        monkeypatch,
+        upstream_feeds,
+        "check_availability",
+        CALENDAR_ARGS,
+        generate_ical(2_000).encode(),
+        2_000,
+    )
+    large, _ = await _feed_tool_cost(
+        monkeypatch,
+        upstream_feeds,
+        "check_availability",
+        CALENDAR_ARGS,
+        generate_ical(16_000).encode(),
+        16_000,
+    )
+    assert large < small * 3
+
+
+@pytest.mark.asyncio
+async def test_get_recent_blog_posts_budget(monkeypatch, upstream_feeds):
+    n = 5_000
+    us, peak = await _feed_tool_cost(
+        monkeypatch,
+        upstream_feeds,
+        "get_recent_blog_posts",
+        {"limit": 10},
+        generate_rss(n).encode(),
+        n,
+        trace=True,
+    )
+    assert us < BLOG_US_PER_ITEM
+    assert peak < BLOG_BYTES_PER_ITEM
+
+
+@pytest.mark.asyncio
+async def test_get_recent_blog_posts_scales_linearly(monkeypatch, upstream_feeds):
+    small, _ = await _feed_tool_cost(
+        monkeypatch,
+        upstream_feeds,
+        "get_recent_blog_posts",
+        {"limit": 10},
+        generate_rss(1_000).encode(),
+        1_000,
+    )
+    large, _ = await _feed_tool_cost(
+        monkeypatch,
+        upstream_feeds,
+        "get_recent_blog_posts",
+        {"limit": 10},
+        generate_rss(8_000).encode(),
+        8_000,
+    )
+    assert large < small * 3
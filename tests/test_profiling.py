@@ -0,0 +1,107 @@
+"""Tests for the opt-in sampling profiler."""
+
+import json
+import time
+
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+import profiling
+
+
+def _server(config):
+    server = FastMCP(name="test")
+    profiling.install(server, config)
+
+    @server.tool
+    def slow_tool() -> str:
+        time.sleep(0.1)
+        return "done"
+
+    @server.tool
+    def quick_tool() -> str:
+        return "done"
+
+    return server
+
+
+def test_disabled_without_a_directory(monkeypatch):
+    monkeypatch.delenv("MCP_BOLSTER_PROFILE_DIR", raising=False)
+    assert profiling.ProfileConfig.from_env({}) is None
+    assert profiling.install(FastMCP(name="test")) is False
+
+
+def test_config_from_env(tmp_path):
+    config = profiling.ProfileConfig.from_env(
+        {
+            "MCP_BOLSTER_PROFILE_DIR": str(tmp_path),
+            "MCP_BOLSTER_PROFILE_EVERY": "10",
+            "MCP_BOLSTER_PROFILE_TOOLS": "check_availability, bolster_*",
+            "MCP_BOLSTER_PROFILE_FORMAT": "speedscope",
+        }
+    )
+    assert config.every == 10
+    assert config.slower_than is None
+    assert config.tools == ["check_availability", "bolster_*"]
+    # A directory alone profiles slow calls
+    default = profiling.ProfileConfig.from_env({"MCP_BOLSTER_PROFILE_DIR": "x"})
+    assert default.slower_than == 1.0
+    with pytest.raises(ValueError):
+        profiling.ProfileConfig(tmp_path, every=1, format="pprof")
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_are_written_as_collapsed_stacks(tmp_path):
+    config = profiling.ProfileConfig(tmp_path, slower_than=0.05)
+    async with Client(_server(config)) as client:
+        await client.call_tool("quick_tool", {})
+        await client.call_tool("slow_tool", {})
+    (path,) = tmp_path.iterdir()
+    assert path.name.endswith(".collapsed")
+    assert "slow_tool" in path.name
+    lines = path.read_text().splitlines()
+    assert any("slow_tool (test_profiling.py" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_one_in_n_calls_in_speedscope_format(tmp_path):
+    config = profiling.ProfileConfig(
+        tmp_path, every=2, tools=["quick_*"], format="speedscope"
+    )
+    async with Client(_server(config)) as client:
+        for _ in range(4):
+            await client.call_tool("quick_tool", {})
+        await client.call_tool("slow_tool", {})
+    paths = sorted(tmp_path.iterdir())
+    assert len(paths) == 2
+    document = json.loads(paths[0].read_text())
+    (profile,) = document["profiles"]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"])
+    frames = document["shared"]["frames"]
+    assert all(i < len(frames) for stack in profile["samples"] for i in stack)
+
+
+@pytest.mark.asyncio
+async def test_old_profiles_are_pruned(tmp_path):
+    config = profiling.ProfileConfig(tmp_path, every=1, max_files=2)
+    async with Client(_server(config)) as client:
+        for _ in range(4):
+            await client.call_tool("quick_tool", {})
+            time.sleep(0.01)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+@pytest.mark.asyncio
+async def test_profile_filenames_are_sanitized(tmp_path):
+    directory = tmp_path / "profiles"
+    directory.mkdir()
+    config = profiling.ProfileConfig(directory, every=1)
+    async with Client(_server(config)) as client:
+        with pytest.raises(ToolError):
+            await client.call_tool("../../escaped tool", {})
+    (path,) = directory.iterdir()
+    assert "-.._.._escaped_tool-" in path.name
+    assert list(tmp_path.iterdir()) == [directory]
@@ -0,0 +1,198 @@
+"""Tests for the SQLite cache shared between worker processes."""
+
+import threading
+import time
+
+import pytest
+from fastmcp import Client, FastMCP
+
+import upstream
+from click_mcp import build_manifest, register_from_manifest
+from shared_cache import SharedCache, SharedResultCache, SharedResultStore
+from tests.fixtures.fake_cli.cli import cli as fake_cli
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "cache" / "shared.sqlite3"
+
+
+def _counting_loader():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return fake_cli
+
+    return loader, calls
+
+
+def test_entries_are_visible_to_another_connection(path):
+    writer, reader = SharedCache(path), SharedCache(path)
+    writer.put("feed", "url", b"body", ttl=60, meta={"encoding": "utf-8"})
+    entry = reader.get("feed", "url")
+    assert entry.value == b"body"
+    assert entry.meta == {"encoding": "utf-8"}
+    assert 0 <= entry.age < 5
+    assert reader.get("feed", "other") is None
+    assert reader.get("pages", "url") is None
+
+
+def test_expired_entries_are_not_returned(path):
+    cache = SharedCache(path)
+    cache.put("feed", "url", b"body", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("feed", "url") is None
+    assert cache.count("feed") == 0
+
+
+def test_trim_keeps_the_newest_entries(path):
+    cache = SharedCache(path)
+    for i in range(5):
+        cache.put("pages", str(i), b"x", ttl=60)
+    cache.put("feed", "url", b"x", ttl=60)
+    cache.trim("pages", 2)
+    kept = [i for i in range(5) if cache.get("pages", str(i)) is not None]
+    assert kept == [3, 4]
+    assert cache.count("feed") == 1
+
+
+@pytest.mark.asyncio
+async def test_click_results_are_shared_between_servers(path):
+    loader, calls = _counting_loader()
+    manifest = build_manifest(fake_cli, version="1.0", prefix="fake")
+    caches = [SharedResultCache(SharedCache(path)) for _ in range(2)]
+    texts = []
+    for cache in caches:
+        server = FastMCP(name="worker")
+        register_from_manifest(server, manifest, loader, result_cache=cache)
+        async with Client(server) as client:
+            result = await client.call_tool("fake_greet", {"name": "Ann"})
+        texts.append(result.content[0].text)
+    assert texts == ["Hello, Ann!", "Hello, Ann!"]
+    assert len(calls) == 1
+    assert (caches[0].misses, caches[1].hits) == (1, 1)
+    assert len(caches[1]) == 1
+
+
+@pytest.mark.asyncio
+async def test_page_cursor_can_be_redeemed_on_another_server(path):
+    loader, _ = _counting_loader()
+    manifest = build_manifest(fake_cli, version="1.0", prefix="fake")
+    servers = []
+    for _ in range(2):
+        server = FastMCP(name="worker")
+        register_from_manifest(
+            server,
+            manifest,
+            loader,
+            page_size=10,
+            result_store=SharedResultStore(SharedCache(path)),
+        )
+        servers.append(server)
+    async with Client(servers[0]) as client:
+        first = await client.call_tool("fake_data_fetch", {"limit": 15})
+    async with Client(servers[1]) as client:
+        rest = await client.call_tool(
+            "fake_next_page", {"cursor": first.structured_content["next_cursor"]}
+        )
+    assert rest.structured_content["result"] == [
+        {"id": i, "value": i * 2} for i in range(10, 15)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_feed_snapshot_is_reused_from_the_shared_cache(
+    monkeypatch, path, upstream_feeds
+):
+    upstream_feeds.serve(
+        body="<rss>café</rss>".encode("latin-1"),
+        headers={"Content-Type": "application/rss+xml; charset=latin-1"},
+    )
+    monkeypatch.setattr(upstream, "shared_cache", SharedCache(path))
+    async with upstream.http_lifespan(None):
+        first = await upstream.fetch(upstream.RSS_URL)
+        # A fresh process: no local snapshot, but the shared one is recent
+        upstream.clear_snapshots()
+        second = await upstream.fetch(upstream.RSS_URL)
+        # Too old for this caller, so it downloads again
+        upstream.clear_snapshots()
+        await upstream.fetch(upstream.RSS_URL, max_age=0)
+    assert len(upstream_feeds.calls) == 2
+    assert second.text == first.text == "<rss>café</rss>"
+    assert second.content == first.content
+
+
+@pytest.mark.asyncio
+async def test_new_process_starts_with_the_stored_snapshots(
+    monkeypatch, path, upstream_feeds
+):
+    upstream_feeds.bodies[upstream.RSS_URL] = f"<rss>{upstream.RSS_URL}</rss>"
+    monkeypatch.setattr(upstream, "shared_cache", SharedCache(path))
+    async with upstream.http_lifespan(None):
+        await upstream.fetch(upstream.RSS_URL)
+    upstream.clear_snapshots()
+
+    # The next process has the blog feed before its first call
+    async with upstream.http_lifespan(None):
+        restored = upstream.snapshot(upstream.RSS_URL)
+        assert upstream.snapshot(upstream.ICAL_URL) is None
+        await upstream.fetch(upstream.RSS_URL)
+    assert len(upstream_feeds.calls) == 1
+    assert restored.text == f"<rss>{upstream.RSS_URL}</rss>"
+    assert restored.age < upstream.SNAPSHOT_MAX_AGE
+
+
+def test_http_app_is_stateless_by_default(monkeypatch):
+    import app
+
+    monkeypatch.delenv("MCP_BOLSTER_STATELESS", raising=False)
+    seen = {}
+    original = app.mcp.http_app
+
+    def spy(**kwargs):
+        seen.update(kwargs)
+        return original(**kwargs)
+
+    monkeypatch.setattr(app.mcp, "http_app", spy)
+    app.http_app()
+    assert seen["stateless_http"] is True
+    monkeypatch.setenv("MCP_BOLSTER_STATELESS", "0")
+    app.http_app()
+    assert seen["stateless_http"] is False
+
+
+class _ThreadRecordingCache(SharedCache):
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = set()
+
+    def get(self, namespace, key):
+        self.threads.add(threading.get_ident())
+        return super().get(namespace, key)
+
+    def put(self, namespace, key, value, **kwargs):
+        self.threads.add(threading.get_ident())
+        super().put(namespace, key, value, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_click_cache_lookups_run_off_the_event_loop(path):
+    loader, _ = _counting_loader()
+    store = _ThreadRecordingCache(path)
+    server = FastMCP(name="worker")
+    register_from_manifest(
+        server,
+        build_manifest(fake_cli, version="1.0", prefix="fake"),
+        loader,
+        page_size=10,
+        result_store=SharedResultStore(store),
+        result_cache=SharedResultCache(store),
+    )
+    async with Client(server) as client:
+        first = await client.call_tool("fake_data_fetch", {"limit": 15})
+        await client.call_tool(
+            "fake_next_page", {"cursor": first.structured_content["next_cursor"]}
+        )
+    assert store.threads
+    assert threading.get_ident() not in store.threads
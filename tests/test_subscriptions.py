@@ -0,0 +1,170 @@
+"""Tests for resource subscriptions and resources/updated notifications."""
+
+import json
+
+import pytest
+from fastmcp import Client
+from fastmcp.client.messages import MessageHandler
+from mcp.shared.exceptions import McpError
+from pydantic import AnyUrl
+
+import subscriptions
+import upstream
+from app import mcp
+
+DAY = "resource://andrew-bolster/calendar/2026-03-14"
+BLOG = "resource://andrew-bolster/blog"
+
+
+def _ical(*events):
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for start, summary in events:
+        lines += [
+            "BEGIN:VEVENT",
+            f"DTSTART:{start}00Z",
+            f"DTEND:{start[:-2]}5900Z",
+            f"SUMMARY:{summary}",
+            "END:VEVENT",
+        ]
+    return "\r\n".join(lines + ["END:VCALENDAR"])
+
+
+def _rss(*slugs):
+    items = "".join(
+        f"<item><title>{slug}</title><link>https://example.invalid/{slug}.html</link>"
+        f"<description>&lt;p&gt;About {slug}&lt;/p&gt;</description></item>"
+        for slug in slugs
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'
+
+
+class Updates(MessageHandler):
+    def __init__(self):
+        self.uris = []
+
+    async def on_resource_updated(self, message):
+        self.uris.append(str(message.params.uri))
+
+
+@pytest.fixture
+def feeds(upstream_feeds):
+    """Feed bodies served to upstream; change them to change the feeds."""
+    upstream_feeds.bodies.update(
+        {
+            upstream.ICAL_URL: _ical(
+                ("20260314T0900", "Talk"), ("20260320T0900", "Demo")
+            ),
+            upstream.RSS_URL: _rss("first-post"),
+        }
+    )
+    return upstream_feeds.bodies
+
+
+@pytest.fixture
+def active():
+    yield subscriptions.active
+    subscriptions.active._sessions.clear()
+    subscriptions.active._forget_unwatched()
+    subscriptions.active._seen.clear()
+
+
+@pytest.mark.asyncio
+async def test_subscribe_is_advertised():
+    async with Client(mcp) as client:
+        assert client.initialize_result.capabilities.resources.subscribe is True
+
+
+@pytest.mark.asyncio
+async def test_calendar_and_blog_resources(feeds):
+    async with Client(mcp) as client:
+        day = json.loads((await client.read_resource(DAY))[0].text)
+        index = json.loads((await client.read_resource(BLOG))[0].text)
+        post = json.loads((await client.read_resource(f"{BLOG}/first-post"))[0].text)
+        with pytest.raises(McpError, match="No post"):
+            await client.read_resource(f"{BLOG}/missing")
+    assert day == {
+        "date": "2026-03-14",
+        "events": [
+            {
+                "start": "2026-03-14T09:00:00",
+                "end": "2026-03-14T09:59:00",
+                "summary": "Talk",
+            }
+        ],
+    }
+    assert index["posts"][0]["slug"] == "first-post"
+    assert post["summary"] == "About first-post"
+
+
+@pytest.mark.asyncio
+async def test_updates_are_sent_only_when_a_subscribed_resource_changes(feeds, active):
+    updates = Updates()
+    async with Client(mcp, message_handler=updates) as client:
+        await client.session.subscribe_resource(AnyUrl(DAY))
+        await client.session.subscribe_resource(AnyUrl(BLOG))
+
+        # Nothing changed
+        assert await active.refresh(max_age=0) == []
+        # Another day changed
+        feeds[upstream.ICAL_URL] = _ical(
+            ("20260314T0900", "Talk"), ("20260320T1000", "Demo")
+        )
+        assert await active.refresh(max_age=0) == []
+        # This day changed, and there is a new post
+        feeds[upstream.ICAL_URL] = _ical(("20260314T1000", "Talk, moved"))
+        feeds[upstream.RSS_URL] = _rss("second-post", "first-post")
+        assert await active.refresh(max_age=0) == [BLOG, DAY]
+
+        # Unsubscribed resources are no longer refreshed
+        await client.session.unsubscribe_resource(AnyUrl(BLOG))
+        feeds[upstream.RSS_URL] = _rss("third-post")
+        assert active.uris() == {DAY}
+        assert await active.refresh(max_age=0) == []
+        await client.ping()
+    assert sorted(updates.uris) == [BLOG, DAY]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_that_is_still_fresh_is_not_reread(feeds, active):
+    async with Client(mcp) as client:
+        await client.session.subscribe_resource(AnyUrl(DAY))
+        await active.refresh()
+        feeds[upstream.ICAL_URL] = _ical(("20260314T1000", "Moved"))
+        # The snapshot is younger than max_age, so the feed is not fetched again
+        assert await active.refresh(max_age=60) == []
+        assert await active.refresh(max_age=0) == [DAY]
+
+
+@pytest.mark.asyncio
+async def test_closed_sessions_stop_receiving_updates(feeds, active):
+    updates = Updates()
+    async with Client(mcp, message_handler=updates) as staying:
+        await staying.session.subscribe_resource(AnyUrl(DAY))
+        async with Client(mcp) as leaving:
+            await leaving.session.subscribe_resource(AnyUrl(BLOG))
+        feeds[upstream.ICAL_URL] = _ical()
+        feeds[upstream.RSS_URL] = _rss("second-post")
+        # Whether the closed session was collected or failed to send, it is gone
+        assert DAY in await active.refresh(max_age=0)
+        assert active.uris() == {DAY}
+        await staying.ping()
+    assert updates.uris == [DAY]
+
+
+@pytest.mark.asyncio
+async def test_subscribing_to_an_unreadable_resource_fails(feeds, active):
+    async with Client(mcp) as client:
+        with pytest.raises(McpError, match="YYYY-MM-DD"):
+            await client.session.subscribe_resource(
+                AnyUrl("resource://andrew-bolster/calendar/tomorrow")
+            )
+    assert active.uris() == set()
+
+
+@pytest.mark.asyncio
+async def test_stateless_http_has_no_subscriptions(monkeypatch):
+    monkeypatch.setattr(subscriptions, "enabled", False)
+    async with Client(mcp) as client:
+        assert client.initialize_result.capabilities.resources.subscribe is False
+        with pytest.raises(McpError, match="stateful session"):
+            await client.session.subscribe_resource(AnyUrl(DAY))
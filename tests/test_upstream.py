@@ -0,0 +1,222 @@
+"""Tests for the shared upstream feed snapshots."""
+
+from collections import deque
+
+import anyio
+import httpx
+import pytest
+
+import deadline
+import metrics
+import upstream
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_reused_within_max_age(upstream_feeds):
+    upstream_feeds.serve(body=b"BEGIN:VCALENDAR", delay=0.05)
+    async with upstream.http_lifespan(None):
+        first = await upstream.fetch(upstream.ICAL_URL)
+        second = await upstream.fetch(upstream.ICAL_URL)
+        stale = await upstream.fetch(upstream.ICAL_URL, max_age=0)
+    assert first is second
+    assert stale is not first
+    assert first.text == "BEGIN:VCALENDAR"
+    assert len(upstream_feeds.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetches_share_one_download(upstream_feeds):
+    upstream_feeds.serve(body=b"BEGIN:VCALENDAR", delay=0.05)
+    results = []
+
+    async def fetch():
+        results.append(await upstream.fetch(upstream.RSS_URL))
+
+    async with upstream.http_lifespan(None), anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(fetch)
+    assert len(upstream_feeds.calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+@pytest.fixture
+def no_retries(monkeypatch):
+    """Fail a fetch on its first failed request."""
+    monkeypatch.setattr(upstream, "RETRIES", 0)
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_cached_briefly(upstream_feeds, monkeypatch, no_retries):
+    upstream_feeds.serve([503, 200])
+    async with upstream.http_lifespan(None):
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.fetch(upstream.RSS_URL)
+        # Within FAILURE_TTL the failure is given back without a download
+        with pytest.raises(upstream.UpstreamUnavailableError, match="503") as e:
+            await upstream.fetch(upstream.RSS_URL)
+        assert e.value.circuit == "closed"
+        assert 0 < e.value.retry_after <= upstream.FAILURE_TTL
+        monkeypatch.setattr(upstream, "FAILURE_TTL", 0)
+        snapshot = await upstream.fetch(upstream.RSS_URL)
+    assert snapshot.content == b"ok"
+    assert len(upstream_feeds.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_callers_queued_behind_a_failing_download_share_its_failure(
+    upstream_feeds, monkeypatch, no_retries
+):
+    errors = []
+    upstream_feeds.serve([503, 200], delay=0.05)
+
+    async def fetch():
+        try:
+            await upstream.fetch(upstream.ICAL_URL)
+        except httpx.HTTPError as e:
+            errors.append(e)
+
+    async with upstream.http_lifespan(None), anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(fetch)
+    assert len(upstream_feeds.calls) == 1
+    assert len(errors) == 5
+    assert sum(isinstance(e, upstream.UpstreamUnavailableError) for e in errors) == 4
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_then_probes_once(upstream_feeds, monkeypatch, no_retries):
+    monkeypatch.setattr(upstream, "FAILURE_TTL", 0)
+    monkeypatch.setattr(upstream, "OPEN_SECONDS", 0.2)
+    upstream_feeds.serve([503, 503, 503, 503, 200], delay=0.05)
+    breaker = upstream.breaker_for(upstream.ICAL_URL)
+
+    async with upstream.http_lifespan(None):
+        for _ in range(upstream.FAILURE_THRESHOLD):
+            with pytest.raises(httpx.HTTPStatusError):
+                await upstream.fetch(upstream.ICAL_URL)
+        assert breaker.state == "open"
+        with pytest.raises(upstream.UpstreamUnavailableError, match="circuit open"):
+            await upstream.fetch(upstream.ICAL_URL)
+        assert len(upstream_feeds.calls) == upstream.FAILURE_THRESHOLD
+
+        # A failed probe opens it again
+        await anyio.sleep(upstream.OPEN_SECONDS)
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.fetch(upstream.ICAL_URL)
+        assert breaker.state == "open"
+
+        # While one caller probes, the rest are turned away
+        await anyio.sleep(upstream.OPEN_SECONDS)
+        results = []
+
+        async def fetch():
+            try:
+                results.append(await upstream.fetch(upstream.ICAL_URL))
+            except upstream.UpstreamUnavailableError as e:
+                results.append(e.circuit)
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(3):
+                tg.start_soon(fetch)
+    assert results[:2] == ["half_open", "half_open"]
+    assert results[2].content == b"ok"
+    assert breaker.state == "closed"
+    assert len(upstream_feeds.calls) == upstream.FAILURE_THRESHOLD + 2
+    assert metrics.UPSTREAM_CIRCUIT.value(feed="calendar") == 0
+
+
+@pytest.mark.asyncio
+async def test_last_snapshot_is_served_while_the_feed_is_down(
+    upstream_feeds, monkeypatch, no_retries
+):
+    upstream_feeds.serve([200, 503, 503])
+    async with upstream.http_lifespan(None):
+        monkeypatch.setattr(upstream, "SNAPSHOT_MAX_AGE", 0)
+        first, error = await upstream.fetch_or_last(upstream.RSS_URL)
+        assert error is None
+        snapshot, error = await upstream.fetch_or_last(upstream.RSS_URL)
+        assert snapshot is first
+        assert isinstance(error, httpx.HTTPStatusError)
+        # Further calls answer from memory
+        snapshot, error = await upstream.fetch_or_last(upstream.RSS_URL)
+        assert snapshot is first
+        assert isinstance(error, upstream.UpstreamUnavailableError)
+        # With nothing to fall back on, the error is raised
+        upstream.clear_snapshots()
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.fetch_or_last(upstream.RSS_URL)
+    assert len(upstream_feeds.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried(upstream_feeds, monkeypatch):
+    monkeypatch.setattr(upstream, "RETRY_BACKOFF", 0.01)
+    upstream_feeds.serve([503, 200, 404, 404])
+    retries = metrics.UPSTREAM_RETRIES.value(feed="blog")
+    async with upstream.http_lifespan(None):
+        snapshot = await upstream.fetch(upstream.RSS_URL)
+        assert snapshot.content == b"ok"
+        # A 404 will not go away by asking again
+        with pytest.raises(httpx.HTTPStatusError, match="404"):
+            await upstream.fetch(upstream.ICAL_URL)
+    assert len(upstream_feeds.calls) == 3
+    assert metrics.UPSTREAM_RETRIES.value(feed="blog") == retries + 1
+
+
+@pytest.mark.asyncio
+async def test_fetches_keep_to_the_callers_budget(upstream_feeds, monkeypatch):
+    upstream_feeds.serve(delay=5)
+    async with upstream.http_lifespan(None):
+        start = anyio.current_time()
+        with deadline.budget(0.5), pytest.raises(httpx.TimeoutException):
+            await upstream.fetch(upstream.RSS_URL)
+        assert anyio.current_time() - start < 1.5
+        assert upstream.breaker_for(upstream.RSS_URL).failures == 1
+
+        # With too little left to try, nothing is asked of the feed
+        with deadline.budget(0.1), pytest.raises(upstream.DeadlineExceededError):
+            await upstream.fetch(upstream.ICAL_URL)
+    assert len(upstream_feeds.calls) == 1
+    assert upstream.breaker_for(upstream.ICAL_URL).failures == 0
+
+
+@pytest.mark.asyncio
+async def test_waiting_for_another_download_keeps_to_the_budget(
+    upstream_feeds, monkeypatch
+):
+    upstream_feeds.serve(delay=0.5)
+    results = []
+
+    async def fetch(budget):
+        with deadline.budget(budget):
+            try:
+                results.append(await upstream.fetch(upstream.RSS_URL))
+            except upstream.DeadlineExceededError as e:
+                results.append(e)
+
+    async with upstream.http_lifespan(None), anyio.create_task_group() as tg:
+        tg.start_soon(fetch, 5)
+        await anyio.sleep(0.05)
+        tg.start_soon(fetch, 0.3)
+    assert isinstance(results[0], upstream.DeadlineExceededError)
+    assert results[1].content == b"ok"
+    assert len(upstream_feeds.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_requests_are_hedged(upstream_feeds):
+    upstream_feeds.serve(delays=[5.0, 0.0])
+    hedges = metrics.UPSTREAM_HEDGES.value(feed="blog", winner="hedge")
+    async with upstream.http_lifespan(None):
+        # No hedging until the feed's latency is known
+        assert upstream.latency_p95(upstream.RSS_URL) is None
+        upstream._latencies[upstream.RSS_URL] = deque(
+            [0.05] * upstream.HEDGE_MIN_SAMPLES
+        )
+        assert upstream.latency_p95(upstream.RSS_URL) == 0.05
+        with anyio.fail_after(1):
+            snapshot = await upstream.fetch(upstream.RSS_URL)
+    assert snapshot.content == b"ok"
+    assert len(upstream_feeds.calls) == 2
+    assert metrics.UPSTREAM_HEDGES.value(feed="blog", winner="hedge") == hedges + 1
+    assert metrics.UPSTREAM_RESPONSES.value(feed="blog", status="cancelled") >= 1
@@ -0,0 +1,98 @@
+"""Tests for the start-up warm-up lifespan."""
+
+import time
+
+import anyio
+import pytest
+from fastmcp import Client, FastMCP
+
+import upstream
+import warmup
+from click_mcp import ResultCache, register_click_commands
+from tests.fixtures.fake_cli.cli import cli as fake_cli
+
+
+@pytest.fixture
+def feed_calls(upstream_feeds):
+    return upstream_feeds.serve(delay=0.1, body=b"<rss/>").calls
+
+
+def _write_config(tmp_path, text):
+    path = tmp_path / "warmup.toml"
+    path.write_text(text)
+    return path
+
+
+def test_load_config(tmp_path):
+    path = _write_config(
+        tmp_path,
+        """
+concurrency = 3
+feeds = ["calendar", "blog"]
+
+[[commands]]
+tool = "fake_data_fetch"
+args = { limit = 2 }
+""",
+    )
+    config = warmup.load_config(path)
+    assert config.concurrency == 3
+    assert config.feeds == ["calendar", "blog"]
+    assert config.commands == [("fake_data_fetch", {"limit": 2})]
+
+
+def test_load_config_rejects_unknown_feed(tmp_path):
+    path = _write_config(tmp_path, 'feeds = ["weather"]')
+    with pytest.raises(ValueError, match="Unknown feeds"):
+        warmup.load_config(path)
+
+
+@pytest.mark.asyncio
+async def test_warm_up_prefetches_feeds_and_fills_result_cache(feed_calls):
+    cache = ResultCache()
+    server = FastMCP(name="test")
+    register_click_commands(server, fake_cli, prefix="fake", result_cache=cache)
+    config = warmup.WarmupConfig(
+        feeds=["calendar", "blog"],
+        commands=[("fake_data_fetch", {"limit": 2}), ("fake_missing", {})],
+    )
+    async with upstream.http_lifespan(server):
+        status = await warmup.warm_up(server, config)
+        await upstream.fetch(upstream.RSS_URL)
+    assert sorted(feed_calls) == sorted([upstream.ICAL_URL, upstream.RSS_URL])
+    assert len(cache) == 1
+    assert status.done == 4
+    assert list(status.failed) == ["tool:fake_missing"]
+
+    async with Client(server) as client:
+        result = await client.call_tool("fake_data_fetch", {"limit": 2})
+    assert result.data == [{"id": 0, "value": 0}, {"id": 1, "value": 2}]
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_up_respects_concurrency(feed_calls):
+    config = warmup.WarmupConfig(feeds=["calendar", "blog"], concurrency=1)
+    start = time.perf_counter()
+    async with upstream.http_lifespan(None):
+        await warmup.warm_up(FastMCP(name="test"), config)
+    # Two 0.1s fetches one after the other
+    assert time.perf_counter() - start >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_lifespan_does_not_wait_for_warm_up(tmp_path, monkeypatch, feed_calls):
+    path = _write_config(tmp_path, 'feeds = ["calendar"]')
+    monkeypatch.setenv(warmup.CONFIG_ENV, str(path))
+    server = FastMCP(
+        name="test", lifespan=upstream.http_lifespan | warmup.warmup_lifespan
+    )
+    start = time.perf_counter()
+    async with Client(server) as client:
+        await client.ping()
+        ready_after = time.perf_counter() - start
+        with anyio.fail_after(2):
+            while warmup.status.finished_at is None:
+                await anyio.sleep(0.01)
+    assert ready_after < 0.1
+    assert feed_calls == [upstream.ICAL_URL]
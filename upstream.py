@@ -0,0 +1,530 @@
+"""
+upstream.py — Shared access to the upstream feeds behind the server's tools.
+
+The calendar and blog tools used to open a fresh `httpx.AsyncClient` (and a
+fresh TLS connection) on every call and re-download the whole feed. Here a
+pooled transport lives for the server's lifespan, and each feed is kept
+as a short-lived snapshot so bursts of calls, and start-up warm-up, share
+one download.
+
+When a feed is slow or down, each feed has a circuit breaker so callers
+are not all held for `REQUEST_TIMEOUT`:
+
+    - closed: downloads go ahead; a failure is remembered for
+      `FAILURE_TTL` seconds, and calls in that time (including those that
+      queued behind the failing download) get it back without a download
+    - open: after `FAILURE_THRESHOLD` failures in a row, calls fail at once
+      for `OPEN_SECONDS`
+    - half-open: then one call probes the feed; success closes the circuit,
+      failure opens it again while other callers keep failing fast
+
+Tools that can answer from an old snapshot use `fetch_or_last`.
+
+Each download runs within the caller's `deadline` budget (and at most
+`REQUEST_TIMEOUT` in all). Connection errors, timeouts and 429/5xx
+responses are retried after a jittered pause while the budget allows, and
+once a feed's recent latencies are known, a request slower than their p95
+is hedged with a second one; whichever answers first is used.
+"""
+
+import contextlib
+import functools
+import os
+import random
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+import anyio
+import httpx
+from fastmcp.server.lifespan import lifespan
+
+import deadline
+import metrics
+from shared_cache import Entry, SharedCache
+
+# Overridable so a deployment (or a load test) can point at stand-in feeds
+ICAL_URL = os.environ.get(
+    "MCP_BOLSTER_ICAL_URL",
+    "https://calendar.google.com/calendar/ical/andrew.bolster%40gmail.com/public/basic.ics",
+)
+RSS_URL = os.environ.get(
+    "MCP_BOLSTER_RSS_URL", "https://feeds.feedburner.com/ofpenguinsandcoffee"
+)
+
+# Feed names accepted in configuration (e.g. the warm-up list)
+FEEDS = {"calendar": ICAL_URL, "blog": RSS_URL}
+
+# The most one download may take, retries and all, within any caller's budget
+REQUEST_TIMEOUT = 10
+
+# Transient failures are retried up to RETRIES times, after a random pause
+# of up to RETRY_BACKOFF·2^n seconds, if at least MIN_ATTEMPT would be left
+RETRIES = 2
+RETRY_BACKOFF = 0.2
+MIN_ATTEMPT = 0.25
+
+# Hedge a request slower than the feed's p95, once this many are known
+HEDGING = os.environ.get("MCP_BOLSTER_UPSTREAM_HEDGING", "1") != "0"
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+# How long a downloaded feed is served before it is fetched again
+SNAPSHOT_MAX_AGE = 300.0
+
+# How long a failed download is answered from memory rather than retried
+FAILURE_TTL = 5.0
+# Failures in a row that open a feed's circuit, and how long it stays open
+FAILURE_THRESHOLD = 3
+OPEN_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """The body of one successful fetch of a feed."""
+
+    url: str
+    text: str
+    content: bytes
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+@dataclass(frozen=True)
+class FetchError:
+    """A failed download of a feed."""
+
+    url: str
+    message: str
+    failed_at: float
+
+
+class UpstreamUnavailableError(httpx.HTTPError):
+    """A fetch refused without a download, because the feed failed recently."""
+
+    def __init__(self, failure: FetchError, retry_after: float, *, circuit: str):
+        reason = "circuit open" if circuit == "open" else "failed just now"
+        super().__init__(
+            f"{feed_name(failure.url)} feed unavailable ({reason}, retry in "
+            f"{retry_after:.0f}s): {failure.message}"
+        )
+        self.failure = failure
+        self.retry_after = retry_after
+        self.circuit = circuit
+
+
+class DeadlineExceededError(httpx.TimeoutException):
+    """A fetch given up before any request, the caller's budget being spent."""
+
+
+class Breaker:
+    """The circuit breaker for one feed."""
+
+    def __init__(self, feed: str) -> None:
+        self.feed = feed
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def check(self, failure: FetchError | None, now: float) -> bool:
+        """
+        Let a download go ahead, or refuse it; returns whether it is the probe.
+
+        Raises:
+            UpstreamUnavailableError: While the circuit is open, while another
+                caller probes it, or within `FAILURE_TTL` of `failure`.
+        """
+        if self.state == "open":
+            remaining = self.opened_at + OPEN_SECONDS - now
+            if remaining > 0 and failure is not None:
+                raise UpstreamUnavailableError(failure, remaining, circuit="open")
+            self._set("half_open")
+        if self.state == "half_open":
+            if self.probing and failure is not None:
+                raise UpstreamUnavailableError(failure, 1.0, circuit="half_open")
+            self.probing = True
+            return True
+        if failure is not None and now - failure.failed_at < FAILURE_TTL:
+            remaining = failure.failed_at + FAILURE_TTL - now
+            raise UpstreamUnavailableError(failure, remaining, circuit="closed")
+        return False
+
+    def succeeded(self) -> None:
+        self.failures = 0
+        self._set("closed")
+
+    def failed(self, now: float) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= FAILURE_THRESHOLD:
+            self.opened_at = now
+            self._set("open")
+
+    def _set(self, state: str) -> None:
+        self.state = state
+        metrics.UPSTREAM_CIRCUIT.set(CIRCUIT_STATES[state], feed=self.feed)
+
+
+# Gauge values for each circuit state
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+_transport: httpx.AsyncHTTPTransport | None = None
+_snapshots: dict[str, Snapshot] = {}
+_fetch_locks: dict[str, anyio.Lock] = {}
+# Feeds whose most recent download failed, cleared by the next success
+_failures: dict[str, FetchError] = {}
+_breakers: dict[str, Breaker] = {}
+# Recent response times of each feed, in seconds
+_latencies: dict[str, deque[float]] = {}
+
+# The most recent failure of any feed, kept for health reports
+last_error: FetchError | None = None
+
+# Set (from `MCP_BOLSTER_SHARED_CACHE`) to share snapshots between workers
+shared_cache: SharedCache | None = None
+
+
+@lifespan
+async def http_lifespan(server: Any) -> AsyncIterator[dict[str, Any]]:
+    """Keep a pool of upstream connections open for the server's lifetime."""
+    global _transport
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=300)
+    )
+    _transport = transport
+    # Before taking traffic, pick up what other (or previous) workers fetched
+    await restore_snapshots()
+    try:
+        yield {"http_transport": transport}
+    finally:
+        _transport = None
+        await transport.aclose()
+
+
+async def _get(url: str, timeout: float) -> httpx.Response:
+    if _transport is None:
+        # Outside the server lifespan (scripts, tests) use a one-off client
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            return await client.get(url)
+    # Clients are cheap; the pooled transport holds the connections. It is not
+    # closed here because closing a client closes its transport.
+    client = httpx.AsyncClient(timeout=timeout, transport=_transport)
+    return await client.get(url)
+
+
+def feed_name(url: str) -> str:
+    """The configured name of a feed URL (the URL itself if it has none)."""
+    return next((name for name, u in FEEDS.items() if u == url), url)
+
+
+def breaker_for(url: str) -> Breaker:
+    """The circuit breaker of `url`'s feed."""
+    breaker = _breakers.get(url)
+    if breaker is None:
+        breaker = _breakers[url] = Breaker(feed_name(url))
+    return breaker
+
+
+def _check(breaker: Breaker, url: str, feed: str) -> bool:
+    try:
+        return breaker.check(_failures.get(url), time.monotonic())
+    except UpstreamUnavailableError:
+        metrics.CACHE_REQUESTS.inc(cache=feed, result="negative")
+        raise
+
+
+async def _download(url: str, feed: str, breaker: Breaker) -> httpx.Response:
+    global last_error
+    try:
+        response = await _retrying(url, feed)
+    except DeadlineExceededError:
+        # Nothing was asked of the feed, so this says nothing about it
+        raise
+    except httpx.HTTPError as e:
+        now = time.monotonic()
+        last_error = _failures[url] = FetchError(url, f"{type(e).__name__}: {e}", now)
+        breaker.failed(now)
+        raise
+    _failures.pop(url, None)
+    breaker.succeeded()
+    return response
+
+
+def _transient(error: httpx.HTTPError) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+async def _retrying(url: str, feed: str) -> httpx.Response:
+    """GET `url` until it succeeds, fails for good, or the budget runs out."""
+    with deadline.budget(REQUEST_TIMEOUT):
+        left = deadline.remaining()
+        if left is None or left < MIN_ATTEMPT:
+            raise DeadlineExceededError(f"No time left to fetch the {feed} feed")
+        attempt = 0
+        while True:
+            try:
+                response = await _hedged(url, feed, left)
+                response.raise_for_status()
+                return response
+            except httpx.HTTPError as e:
+                pause = random.uniform(0, RETRY_BACKOFF * 2**attempt)
+                left = deadline.remaining() or 0.0
+                if (
+                    attempt >= RETRIES
+                    or not _transient(e)
+                    or left < pause + MIN_ATTEMPT
+                ):
+                    raise
+            metrics.UPSTREAM_RETRIES.inc(feed=feed)
+            await anyio.sleep(pause)
+            left -= pause
+            attempt += 1
+
+
+def latency_p95(url: str) -> float | None:
+    """The 95th percentile of `url`'s recent response times, once enough are known."""
+    samples = _latencies.get(url)
+    if samples is None or len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    return sorted(samples)[int(len(samples) * 0.95)]
+
+
+async def _hedged(url: str, feed: str, timeout: float) -> httpx.Response:
+    """
+    GET `url` within `timeout`, sending a second request if the first is slow.
+
+    The second goes out when the first has taken the feed's p95 latency, if
+    there would be time for it to finish; the first response to arrive is
+    used and the other request cancelled.
+    """
+    hedge_after = latency_p95(url) if HEDGING else None
+    if hedge_after is None or hedge_after * 2 >= timeout:
+        return await _request(url, feed, timeout)
+
+    send, receive = anyio.create_memory_object_stream[
+        tuple[str, httpx.Response | httpx.HTTPError]
+    ](2)
+    hedged = False
+
+    async def attempt(name: str, delay: float) -> None:
+        nonlocal hedged
+        if delay:
+            await anyio.sleep(delay)
+            hedged = True
+        try:
+            outcome: httpx.Response | httpx.HTTPError = await _request(
+                url, feed, timeout - delay
+            )
+        except httpx.HTTPError as e:
+            outcome = e
+        await send.send((name, outcome))
+
+    with send, receive:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(attempt, "first", 0.0)
+            tg.start_soon(attempt, "hedge", hedge_after)
+            winner, outcome = await receive.receive()
+            if isinstance(outcome, httpx.HTTPError) and hedged:
+                # The other request is under way and may yet succeed
+                second = await receive.receive()
+                if isinstance(second[1], httpx.Response):
+                    winner, outcome = second
+            tg.cancel_scope.cancel()
+    if hedged:
+        metrics.UPSTREAM_HEDGES.inc(feed=feed, winner=winner)
+    if isinstance(outcome, httpx.HTTPError):
+        raise outcome
+    return outcome
+
+
+async def _request(url: str, feed: str, timeout: float) -> httpx.Response:
+    """One GET of `url`, taking no more than `timeout` seconds in all."""
+    status = "error"
+    start = time.perf_counter()
+    try:
+        with anyio.fail_after(timeout):
+            response = await _get(url, timeout)
+    except TimeoutError:
+        raise httpx.ReadTimeout(f"No response within {timeout:.1f}s") from None
+    except anyio.get_cancelled_exc_class():
+        # A hedged request that lost the race
+        status = "cancelled"
+        raise
+    else:
+        status = str(response.status_code)
+        _latencies.setdefault(url, deque(maxlen=LATENCY_WINDOW)).append(
+            time.perf_counter() - start
+        )
+        return response
+    finally:
+        if status != "cancelled":
+            metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - start, feed=feed)
+        metrics.UPSTREAM_RESPONSES.inc(feed=feed, status=status)
+
+
+async def fetch(url: str, *, max_age: float | None = None) -> Snapshot:
+    """
+    Return a snapshot of `url` no older than `max_age` seconds.
+
+    `max_age` defaults to `SNAPSHOT_MAX_AGE`, read at call time so the load
+    test can turn snapshots off.
+
+    Concurrent callers for the same URL share a single download, and with a
+    `shared_cache` so do other worker processes. A failure is given back
+    to callers for `FAILURE_TTL` seconds, or while the feed's circuit is
+    open, instead of downloading again.
+
+    Raises:
+        httpx.HTTPError: If the download fails or returns an error status.
+        UpstreamUnavailableError: If the feed failed recently (a subclass of
+            `httpx.HTTPError`, raised without waiting on the network).
+        DeadlineExceededError: If the caller's `deadline` budget ran out
+            before a download could start.
+    """
+    if max_age is None:
+        max_age = SNAPSHOT_MAX_AGE
+    feed = feed_name(url)
+    snapshot = _snapshots.get(url)
+    if snapshot is not None and snapshot.age < max_age:
+        metrics.CACHE_REQUESTS.inc(cache=feed, result="hit")
+        return snapshot
+    breaker = breaker_for(url)
+    probe = _check(breaker, url, feed)
+    try:
+        async with _fetch_lock(url, feed):
+            # Another caller may have refreshed it, or failed to, while we waited
+            snapshot = _snapshots.get(url)
+            if snapshot is not None and snapshot.age < max_age:
+                metrics.CACHE_REQUESTS.inc(cache=feed, result="hit")
+                return snapshot
+            metrics.CACHE_REQUESTS.inc(cache=feed, result="miss")
+            snapshot = await _shared_snapshot(url, feed, max_age)
+            if snapshot is None:
+                probe = probe or _check(breaker, url, feed)
+                response = await _download(url, feed, breaker)
+                snapshot = Snapshot(
+                    url, response.text, response.content, time.monotonic()
+                )
+                await _share(snapshot, response.encoding)
+            _snapshots[url] = snapshot
+            return snapshot
+    finally:
+        if probe:
+            breaker.probing = False
+
+
+@contextlib.asynccontextmanager
+async def _fetch_lock(url: str, feed: str) -> AsyncIterator[None]:
+    """Hold `url`'s fetch lock, waiting no longer than the deadline allows."""
+    lock = _fetch_locks.setdefault(url, anyio.Lock())
+    acquired = False
+    with anyio.move_on_after(deadline.remaining()):
+        await lock.acquire()
+        acquired = True
+    if not acquired:
+        raise DeadlineExceededError(f"Out of time waiting for the {feed} feed")
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+async def _shared_snapshot(url: str, feed: str, max_age: float) -> Snapshot | None:
+    """A snapshot another worker stored, if one is young enough."""
+    if shared_cache is None:
+        return None
+    entry = await anyio.to_thread.run_sync(shared_cache.get, "feed", url)
+    hit = entry is not None and entry.age < max_age
+    metrics.CACHE_REQUESTS.inc(cache=f"{feed}:shared", result="hit" if hit else "miss")
+    if entry is None or not hit:
+        return None
+    return _from_entry(url, entry)
+
+
+def _from_entry(url: str, entry: Entry) -> Snapshot:
+    text = entry.value.decode(entry.meta.get("encoding", "utf-8"), errors="replace")
+    return Snapshot(url, text, entry.value, time.monotonic() - entry.age)
+
+
+async def restore_snapshots() -> list[str]:
+    """
+    Load the feeds kept in `shared_cache` as this process's snapshots.
+
+    A freshly started worker then answers from the feeds the previous
+    process fetched instead of downloading them again. Returns the names
+    of the feeds restored.
+    """
+    if shared_cache is None:
+        return []
+    restored = []
+    for name, url in FEEDS.items():
+        entry = await anyio.to_thread.run_sync(shared_cache.get, "feed", url)
+        if entry is not None and url not in _snapshots:
+            _snapshots[url] = _from_entry(url, entry)
+            restored.append(name)
+    return restored
+
+
+async def _share(snapshot: Snapshot, encoding: str | None) -> None:
+    if shared_cache is None:
+        return
+    await anyio.to_thread.run_sync(
+        functools.partial(
+            shared_cache.put,
+            "feed",
+            snapshot.url,
+            snapshot.content,
+            ttl=SNAPSHOT_MAX_AGE,
+            meta={"encoding": encoding or "utf-8"},
+        )
+    )
+
+
+def snapshot(url: str) -> Snapshot | None:
+    """The latest snapshot of `url`, however old, without fetching."""
+    return _snapshots.get(url)
+
+
+async def fetch_or_last(url: str) -> tuple[Snapshot, httpx.HTTPError | None]:
+    """
+    A fresh snapshot of `url` if it can be had, else the last good one.
+
+    Returns the snapshot and, when it is an old one served because the
+    feed could not be fetched, the error that prevented fetching.
+
+    Raises:
+        httpx.HTTPError: If fetching failed and there is no snapshot at all.
+    """
+    try:
+        return await fetch(url), None
+    except httpx.HTTPError as e:
+        last = _snapshots.get(url)
+        if last is None:
+            raise
+        metrics.CACHE_REQUESTS.inc(cache=feed_name(url), result="stale")
+        return last, e
+
+
+def failure(url: str) -> FetchError | None:
+    """The error from the latest download of `url`, if that download failed."""
+    return _failures.get(url)
+
+
+def clear_snapshots() -> None:
+    """Forget every cached feed and failure (used by tests)."""
+    global last_error
+    _snapshots.clear()
+    _fetch_locks.clear()
+    _failures.clear()
+    _breakers.clear()
+    _latencies.clear()
+    last_error = None
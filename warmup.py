@@ -0,0 +1,147 @@
+"""
+warmup.py — Start-up warm-up for the server's cold paths.
+
+After a deploy the first callers used to pay for everything at once: the
+calendar and blog downloads, the TLS handshakes, importing the bolster CLI
+and running its slowest commands. The warm-up lifespan does that work in
+the background instead, driven by a TOML file named in `MCP_BOLSTER_WARMUP`:
+
+    concurrency = 2
+    feeds = ["calendar", "blog"]
+
+    [[commands]]
+    tool = "bolster_nisra_births"
+    args = { event_type = "both" }
+
+Commands are run through their Click tool, so results land in its result
+cache. Warm-up never delays start-up or readiness, and failures are only
+logged.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import anyio
+from fastmcp import FastMCP
+from fastmcp.server.lifespan import lifespan
+
+import upstream
+from click_mcp import ClickTool
+
+logger = logging.getLogger(__name__)
+
+CONFIG_ENV = "MCP_BOLSTER_WARMUP"
+
+
+@dataclass
+class WarmupConfig:
+    """What to warm and how many jobs may run at once."""
+
+    feeds: list[str] = field(default_factory=list)
+    commands: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
+    concurrency: int = 2
+
+
+@dataclass
+class WarmupStatus:
+    """Progress of the current warm-up, for logs and health checks."""
+
+    pending: int = 0
+    done: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+
+status = WarmupStatus()
+
+
+def load_config(path: Path) -> WarmupConfig:
+    """
+    Read a warm-up TOML file.
+
+    Raises:
+        ValueError: If a feed name is unknown or a command has no tool.
+    """
+    import tomllib  # Only needed when warm-up is configured
+
+    data = tomllib.loads(path.read_text())
+    feeds = list(data.get("feeds", []))
+    unknown = [f for f in feeds if f not in upstream.FEEDS]
+    if unknown:
+        raise ValueError(f"Unknown feeds in {path}: {', '.join(unknown)}")
+    commands = []
+    for entry in data.get("commands", []):
+        if "tool" not in entry:
+            raise ValueError(f"Warm-up command without a tool in {path}: {entry}")
+        commands.append((entry["tool"], dict(entry.get("args", {}))))
+    return WarmupConfig(
+        feeds=feeds, commands=commands, concurrency=int(data.get("concurrency", 2))
+    )
+
+
+async def _warm_feed(name: str) -> None:
+    await upstream.fetch(upstream.FEEDS[name])
+
+
+async def _warm_command(server: FastMCP, name: str, args: dict[str, Any]) -> None:
+    tool = await server.get_tool(name)
+    if not isinstance(tool, ClickTool):
+        raise ValueError(f"{name} is not a Click tool")
+    await tool.call(args, stream=False)
+
+
+async def warm_up(server: FastMCP, config: WarmupConfig) -> WarmupStatus:
+    """Run every warm-up job, at most `config.concurrency` at a time."""
+    global status
+    status = WarmupStatus(
+        pending=len(config.feeds) + len(config.commands), started_at=time.monotonic()
+    )
+    limiter = anyio.CapacityLimiter(max(1, config.concurrency))
+
+    async def run(label: str, job: Any, *args: Any) -> None:
+        async with limiter:
+            try:
+                await job(*args)
+            except Exception as e:
+                logger.warning("Warm-up of %s failed: %s", label, e)
+                status.failed[label] = str(e)
+            else:
+                logger.info("Warmed %s", label)
+            finally:
+                status.pending -= 1
+                status.done += 1
+
+    async with anyio.create_task_group() as tg:
+        for feed in config.feeds:
+            tg.start_soon(run, f"feed:{feed}", _warm_feed, feed)
+        for name, args in config.commands:
+            tg.start_soon(run, f"tool:{name}", _warm_command, server, name, args)
+    status.finished_at = time.monotonic()
+    return status
+
+
+@lifespan
+async def warmup_lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
+    """Start the configured warm-up in the background; cancel it on shutdown."""
+    path = os.environ.get(CONFIG_ENV)
+    if not path:
+        yield {}
+        return
+    config = load_config(Path(path))
+    # A plain task rather than a task group: FastMCP may exit the lifespan
+    # from a different task than the one that entered it
+    task = asyncio.create_task(warm_up(server, config))
+    try:
+        yield {}
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task